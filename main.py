@@ -70,10 +70,16 @@ import tkinter.font as tkfont
 from loguru import logger
 from app.path import LOGO_PATH, FONTS_PATH
 import datetime
-import random
+import heapq
+import time
 import json
+import os
+import sqlite3
+import uuid
+from array import array
+from collections import OrderedDict, deque
 from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw, ImageFont, ImageTk
 import threading
 
 __author__ = "Little Tree Studio"
@@ -101,14 +107,69 @@ logger.add(
 
 
 class ThemeColors:
-    """主题颜色配置 - 现代圆润设计配色"""
+    """主题颜色配置 - 现代圆润设计配色
+
+    界面控件通过 bind 把颜色选项绑定到颜色 token（属性名，如 "bg_card"），
+    切换主题时只对这些控件推送 configure，不重建界面。绑定数量翻倍时清理一次已销毁
+    的控件，反复打开设置、关于窗口不会让列表无限增长。
+    """
+
+    PRUNE_MIN = 64  # 绑定数量达到该值后才开始按翻倍清理
+
     def __init__(self, light_mode=True):
         self.light_mode = light_mode
+        self._bindings = []   # [(控件, {选项: token})]
+        self._prune_at = self.PRUNE_MIN
+        self._listeners = []  # 主题变化回调
         self._update_colors()
 
     def set_light_mode(self, light_mode):
         self.light_mode = light_mode
         self._update_colors()
+        self._push()
+
+    def bind(self, widget, **tokens):
+        """把控件的颜色选项绑定到 token（如 fg_color="bg_card"），立即应用并返回控件"""
+        widget.configure(**{option: getattr(self, token) for option, token in tokens.items()})
+        self._bindings.append((widget, tokens))
+        if len(self._bindings) >= self._prune_at:
+            self._bindings = [(w, t) for w, t in self._bindings if self._exists(w)]
+            self._prune_at = max(self.PRUNE_MIN, 2 * len(self._bindings))
+        return widget
+
+    @staticmethod
+    def _exists(widget):
+        try:
+            return bool(widget.winfo_exists())
+        except Exception:
+            return False
+
+    def subscribe(self, callback):
+        """注册主题变化回调，callback(theme)"""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _push(self):
+        """把当前主题颜色推送给所有绑定的控件，顺便清理已销毁的控件"""
+        alive = []
+        for widget, tokens in self._bindings:
+            try:
+                if not widget.winfo_exists():
+                    continue
+                widget.configure(**{option: getattr(self, token) for option, token in tokens.items()})
+                alive.append((widget, tokens))
+            except Exception as e:
+                logger.warning(f"更新控件主题颜色失败: {e}")
+        self._bindings = alive
+
+        for callback in list(self._listeners):
+            try:
+                callback(self)
+            except Exception as e:
+                logger.warning(f"主题变化回调失败: {e}")
 
     def _update_colors(self):
         if self.light_mode:
@@ -146,6 +207,9 @@ class ThemeColors:
             self.warning = "#FBBF24"           # 警告色 - 浅橙
             self.error = "#F87171"             # 错误色 - 浅红
 
+        # 派生颜色：每个主题只计算一次，悬停时直接读取
+        self.border_hover = lighten_color(self.border, 20)  # 组件边框悬停色
+
 
 def load_fonts():
     """加载自定义字体"""
@@ -159,6 +223,131 @@ def load_fonts():
 # 全局字体设置
 _current_font_family = None
 
+# 未设置自定义字体时依次尝试的候选字体
+FONT_CANDIDATES = [
+    "HarmonyOS Sans SC",
+    "HarmonyOS Sans",
+    "Microsoft YaHei UI",
+    "Microsoft YaHei",
+    "SimHei",
+    "PingFang SC",
+    "STHeiti",
+    "Arial"
+]
+
+
+class FontPool:
+    """字体池
+
+    缓存解析后的字体族（避免每次都通过 tkfont.families() 枚举系统字体），
+    并按 (字体族, 字号, 字重) 共享命名的 tkfont.Font 对象。
+
+    没有 Tk 根窗口（无头渲染）时 get 返回 (字体族, 字号, 字重) 元组，测量改用 Pillow 字体。
+    """
+
+    # Tk 字号单位是点，按 96 DPI 换算成 Pillow 使用的像素
+    PIXELS_PER_POINT = 96 / 72
+
+    def __init__(self):
+        self._fonts = {}
+        self._pil_fonts = {}
+        self._families = None
+        self._resolved_family = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def has_tk():
+        """是否已有 Tk 根窗口"""
+        return tk._default_root is not None
+
+    def families(self):
+        """系统可用字体（只枚举一次）"""
+        if self._families is None:
+            if not self.has_tk():
+                return set()
+            self._families = set(tkfont.families())
+        return self._families
+
+    def resolve_family(self):
+        """当前生效的字体族"""
+        if self._resolved_family is None:
+            if _current_font_family and _current_font_family != "系统默认":
+                self._resolved_family = _current_font_family
+            else:
+                self._resolved_family = FONT_CANDIDATES[0]  # 默认使用华为鸿蒙字体
+                # 尝试找到可用的字体
+                available_fonts = self.families()
+                for font_name in FONT_CANDIDATES:
+                    if font_name in available_fonts:
+                        self._resolved_family = font_name
+                        break
+        return self._resolved_family
+
+    def invalidate(self):
+        """字体设置变化后重新解析字体族"""
+        self._resolved_family = None
+
+    def get(self, family, size, weight):
+        """获取共享的命名字体"""
+        key = (family, size, weight)
+        font = self._fonts.get(key)
+        if font is not None:
+            self.hits += 1
+            return font
+
+        if not self.has_tk():
+            return key
+
+        self.misses += 1
+        font = tkfont.Font(family=family, size=size, weight=weight)
+        self._fonts[key] = font
+        return font
+
+    def measure(self, family, size, weight, text):
+        """测量文本宽度（像素）"""
+        if self.has_tk():
+            return self.get(family, size, weight).measure(text)
+        return round(self.pil_font((family, size, weight)).getlength(text))
+
+    def pil_font(self, font):
+        """把 Tk 字体描述（元组或 tkfont.Font）换算成 Pillow 字体，供离屏渲染使用"""
+        if hasattr(font, "actual"):
+            actual = font.actual()
+            family, size, weight = actual["family"], actual["size"], actual["weight"]
+        elif isinstance(font, (tuple, list)):
+            family = font[0]
+            size = font[1] if len(font) > 1 else 10
+            weight = font[2] if len(font) > 2 else "normal"
+        else:
+            family, size, weight = str(font), 10, "normal"
+
+        key = (family, size, weight)
+        pil_font = self._pil_fonts.get(key)
+        if pil_font is None:
+            # 正数为点，负数为像素（与 Tk 约定一致）
+            pixels = max(1, round(size * self.PIXELS_PER_POINT)) if size > 0 else -size
+            pil_font = self._load_pil_font(family, pixels, weight)
+            self._pil_fonts[key] = pil_font
+        return pil_font
+
+    def _load_pil_font(self, family, pixels, weight):
+        """按字体族查找字体文件，找不到时退回 Pillow 内置字体"""
+        candidates = []
+        if family.startswith("HarmonyOS"):
+            candidates.append(FONTS_PATH / "HarmonyOS_Sans_SC_Regular.ttf")
+        candidates.append(f"{family}.ttf")
+        candidates.append("DejaVuSans-Bold.ttf" if weight == "bold" else "DejaVuSans.ttf")
+        for candidate in candidates:
+            try:
+                return ImageFont.truetype(str(candidate), pixels)
+            except OSError:
+                continue
+        return ImageFont.load_default(pixels)
+
+
+_font_pool = FontPool()
+
 def get_current_font_family():
     """获取当前字体"""
     return _current_font_family
@@ -167,39 +356,87 @@ def set_font_family(font_name):
     """设置全局字体"""
     global _current_font_family
     _current_font_family = font_name
+    _font_pool.invalidate()
     logger.info(f"字体已设置为: {font_name}")
 
 def get_font(size, bold=False):
-    """获取字体，支持自定义字体"""
-    global _current_font_family
+    """获取字体，支持自定义字体（返回字体池中共享的 tkfont.Font，无头渲染时为字体元组）"""
+    weight = "bold" if bold else "normal"
+    return _font_pool.get(_font_pool.resolve_family(), size, weight)
+
+
+class TextFitter:
+    """文本测量与自适应排版
+
+    基于 tkfont.Font.measure，按 (字体, 文本) 做 LRU 缓存；提供二分查找字号以适配
+    给定宽度，以及按宽度加省略号截断，重复排版时不再反复发起 Tcl 测量调用。
+    """
+
+    CACHE_SIZE = 4096
+    ELLIPSIS = "…"
+
+    def __init__(self, pool):
+        self.pool = pool
+        self._widths = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def measure(self, text, size, bold=False):
+        """测量文本宽度（像素）"""
+        weight = "bold" if bold else "normal"
+        key = (self.pool.resolve_family(), size, weight, text)
+        width = self._widths.get(key)
+        if width is not None:
+            self._widths.move_to_end(key)
+            self.hits += 1
+            return width
+
+        self.misses += 1
+        width = self.pool.measure(key[0], size, weight, text)
+        self._widths[key] = width
+        if len(self._widths) > self.CACHE_SIZE:
+            self._widths.popitem(last=False)
+        return width
+
+    def fit_size(self, text, max_width, max_size, min_size=6, bold=False):
+        """二分查找不超过 max_width 的最大字号"""
+        max_size = max(min_size, int(max_size))
+        if self.measure(text, max_size, bold) <= max_width:
+            return max_size
+
+        low, high = min_size, max_size - 1
+        best = min_size
+        while low <= high:
+            mid = (low + high) // 2
+            if self.measure(text, mid, bold) <= max_width:
+                best = mid
+                low = mid + 1
+            else:
+                high = mid - 1
+        return best
+
+    def fit_font(self, text, max_width, max_size, min_size=6, bold=False):
+        """返回能放下文本的最大字号对应的字体"""
+        return get_font(self.fit_size(text, max_width, max_size, min_size, bold), bold)
+
+    def ellipsize(self, text, max_width, size, bold=False):
+        """文本超出 max_width 时截断并加省略号"""
+        if self.measure(text, size, bold) <= max_width:
+            return text
+
+        low, high = 0, len(text) - 1
+        best = 0
+        while low <= high:
+            mid = (low + high) // 2
+            if self.measure(text[:mid] + self.ELLIPSIS, size, bold) <= max_width:
+                best = mid
+                low = mid + 1
+            else:
+                high = mid - 1
+        return text[:best] + self.ELLIPSIS
 
-    # 可用字体列表
-    font_names = [
-        "HarmonyOS Sans SC",
-        "HarmonyOS Sans",
-        "Microsoft YaHei UI",
-        "Microsoft YaHei",
-        "SimHei",
-        "PingFang SC",
-        "STHeiti",
-        "Arial"
-    ]
-
-    font_family = font_names[0]  # 默认使用华为鸿蒙字体
-
-    # 如果设置了自定义字体，优先使用
-    if _current_font_family and _current_font_family != "系统默认":
-        font_family = _current_font_family
-    else:
-        # 尝试找到可用的字体
-        available_fonts = tkfont.families()
-        for font_name in font_names:
-            if font_name in available_fonts:
-                font_family = font_name
-                break
 
-    weight = "bold" if bold else "normal"
-    return (font_family, size, weight)
+_text_fitter = TextFitter(_font_pool)
 
 
 class WidgetTemplate:
@@ -215,59 +452,2362 @@ class WidgetTemplate:
         return SIZE_MAP.get(self.size, (200, 200))
 
 
-# 示例组件模板
-WIDGET_TEMPLATES = [
-    WidgetTemplate("时钟", "显示当前时间", "🕐", "medium"),
-    WidgetTemplate("天气", "显示天气信息", "🌤", "medium"),
-    WidgetTemplate("待办事项", "管理每日任务", "📝", "large"),
-    WidgetTemplate("笔记", "快速记录想法", "📌", "medium"),
-    WidgetTemplate("系统监控", "显示CPU、内存使用率", "📊", "small"),
-    WidgetTemplate("日历", "显示当前日期", "📅", "medium"),
-    WidgetTemplate("计时器", "倒计时功能", "⏱", "small"),
-    WidgetTemplate("汇率", "汇率查询", "💱", "medium"),
-]
+# 示例组件模板
+WIDGET_TEMPLATES = [
+    WidgetTemplate("时钟", "显示当前时间", "🕐", "medium"),
+    WidgetTemplate("天气", "显示天气信息", "🌤", "medium"),
+    WidgetTemplate("待办事项", "管理每日任务", "📝", "large"),
+    WidgetTemplate("笔记", "快速记录想法", "📌", "medium"),
+    WidgetTemplate("系统监控", "显示CPU、内存使用率", "📊", "small"),
+    WidgetTemplate("CPU核心", "显示每个CPU核心的使用率", "🧮", "medium"),
+    WidgetTemplate("磁盘网络", "显示磁盘读写和网络吞吐", "💾", "medium"),
+    WidgetTemplate("温度电池", "显示温度和电池状态", "🌡", "small"),
+    WidgetTemplate("进程", "显示占用最多的进程", "📋", "large"),
+    WidgetTemplate("容器资源", "显示 cgroup v2 容器的资源使用", "📦", "large"),
+    WidgetTemplate("日历", "显示当前日期", "📅", "medium"),
+    WidgetTemplate("计时器", "倒计时功能", "⏱", "small"),
+    WidgetTemplate("汇率", "汇率查询", "💱", "medium"),
+]
+
+# 尺寸映射常量
+SIZE_MAP = {
+    "small": (150, 150),
+    "medium": (200, 200),
+    "large": (300, 300)
+}
+
+
+# =============================================================================
+# 工具函数
+# =============================================================================
+
+def hex_to_rgb(hex_color):
+    """十六进制颜色转RGB"""
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+def rgb_to_hex(rgb):
+    """RGB转十六进制颜色"""
+    return '#{:02x}{:02x}{:02x}'.format(int(rgb[0]), int(rgb[1]), int(rgb[2]))
+
+def lighten_color(hex_color, amount=20):
+    """使颜色变亮"""
+    rgb = hex_to_rgb(hex_color)
+    new_rgb = tuple(min(255, c + amount) for c in rgb)
+    return rgb_to_hex(new_rgb)
+
+def darken_color(hex_color, amount=20):
+    """使颜色变暗"""
+    rgb = hex_to_rgb(hex_color)
+    new_rgb = tuple(max(0, c - amount) for c in rgb)
+    return rgb_to_hex(new_rgb)
+
+def usage_color(percent):
+    """使用率对应的颜色：低于 50% 绿色，低于 80% 橙色，否则红色"""
+    return "#34C759" if percent < 50 else "#FF9500" if percent < 80 else "#FF3B30"
+
+def format_bytes(size):
+    """字节数的简短显示，如 1.2 MB"""
+    value = float(size)
+    if value < 1024:
+        return f"{value:.0f} B"
+    for unit in ("KB", "MB", "GB", "TB"):
+        value /= 1024
+        if value < 1024 or unit == "TB":
+            return f"{value:.1f} {unit}"
+
+def format_rate(bytes_per_second):
+    """字节速率的简短显示，如 1.2 MB/s"""
+    return f"{format_bytes(bytes_per_second)}/s"
+
+
+def virtual_screen_bounds(window):
+    """虚拟桌面（所有显示器）的范围 (左, 上, 右, 下)
+
+    每次调用都重新读取，显示器接入或拔出后立即生效；主屏左侧或上方的显示器坐标为负。
+    """
+    left, top = window.winfo_vrootx(), window.winfo_vrooty()
+    width = window.winfo_vrootwidth() or window.winfo_screenwidth()
+    height = window.winfo_vrootheight() or window.winfo_screenheight()
+    return left, top, left + width, top + height
+
+
+def intersects_screen(window, x, y, width, height):
+    """矩形是否与虚拟桌面相交"""
+    left, top, right, bottom = virtual_screen_bounds(window)
+    return x + width > left and y + height > top and x < right and y < bottom
+
+
+# =============================================================================
+# 静态图层 - 用 Pillow 预渲染装饰性背景
+# =============================================================================
+
+# 超采样倍数，缩小后得到抗锯齿边缘
+LAYER_SUPERSAMPLE = 4
+
+
+def render_rounded_background(width, height, fill, outline, radius=12):
+    """渲染带抗锯齿圆角边框的背景图层"""
+    width, height = int(width), int(height)
+    s = LAYER_SUPERSAMPLE
+    image = Image.new("RGBA", (width * s, height * s), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    draw.rounded_rectangle(
+        [s // 2, s // 2, width * s - s // 2 - 1, height * s - s // 2 - 1],
+        radius=radius * s,
+        fill=fill,
+        outline=outline,
+        width=s
+    )
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def render_glow(radius, color, step=5):
+    """渲染多层同心圆模拟的发光图层"""
+    s = LAYER_SUPERSAMPLE
+    size = radius * 2 + 2
+    image = Image.new("RGBA", (size * s, size * s), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    center = size * s / 2
+    rgb = hex_to_rgb(color)
+    for i in range(radius, 0, -step):
+        # 越靠外越透明
+        alpha = int(255 * (1 - i / (radius + step)))
+        draw.ellipse(
+            [center - i * s, center - i * s, center + i * s, center + i * s],
+            outline=rgb + (alpha,),
+            width=s
+        )
+    return image.resize((size, size), Image.LANCZOS)
+
+
+CLOCK_DECOR_COLORS = ("#F3F4F6", "#E5E7EB", "#E0E7FF")  # 不跟随主题时的 (填充, 描边, 圆点)
+
+
+def render_clock_decor(width, height, fill, outline, dot):
+    """渲染时钟组件的静态装饰：光晕圆、装饰圆点和日期背景框（颜色由组件按主题传入）"""
+    width, height = int(width), int(height)
+    s = LAYER_SUPERSAMPLE
+    image = Image.new("RGBA", (width * s, height * s), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+
+    # 装饰性圆形背景
+    glow_radius = min(width, height) * 0.25
+    cx, cy = width // 2, height // 3
+    draw.ellipse(
+        [(cx - glow_radius) * s, (cy - glow_radius) * s, (cx + glow_radius) * s, (cy + glow_radius) * s],
+        fill=fill, outline=outline, width=2 * s
+    )
+
+    # 装饰性小圆点
+    for i in range(3):
+        x = width // 2 - 30 + i * 30
+        draw.ellipse([x * s, (height // 2 - 40) * s, (x + 6) * s, (height // 2 - 34) * s], fill=dot)
+
+    # 日期圆角背景框
+    date_bg_height = 28
+    date_y = height - height // 6
+    draw.rounded_rectangle(
+        [(width // 2 - 70) * s, (date_y - date_bg_height // 2) * s,
+         (width // 2 + 70) * s, (date_y + date_bg_height // 2) * s],
+        radius=8 * s, fill=fill, outline=outline, width=s
+    )
+    return image.resize((width, height), Image.LANCZOS)
+
+
+class LayerCache:
+    """静态图层缓存
+
+    以 (组件类型, 尺寸, 颜色, 主题) 等为键缓存渲染好的 PhotoImage，按 LRU 淘汰，
+    总像素内存不超过 max_bytes。photo 为 False 时直接缓存 PIL 图像（离屏渲染用）。
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, photo=True):
+        self.max_bytes = max_bytes
+        self.photo = photo
+        self._layers = OrderedDict()  # 键 -> (PhotoImage 或 PIL 图像, 字节数)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, render):
+        """获取图层，未命中时调用 render() 生成 PIL 图像"""
+        entry = self._layers.get(key)
+        if entry is not None:
+            self._layers.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        image = render()
+        photo = ImageTk.PhotoImage(image) if self.photo else image
+        size = image.width * image.height * 4
+        self._layers[key] = (photo, size)
+        self._bytes += size
+
+        # 超出内存上限时淘汰最久未使用的图层（仍在画布上显示的图层由场景图持有引用）
+        while self._bytes > self.max_bytes and len(self._layers) > 1:
+            _, (_, evicted_size) = self._layers.popitem(last=False)
+            self._bytes -= evicted_size
+        return photo
+
+
+_layer_cache = LayerCache()
+_headless_layer_cache = LayerCache(photo=False)
+
+
+# =============================================================================
+# 后台持久化 - 防抖合并写入，原子落盘
+# =============================================================================
+
+def write_text_atomic(path, text):
+    """原子写入文本：先写临时文件并刷盘，再替换目标文件，中途崩溃不会留下半个文件"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def write_json_atomic(path, data):
+    """原子写入 JSON"""
+    write_text_atomic(path, json.dumps(data, ensure_ascii=False, indent=2))
+
+
+class PersistenceWriter:
+    """后台持久化写入器
+
+    UI 线程只调用 submit(key, write)：同一个 key 在防抖时间内的多次提交合并为最后一次，
+    由后台线程执行 write()。write 应只使用提交时拍下的数据快照，不能访问 Tk 控件。
+    连续提交会不断推迟写入，但距该 key 第一次未写入的提交最多 max_delay 秒必定落盘。
+    退出前调用 flush() 立即写完所有待写入项。
+    """
+
+    DEBOUNCE = 0.5  # 秒
+    MAX_DELAY = 5.0  # 秒
+
+    def __init__(self, debounce=None, max_delay=None):
+        self.debounce = self.DEBOUNCE if debounce is None else debounce
+        self.max_delay = self.MAX_DELAY if max_delay is None else max_delay
+        self._pending = {}  # key -> (到期时间, write, 第一次未写入提交的时间)
+        self._active = None  # 正在执行写入的 key
+        self._cond = threading.Condition()
+        self._thread = None
+
+        # 指标
+        self.submitted = 0
+        self.coalesced = 0   # 被后续提交覆盖、没有实际执行的写入
+        self.written = 0
+        self.failed = 0
+        self.total_write_time = 0.0
+        self.max_write_time = 0.0
+
+    @property
+    def queue_depth(self):
+        """待写入的 key 数量"""
+        with self._cond:
+            return len(self._pending) + (1 if self._active is not None else 0)
+
+    def metrics(self):
+        """队列深度和写入耗时（毫秒）"""
+        with self._cond:
+            written = self.written
+            return {
+                "queue_depth": len(self._pending) + (1 if self._active is not None else 0),
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "written": written,
+                "failed": self.failed,
+                "avg_write_ms": self.total_write_time / written * 1000 if written else 0.0,
+                "max_write_ms": self.max_write_time * 1000,
+            }
+
+    def submit(self, key, write, delay=None):
+        """提交写入；同 key 未执行的旧写入被替换，并重新开始防抖计时（不超过 max_delay）"""
+        now = time.monotonic()
+        due = now + (self.debounce if delay is None else delay)
+        with self._cond:
+            first = now
+            if key in self._pending:
+                self.coalesced += 1
+                first = self._pending[key][2]
+            self._pending[key] = (min(due, first + self.max_delay), write, first)
+            self.submitted += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="PersistenceWriter", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def flush(self, timeout=5.0):
+        """让所有待写入项立即执行并等待完成，返回是否在超时前写完"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._pending = {key: (0, write, first) for key, (_, write, first) in self._pending.items()}
+            self._cond.notify_all()
+            while self._pending or self._active is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._thread is None:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    due_key = min(self._pending, key=lambda k: self._pending[k][0], default=None)
+                    if due_key is not None and self._pending[due_key][0] <= now:
+                        break
+                    self._cond.wait(None if due_key is None else self._pending[due_key][0] - now)
+                _, write, _ = self._pending.pop(due_key)
+                self._active = due_key
+
+            start = time.perf_counter()
+            try:
+                write()
+                failed = False
+            except Exception as e:
+                failed = True
+                logger.error(f"后台写入失败 ({due_key}): {e}")
+            elapsed = time.perf_counter() - start
+
+            with self._cond:
+                self._active = None
+                if failed:
+                    self.failed += 1
+                else:
+                    self.written += 1
+                    self.total_write_time += elapsed
+                    self.max_write_time = max(self.max_write_time, elapsed)
+                self._cond.notify_all()
+
+
+_persistence = PersistenceWriter()
+
+
+# =============================================================================
+# 配置存储 - SQLite 保存每个组件实例的配置
+# =============================================================================
+
+class ConfigStore:
+    """组件配置存储
+
+    SQLite（WAL 模式）中每个组件实例一行，以稳定的 UUID 为主键，读写单个组件只走索引，
+    不再整文件读写。首次打开时把旧的 widget_configs.json 一次性迁移进来。连接在第一次
+    使用时才建立。
+    """
+
+    def __init__(self, path, legacy_json=None):
+        self.path = Path(path)
+        self.legacy_json = Path(legacy_json) if legacy_json else None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS widget_configs (
+                    uid TEXT PRIMARY KEY,
+                    template TEXT NOT NULL,
+                    config TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_widget_configs_template
+                    ON widget_configs (template, updated_at);
+                CREATE TABLE IF NOT EXISTS session_widgets (
+                    uid TEXT PRIMARY KEY,
+                    template TEXT NOT NULL,
+                    layout TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+            """)
+            self._conn = conn
+            self._migrate_json()
+        return self._conn
+
+    def _migrate_json(self):
+        """把旧版 widget_configs.json 迁移到数据库（只执行一次）"""
+        conn = self._conn
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+            return
+
+        migrated = 0
+        if self.legacy_json and self.legacy_json.exists():
+            try:
+                with open(self.legacy_json, 'r', encoding='utf-8') as f:
+                    configs = json.load(f)
+                # 旧键为 "模板名_id()"，每次运行都会变化，迁移后分配新的 UUID；
+                # updated_at 为 0，真正保存过的配置总是更新
+                with conn:
+                    for widget_key, config in configs.items():
+                        template = widget_key.rsplit("_", 1)[0]
+                        conn.execute(
+                            "INSERT INTO widget_configs (uid, template, config, updated_at) VALUES (?, ?, ?, 0)",
+                            (uuid.uuid4().hex, template, json.dumps(config, ensure_ascii=False))
+                        )
+                        migrated += 1
+                self.legacy_json.rename(self.legacy_json.with_name(self.legacy_json.name + ".migrated"))
+            except Exception as e:
+                logger.warning(f"迁移旧组件配置失败: {e}")
+                return
+
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)", (str(migrated),))
+        if migrated:
+            logger.info(f"已迁移 {migrated} 条旧组件配置")
+
+    def get(self, uid):
+        """按 UUID 读取组件配置，不存在返回 None"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT config FROM widget_configs WHERE uid = ?", (uid,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def latest(self, template):
+        """同类组件最近一次保存的配置（新建组件时沿用）"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT config FROM widget_configs WHERE template = ? ORDER BY updated_at DESC, rowid LIMIT 1",
+                (template,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, uid, template, config):
+        """写入（或覆盖）一个组件的配置"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    """INSERT INTO widget_configs (uid, template, config, updated_at) VALUES (?, ?, ?, ?)
+                       ON CONFLICT(uid) DO UPDATE SET
+                           template = excluded.template, config = excluded.config, updated_at = excluded.updated_at""",
+                    (uid, template, json.dumps(config, ensure_ascii=False), time.time())
+                )
+
+    def delete(self, uid):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM widget_configs WHERE uid = ?", (uid,))
+
+    def session(self):
+        """上次会话的组件布局：[(uid, 模板名, 布局字典)]，按创建顺序"""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT uid, template, layout FROM session_widgets ORDER BY created_at, rowid"
+            ).fetchall()
+        return [(uid, template, json.loads(layout)) for uid, template, layout in rows]
+
+    def put_session(self, uid, template, layout):
+        """写入组件在会话中的布局（尺寸档位和几何），保留首次加入的顺序"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    """INSERT INTO session_widgets (uid, template, layout, created_at) VALUES (?, ?, ?, ?)
+                       ON CONFLICT(uid) DO UPDATE SET template = excluded.template, layout = excluded.layout""",
+                    (uid, template, json.dumps(layout), time.time())
+                )
+
+    def delete_session(self, uid):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM session_widgets WHERE uid = ?", (uid,))
+
+    def compact(self, live_uids):
+        """清理孤立配置：删除不属于 live_uids 也不在会话布局中的行，每种模板只保留最近一条作为新建默认值
+
+        返回删除的行数。
+        """
+        live_uids = list(live_uids)
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS live_uids (uid TEXT PRIMARY KEY)")
+                conn.execute("DELETE FROM live_uids")
+                conn.executemany("INSERT OR IGNORE INTO live_uids (uid) VALUES (?)", ((uid,) for uid in live_uids))
+                cursor = conn.execute("""
+                    DELETE FROM widget_configs
+                    WHERE uid NOT IN (SELECT uid FROM live_uids)
+                      AND uid NOT IN (SELECT uid FROM session_widgets)
+                      AND rowid NOT IN (
+                          SELECT (SELECT rowid FROM widget_configs AS latest
+                                  WHERE latest.template = templates.template
+                                  ORDER BY updated_at DESC, rowid LIMIT 1)
+                          FROM (SELECT DISTINCT template FROM widget_configs) AS templates
+                      )
+                """)
+                removed = cursor.rowcount
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        if removed:
+            logger.info(f"已清理 {removed} 条孤立组件配置")
+        return removed
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_config_store = ConfigStore(
+    Path.home() / ".dashwidgets" / "widgets.db",
+    legacy_json=Path.home() / ".dashwidgets" / "widget_configs.json"
+)
+
+
+# =============================================================================
+# 笔记存储 - 每个笔记组件一个文本文件
+# =============================================================================
+
+class NoteStore:
+    """笔记存储
+
+    每个笔记组件的内容保存在 <目录>/<uid>.txt 中，保存一条笔记只写它自己的文件。
+    旧版 notes.json 里唯一的 'note' 会被第一个还没有文件的笔记组件认领。
+    读取按块进行，调用方可以先显示第一屏，再把其余部分分批插入。
+    """
+
+    FIRST_CHUNK = 4096    # 字符，大约一屏
+    CHUNK_SIZE = 32768    # 字符，后续每批
+
+    def __init__(self, directory, legacy_json=None):
+        self.directory = Path(directory)
+        self.legacy_json = Path(legacy_json) if legacy_json else None
+        self._lock = threading.Lock()
+
+    def path(self, uid):
+        return self.directory / f"{uid}.txt"
+
+    def exists(self, uid):
+        return self.path(uid).exists()
+
+    def iter_chunks(self, uid, first=None, size=None):
+        """逐块读取笔记内容：第一块 first 个字符，之后每块 size 个字符"""
+        path = self.path(uid)
+        if not path.exists() and not self._migrate_legacy(uid):
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                chunk = f.read(first or self.FIRST_CHUNK)
+                while chunk:
+                    yield chunk
+                    chunk = f.read(size or self.CHUNK_SIZE)
+        except Exception as e:
+            logger.error(f"读取笔记失败 ({uid}): {e}")
+
+    def load(self, uid):
+        return "".join(self.iter_chunks(uid))
+
+    def save(self, uid, text):
+        """原子写入一条笔记（在持久化线程中调用）"""
+        with self._lock:
+            write_text_atomic(self.path(uid), text)
+
+    def delete(self, uid):
+        with self._lock:
+            try:
+                self.path(uid).unlink()
+            except FileNotFoundError:
+                pass
+
+    def compact(self, live_uids):
+        """删除不属于任何现存组件的笔记文件"""
+        live = {f"{uid}.txt" for uid in live_uids}
+        removed = 0
+        if not self.directory.exists():
+            return removed
+        with self._lock:
+            for path in self.directory.glob("*.txt"):
+                if path.name not in live:
+                    try:
+                        path.unlink()
+                        removed += 1
+                    except Exception as e:
+                        logger.warning(f"删除孤立笔记失败 ({path.name}): {e}")
+        if removed:
+            logger.info(f"已清理 {removed} 个孤立笔记文件")
+        return removed
+
+    def _migrate_legacy(self, uid):
+        """把旧 notes.json 中的笔记写入 uid 对应的文件，成功返回 True"""
+        if not self.legacy_json or not self.legacy_json.exists():
+            return False
+        with self._lock:
+            try:
+                with open(self.legacy_json, 'r', encoding='utf-8') as f:
+                    note = json.load(f).get('note')
+                if note is None:
+                    return False
+                write_text_atomic(self.path(uid), note)
+                self.legacy_json.rename(self.legacy_json.with_suffix(".json.migrated"))
+                logger.info(f"已将 notes.json 迁移到 {self.path(uid).name}")
+                return True
+            except Exception as e:
+                logger.error(f"迁移旧笔记失败: {e}")
+                return False
+
+
+_note_store = NoteStore(
+    Path.home() / ".dashwidgets" / "notes",
+    legacy_json=Path.home() / ".dashwidgets" / "notes.json"
+)
+
+
+# =============================================================================
+# 指标历史 - 定长环形缓冲区与 LTTB 降采样
+# =============================================================================
+
+class RingBuffer:
+    """定长环形缓冲区
+
+    数据存放在预分配的 array('d') 中，每个值固定 8 字节，写满后覆盖最旧的值：
+    1 秒采样一次保存一小时只占约 28 KB，也不会产生 Python float 对象。
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = array('d', bytes(8 * capacity))
+        self._start = 0
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    @property
+    def nbytes(self):
+        return self._data.itemsize * self.capacity
+
+    def append(self, value):
+        end = self._start + self._len
+        self._data[end % self.capacity] = value
+        if self._len < self.capacity:
+            self._len += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def last(self, default=None):
+        if not self._len:
+            return default
+        return self._data[(self._start + self._len - 1) % self.capacity]
+
+    def values(self):
+        """按时间顺序返回数据副本（array('d')）"""
+        end = self._start + self._len
+        if end <= self.capacity:
+            return self._data[self._start:end]
+        return self._data[self._start:] + self._data[:end - self.capacity]
+
+
+def lttb(values, threshold):
+    """Largest-Triangle-Three-Buckets 降采样
+
+    把序列降到 threshold 个点并尽量保留峰谷形状，返回 [(下标, 值), ...]；
+    点数不超过 threshold 时原样返回。
+    """
+    n = len(values)
+    if n <= threshold or threshold < 3:
+        return list(enumerate(values))
+
+    sampled = [(0, values[0])]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # 下一个桶的平均点
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_x = (avg_start + avg_end - 1) / 2
+        avg_y = sum(values[avg_start:avg_end]) / (avg_end - avg_start)
+
+        # 当前桶中与上一个选中点、下一个桶平均点构成最大三角形的点
+        ax, ay = a, values[a]
+        max_area = -1.0
+        for j in range(int(i * every) + 1, avg_start):
+            area = abs((ax - avg_x) * (values[j] - ay) - (ax - j) * (avg_y - ay))
+            if area > max_area:
+                max_area = area
+                a = j
+        sampled.append((a, values[a]))
+
+    sampled.append((n - 1, values[n - 1]))
+    return sampled
+
+
+# =============================================================================
+# 扩展系统指标 - 每核 CPU、磁盘、网络、温度和电池
+# =============================================================================
+
+class CounterDeltas:
+    """一组累计计数器的增量
+
+    每次传入按设备展开的扁平 array('d')（设备 × 列），与上次的数组逐元素相减，一遍处理
+    所有设备，不为每个设备单独维护状态。设备列表变化（热插拔）时重新建立基线。
+    """
+
+    def __init__(self):
+        self.names = ()
+        self._prev = None
+        self._prev_time = None
+
+    def update(self, names, values, now):
+        """返回 (增量数组, 时间差)；重新建立基线时增量为自开机以来的累计值，时间差为 None"""
+        if names != self.names or self._prev is None or len(values) != len(self._prev):
+            self.names = names
+            self._prev = values
+            self._prev_time = now
+            return values, None
+        deltas = array('d', [max(0.0, value - prev) for value, prev in zip(values, self._prev)])
+        dt = now - self._prev_time
+        self._prev = values
+        self._prev_time = now
+        return deltas, (dt if dt > 0 else None)
+
+
+class CoreCollector:
+    """每个 CPU 核心的使用率（/proc/stat 中的 cpuN 行），核心上下线时自动重建基线"""
+
+    def __init__(self, proc_root, sys_root):
+        self._stat = ProcReader(Path(proc_root) / "stat", bufsize=16384)
+        self._deltas = CounterDeltas()
+
+    def collect(self, now):
+        names, values = [], array('d')
+        # 第一行是汇总行，各核心的行紧随其后
+        for line in self._stat.read().split(b"\n")[1:]:
+            if not line.startswith(b"cpu"):
+                break
+            fields = line.split(None, 9)
+            times = [int(v) for v in fields[1:9]]
+            names.append(fields[0])
+            values.append(sum(times))
+            values.append(times[3] + times[4])
+
+        deltas, _ = self._deltas.update(tuple(names), values, now)
+        percents = []
+        for i in range(0, len(deltas), 2):
+            total, idle = deltas[i], deltas[i + 1]
+            percents.append(100.0 * (total - idle) / total if total > 0 else 0.0)
+        return percents
+
+    def close(self):
+        self._stat.close()
+
+
+class DeviceTableCollector:
+    """按行列出设备的 /proc 表格（diskstats、net/dev）的吞吐速率
+
+    第一次采样时确定哪些行是要统计的设备，之后每次只解析这些行；行数或设备名变化
+    （热插拔）时才重新扫描设备。每个设备两列计数，换算成字节后一次算出所有速率。
+    """
+
+    COLUMNS = (0, 1)  # 两列计数在该行字段中的下标
+    SCALE = 1         # 计数到字节的换算系数
+
+    def __init__(self, path):
+        self._table = ProcReader(path, bufsize=16384)
+        self._deltas = CounterDeltas()
+        self._line_count = None
+        self._rows = ()   # 设备所在行号
+        self._names = ()  # 设备名
+
+    def _parse(self, line):
+        """返回 (设备名, 字段列表)"""
+        raise NotImplementedError
+
+    def _wanted(self, name):
+        return True
+
+    def _scan(self, lines):
+        rows, names = [], []
+        for index, line in enumerate(lines):
+            parsed = self._parse(line)
+            if parsed and self._wanted(parsed[0]):
+                rows.append(index)
+                names.append(parsed[0])
+        self._rows, self._names = tuple(rows), tuple(names)
+        self._line_count = len(lines)
+
+    def collect(self, now):
+        lines = self._table.read().splitlines()
+        if len(lines) != self._line_count:
+            self._scan(lines)
+
+        values = array('d')
+        names = []
+        for index in self._rows:
+            name, fields = self._parse(lines[index])
+            names.append(name)
+            for column in self.COLUMNS:
+                values.append(int(fields[column]) * self.SCALE)
+        if tuple(names) != self._names:
+            # 行数不变但设备换了，重新扫描后下次再算
+            self._scan(lines)
+            return {}
+
+        deltas, dt = self._deltas.update(self._names, values, now)
+        return {
+            name: (deltas[2 * i] / dt, deltas[2 * i + 1] / dt) if dt else (0.0, 0.0)
+            for i, name in enumerate(self._names)
+        }
+
+    def close(self):
+        self._table.close()
+
+
+class DiskCollector(DeviceTableCollector):
+    """整盘设备的读写速率（字节/秒），设备列表取自 /sys/block
+
+    dm-*（LVM、LUKS）、md* 等叠加在其他磁盘之上的设备（slaves 目录非空）不计入，
+    否则同一份 I/O 会在叠加设备和底层磁盘上各算一次。
+    """
+
+    COLUMNS = (5, 9)  # 读扇区数、写扇区数（字段从主设备号开始计）
+    SCALE = 512
+    VIRTUAL_PREFIXES = (b"loop", b"ram", b"zram", b"fd", b"sr")
+    STACKED_PREFIXES = (b"dm-", b"md")  # 无法读取 /sys/block 时按名称排除叠加设备
+
+    def __init__(self, proc_root, sys_root):
+        super().__init__(Path(proc_root) / "diskstats")
+        self._sys_block = Path(sys_root) / "block"
+        self._devices = None
+
+    def _parse(self, line):
+        fields = line.split()
+        if len(fields) < 10:
+            return None
+        return fields[2].decode(), fields
+
+    def _scan(self, lines):
+        # 只在热插拔时重新列出 /sys/block，排除分区、虚拟设备和叠加设备
+        try:
+            self._devices = {
+                name for name in os.listdir(self._sys_block)
+                if not name.encode().startswith(self.VIRTUAL_PREFIXES) and not self._is_stacked(name)
+            }
+        except OSError:
+            self._devices = None
+        super()._scan(lines)
+
+    def _is_stacked(self, name):
+        try:
+            return bool(os.listdir(self._sys_block / name / "slaves"))
+        except OSError:
+            return False
+
+    def _wanted(self, name):
+        if self._devices is None:
+            return not name.encode().startswith(self.VIRTUAL_PREFIXES + self.STACKED_PREFIXES)
+        return name in self._devices
+
+
+class NetCollector(DeviceTableCollector):
+    """各网络接口的接收、发送速率（字节/秒），不含回环接口"""
+
+    COLUMNS = (0, 8)  # 接收字节数、发送字节数
+
+    def __init__(self, proc_root, sys_root):
+        super().__init__(Path(proc_root) / "net" / "dev")
+
+    def _parse(self, line):
+        name, sep, rest = line.partition(b":")
+        if not sep:
+            return None  # 表头
+        return name.strip().decode(), rest.split()
+
+    def _wanted(self, name):
+        return name != "lo"
+
+
+class SysfsClassCollector:
+    """/sys/class 下一类设备的读数
+
+    设备在第一次采样时枚举，每个设备的属性文件常驻打开；每隔 RESCAN_SECONDS 只比较
+    一次目录项数量，变化（热插拔）时才重新枚举。单个设备读取失败只跳过该设备，
+    下次采样再试。
+    """
+
+    CLASS = ""
+    RESCAN_SECONDS = 5.0
+
+    def __init__(self, proc_root, sys_root):
+        self.directory = Path(sys_root) / "class" / self.CLASS
+        self._devices = None
+        self._entry_count = None
+        self._next_check = 0.0
+
+    def _scan(self):
+        self.close()
+        entries = sorted(os.listdir(self.directory))
+        self._entry_count = len(entries)
+        self._devices = [device for device in map(self._open_device, entries) if device]
+
+    def _open_device(self, entry):
+        """返回设备的读取器描述，不需要的设备返回 None"""
+        raise NotImplementedError
+
+    def _read_device(self, device):
+        raise NotImplementedError
+
+    def collect(self, now):
+        if self._devices is None or (now >= self._next_check and len(os.listdir(self.directory)) != self._entry_count):
+            self._scan()
+        if now >= self._next_check:
+            self._next_check = now + self.RESCAN_SECONDS
+        readings = []
+        for device in self._devices:
+            try:
+                readings.append(self._read_device(device))
+            except (OSError, ValueError):
+                # 笔记本上常有温度区返回 ENODATA/EIO；拔出的设备由目录项数量变化触发重新枚举
+                continue
+        return readings
+
+    def close(self):
+        for device in self._devices or ():
+            for reader in device.values():
+                if isinstance(reader, ProcReader):
+                    reader.close()
+        self._devices = None
+
+    @staticmethod
+    def _read_text(path, default=""):
+        try:
+            return Path(path).read_text().strip()
+        except OSError:
+            return default
+
+
+class ThermalCollector(SysfsClassCollector):
+    """各温度区的读数，返回 [(类型, 摄氏度), ...]"""
+
+    CLASS = "thermal"
+
+    def _open_device(self, entry):
+        if not entry.startswith("thermal_zone"):
+            return None
+        path = self.directory / entry
+        return {'name': self._read_text(path / "type", entry), 'temp': ProcReader(path / "temp", bufsize=64)}
+
+    def _read_device(self, device):
+        return device['name'], int(device['temp'].read()) / 1000
+
+
+class PowerCollector(SysfsClassCollector):
+    """电池电量和充放电状态，返回 [(名称, 电量百分比, 状态), ...]"""
+
+    CLASS = "power_supply"
+
+    def _open_device(self, entry):
+        path = self.directory / entry
+        if self._read_text(path / "type") != "Battery" or not (path / "capacity").exists():
+            return None
+        return {
+            'name': entry,
+            'capacity': ProcReader(path / "capacity", bufsize=64),
+            'status': ProcReader(path / "status", bufsize=64),
+        }
+
+    def _read_device(self, device):
+        return device['name'], int(device['capacity'].read()), device['status'].read().strip().decode()
+
+
+class ProcessCollector:
+    """占用 CPU / 内存最多的进程
+
+    每次采样只 listdir 一次 /proc，与上次的 PID 集合比较：新出现的进程才打开它的 stat
+    文件并缓存文件描述符，消失的进程关闭描述符并丢弃状态，其余进程直接 pread 缓存的
+    描述符读取累计 CPU 时间，与上次的值相减得到使用率。缓存的描述符数量受
+    RLIMIT_NOFILE 限制，超出部分每次临时打开读取。前 N 名用 heapq.nlargest 选出。
+    """
+
+    TOP_N = 10
+    FD_RESERVE = 256  # 为应用其他部分保留的文件描述符数量
+    FD_LIMIT = 4096   # 最多缓存的描述符数量
+
+    def __init__(self, proc_root, sys_root):
+        self.proc_root = str(proc_root)
+        self._procs = {}  # pid -> [描述符或 None, 进程名, 启动时间, 上次 CPU 时间]
+        self._prev_time = None
+        self._open_fds = 0
+        self._fd_budget = self._compute_fd_budget()
+        self._clock_ticks = None
+        self._page_size = None
+
+    @classmethod
+    def _compute_fd_budget(cls):
+        try:
+            import resource
+            soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        except Exception:
+            return 0
+        if soft == resource.RLIM_INFINITY:
+            return cls.FD_LIMIT
+        return max(0, min(cls.FD_LIMIT, soft - cls.FD_RESERVE))
+
+    def _stat_path(self, pid):
+        return f"{self.proc_root}/{pid}/stat"
+
+    def _read_stat(self, pid, fd):
+        """读取 stat；有缓存描述符时直接 pread，否则临时打开"""
+        if fd is not None:
+            return os.pread(fd, 1024, 0)
+        fd = os.open(self._stat_path(pid), os.O_RDONLY)
+        try:
+            return os.pread(fd, 1024, 0)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _parse_stat(data):
+        """返回 (进程名, 启动时间, 累计 CPU 时间, 常驻内存页数)；进程名可能含空格和括号"""
+        head, _, tail = data.rpartition(b")")
+        fields = tail.split()
+        # tail 从第 3 个字段 state 开始：utime=14、stime=15、starttime=22、rss=24
+        return (
+            head.partition(b"(")[2].decode(errors="replace"),
+            int(fields[19]),
+            int(fields[11]) + int(fields[12]),
+            int(fields[21]),
+        )
+
+    def _forget(self, pid):
+        fd = self._procs.pop(pid)[0]
+        if fd is not None:
+            os.close(fd)
+            self._open_fds -= 1
+
+    def collect(self, now):
+        if self._clock_ticks is None:
+            self._clock_ticks = os.sysconf("SC_CLK_TCK")
+            self._page_size = os.sysconf("SC_PAGE_SIZE")
+
+        pids = {int(name) for name in os.listdir(self.proc_root) if name.isdigit()}
+        for pid in self._procs.keys() - pids:
+            self._forget(pid)
+        for pid in pids - self._procs.keys():
+            fd = None
+            if self._open_fds < self._fd_budget:
+                try:
+                    fd = os.open(self._stat_path(pid), os.O_RDONLY)
+                    self._open_fds += 1
+                except OSError:
+                    continue  # 进程已退出
+            self._procs[pid] = [fd, None, None, None]
+
+        dt = now - self._prev_time if self._prev_time is not None else None
+        self._prev_time = now
+        rows = []
+        for pid, state in list(self._procs.items()):
+            try:
+                name, start, cpu_time, rss = self._parse_stat(self._read_stat(pid, state[0]))
+            except (OSError, IndexError, ValueError):
+                # 进程已退出（描述符读取失败），下次 listdir 时如果 PID 被复用再重新打开
+                self._forget(pid)
+                continue
+            if state[2] != start:
+                # 新进程或 PID 被复用：本次只建立基线
+                state[1], state[2], state[3] = name, start, cpu_time
+                cpu_percent = 0.0
+            else:
+                cpu_percent = 100.0 * (cpu_time - state[3]) / self._clock_ticks / dt if dt else 0.0
+                state[3] = cpu_time
+            rows.append((pid, state[1], cpu_percent, rss * self._page_size))
+
+        return {
+            'count': len(rows),
+            'cpu': heapq.nlargest(self.TOP_N, rows, key=lambda row: row[2]),
+            'mem': heapq.nlargest(self.TOP_N, rows, key=lambda row: row[3]),
+        }
+
+    def close(self):
+        for pid in list(self._procs):
+            self._forget(pid)
+        self._prev_time = None
+
+
+class CgroupCollector:
+    """cgroup v2 资源使用
+
+    监控 paths 中配置的 cgroup（相对 cgroup2 挂载点，可含通配符，如
+    "system.slice/docker-*.scope"），未配置时监控本进程所在的 cgroup。每个 cgroup 的
+    cpu.stat、memory.current、memory.max、io.stat 和 *.pressure 文件常驻打开；
+    通配符每隔 RESCAN_SECONDS 重新展开一次，只为新出现的 cgroup 打开文件。
+    所有 cgroup 的累计计数排成一个扁平数组，一次算出 CPU、节流、I/O 和 PSI 速率。
+    """
+
+    FILES = ("cpu.stat", "memory.current", "memory.max", "io.stat", "cpu.pressure", "memory.pressure", "io.pressure")
+    # 每个 cgroup 的累计计数列
+    COUNTERS = (
+        "usage_usec", "nr_periods", "nr_throttled", "rbytes", "wbytes",
+        "cpu_some", "memory_some", "memory_full", "io_some", "io_full",
+    )
+    RESCAN_SECONDS = 10.0
+
+    def __init__(self, proc_root, sys_root):
+        self.proc_root = Path(proc_root)
+        self.paths = ()
+        self._mount = None
+        self._groups = None  # 名称 -> {文件名: ProcReader}
+        self._next_scan = 0.0
+        self._deltas = CounterDeltas()
+
+    def set_paths(self, paths):
+        self.paths = tuple(paths or ())
+        self._next_scan = 0.0
+
+    def _find_mount(self):
+        for line in (self.proc_root / "self" / "mounts").read_text().splitlines():
+            fields = line.split()
+            if len(fields) > 2 and fields[2] == "cgroup2":
+                return Path(fields[1])
+        raise FileNotFoundError("未找到 cgroup v2 挂载点")
+
+    def _own_cgroup(self):
+        for line in (self.proc_root / "self" / "cgroup").read_text().splitlines():
+            if line.startswith("0::"):
+                return line[3:]
+        return "/"
+
+    def _resolve(self):
+        """展开配置，返回 {名称: 目录}"""
+        resolved = {}
+        for pattern in self.paths or (self._own_cgroup(),):
+            pattern = pattern.strip().strip("/")
+            if not pattern:
+                matches = [self._mount]
+            elif any(char in pattern for char in "*?["):
+                matches = sorted(path for path in self._mount.glob(pattern) if path.is_dir())
+            else:
+                matches = [self._mount / pattern] if (self._mount / pattern).is_dir() else []
+            for path in matches:
+                relative = path.relative_to(self._mount).as_posix()
+                resolved["/" if relative == "." else "/" + relative] = path
+        return resolved
+
+    def _open_group(self, path):
+        readers = {}
+        for filename in self.FILES:
+            file = path / filename
+            if not file.exists() and filename.endswith(".pressure") and path == self._mount:
+                # 根 cgroup 没有 *.pressure，改读系统级的 /proc/pressure
+                file = self.proc_root / "pressure" / filename.split(".")[0]
+            if file.exists():
+                readers[filename] = ProcReader(file, bufsize=1024)
+        return readers
+
+    def _scan(self):
+        if self._mount is None:
+            self._mount = self._find_mount()
+        groups = self._groups or {}
+        resolved = self._resolve()
+        for name in groups.keys() - resolved.keys():
+            self._close_group(groups[name])
+        self._groups = {name: groups.get(name) or self._open_group(path) for name, path in resolved.items()}
+
+    @staticmethod
+    def _close_group(readers):
+        for reader in readers.values():
+            reader.close()
+
+    @staticmethod
+    def _parse_pressure(data):
+        """返回 (some 累计微秒, full 累计微秒)"""
+        totals = {}
+        for line in data.splitlines():
+            fields = line.split()
+            if fields:
+                totals[fields[0]] = int(fields[-1].partition(b"=")[2])
+        return totals.get(b"some", 0), totals.get(b"full", 0)
+
+    def _read_counters(self, readers, values):
+        """把一个 cgroup 的累计计数追加到 values，返回 (memory.current, memory.max)"""
+        stat = {}
+        if "cpu.stat" in readers:
+            for line in readers["cpu.stat"].read().splitlines():
+                key, _, value = line.partition(b" ")
+                stat[key] = int(value)
+        rbytes = wbytes = 0
+        if "io.stat" in readers:
+            for line in readers["io.stat"].read().splitlines():
+                for field in line.split()[1:]:
+                    key, _, value = field.partition(b"=")
+                    if key == b"rbytes":
+                        rbytes += int(value)
+                    elif key == b"wbytes":
+                        wbytes += int(value)
+        pressure = {}
+        for resource in ("cpu", "memory", "io"):
+            reader = readers.get(f"{resource}.pressure")
+            pressure[resource] = self._parse_pressure(reader.read()) if reader else (0, 0)
+
+        values.extend((
+            stat.get(b"usage_usec", 0), stat.get(b"nr_periods", 0), stat.get(b"nr_throttled", 0),
+            rbytes, wbytes,
+            pressure["cpu"][0], pressure["memory"][0], pressure["memory"][1],
+            pressure["io"][0], pressure["io"][1],
+        ))
+
+        current = int(readers["memory.current"].read()) if "memory.current" in readers else None
+        limit = None
+        if "memory.max" in readers:
+            raw = readers["memory.max"].read().strip()
+            limit = None if raw == b"max" else int(raw)
+        return current, limit
+
+    def collect(self, now):
+        if self._groups is None or now >= self._next_scan:
+            self._scan()
+            self._next_scan = now + self.RESCAN_SECONDS
+
+        names, values, memory = [], array('d'), []
+        for name, readers in list(self._groups.items()):
+            try:
+                memory.append(self._read_counters(readers, values))
+            except (OSError, ValueError):
+                # cgroup 已删除：丢弃已追加的部分，下次重新展开配置
+                del values[len(names) * len(self.COUNTERS):]
+                self._close_group(self._groups.pop(name))
+                self._next_scan = 0.0
+                continue
+            names.append(name)
+
+        deltas, dt = self._deltas.update(tuple(names), values, now)
+        width = len(self.COUNTERS)
+        result = {}
+        for i, name in enumerate(names):
+            readers = self._groups[name]
+            d = dict(zip(self.COUNTERS, deltas[i * width:(i + 1) * width])) if dt else dict.fromkeys(self.COUNTERS, 0.0)
+            dt_usec = (dt or 1) * 1e6
+            has_cpu, has_io = "cpu.stat" in readers, "io.stat" in readers
+            result[name] = {
+                'cpu_percent': 100.0 * d["usage_usec"] / dt_usec if has_cpu else None,
+                'throttled_percent': 100.0 * d["nr_throttled"] / d["nr_periods"] if d["nr_periods"] else 0.0,
+                'memory': memory[i][0],
+                'memory_max': memory[i][1],
+                'io_read': d["rbytes"] / dt if has_io and dt else (0.0 if has_io else None),
+                'io_write': d["wbytes"] / dt if has_io and dt else (0.0 if has_io else None),
+                'psi_cpu': 100.0 * d["cpu_some"] / dt_usec,
+                'psi_memory': 100.0 * d["memory_some"] / dt_usec,
+                'psi_memory_full': 100.0 * d["memory_full"] / dt_usec,
+                'psi_io': 100.0 * d["io_some"] / dt_usec,
+                'psi_io_full': 100.0 * d["io_full"] / dt_usec,
+            }
+        return result
+
+    def close(self):
+        for readers in (self._groups or {}).values():
+            self._close_group(readers)
+        self._groups = None
+
+
+# =============================================================================
+# 系统指标采样 - 一个后台线程为所有监控组件采样
+# =============================================================================
+
+class ProcReader:
+    """常驻打开的 /proc 文件
+
+    只在第一次读取时 open，之后每次用 os.pread 从偏移 0 重新读取内核生成的内容，
+    省去每次采样的 open/close。缓冲区不够时自动翻倍。
+    """
+
+    def __init__(self, path, bufsize=4096):
+        self.path = str(path)
+        self.bufsize = bufsize
+        self._fd = None
+
+    def read(self):
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDONLY)
+        try:
+            while True:
+                data = os.pread(self._fd, self.bufsize, 0)
+                if len(data) < self.bufsize:
+                    return data
+                self.bufsize *= 2
+        except OSError:
+            # 文件句柄失效时下次重新打开
+            self.close()
+            raise
+
+    def close(self):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+
+class SystemSampler:
+    """系统指标采样器
+
+    监控组件通过 acquire/release 声明使用；有使用者时后台线程每 interval 秒解析一次
+    /proc/stat 和 /proc/meminfo（Windows 上改用系统 API），计算与上次采样之间的 CPU
+    增量，然后整体替换 snapshot 字典。组件刷新时只读取最新快照，N 个监控组件每个
+    周期也只采样一次。每次采样同时追加到各序列的环形缓冲区，供图表显示历史。
+
+    每核 CPU、磁盘、网络、温度、电池等扩展指标按组（COLLECTORS 的键）登记，只有仍有
+    组件使用的组才会在每次采样时一并读取，结果放在快照的同名键下。
+
+    _sample_lock 串行化采样本身（读取文件、各采集器的增量状态），进程扫描等耗时读取
+    只持有它；_lock 只在登记使用者、替换快照和追加历史时短暂持有，界面线程读取历史
+    不会被一次慢采样阻塞。
+    """
+
+    INTERVAL = 1.0  # 秒
+    HISTORY_SIZE = 3600  # 每个序列保留的采样点数（1 秒间隔即一小时）
+    MEMINFO_KEYS = (b"MemTotal", b"MemAvailable", b"MemFree", b"Buffers", b"Cached")
+    COLLECTORS = {
+        'cores': CoreCollector,
+        'disk': DiskCollector,
+        'net': NetCollector,
+        'thermal': ThermalCollector,
+        'power': PowerCollector,
+        'processes': ProcessCollector,
+        'cgroups': CgroupCollector,
+    }
+
+    def __init__(self, interval=None, proc_root="/proc", sys_root="/sys"):
+        self.interval = self.INTERVAL if interval is None else interval
+        self.proc_root = Path(proc_root)
+        self.sys_root = Path(sys_root)
+        self._stat = ProcReader(self.proc_root / "stat")
+        self._meminfo = ProcReader(self.proc_root / "meminfo")
+        self._prev_cpu = None  # 上次采样的 (总时间, 空闲时间)
+        self._snapshot = None
+        self._history = {'cpu': RingBuffer(self.HISTORY_SIZE), 'mem': RingBuffer(self.HISTORY_SIZE)}
+        self._collectors = {}  # 组名 -> [采集器, 使用者数]
+        self._retired = []  # 已无使用者、等待采样结束后关闭的采集器
+        self.cgroup_paths = ()  # 容器资源组件监控的 cgroup，空表示本进程所在的 cgroup
+        self._failed_groups = set()
+        self._listeners = []  # 每次采样成功后以新快照调用（在采样线程中）
+        self._users = 0
+        self._failed = False
+        self._lock = threading.Lock()
+        self._sample_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.samples = 0
+        self.last_sample_ms = 0.0
+
+    def latest(self):
+        """最近一次采样的快照，尚未采样时为 None"""
+        return self._snapshot
+
+    def add_listener(self, callback):
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def history(self, series):
+        """某个序列（cpu / mem / disk_read / net_rx 等）按时间顺序的历史数据副本"""
+        with self._lock:
+            buffer = self._history.get(series)
+            return buffer.values() if buffer is not None else array('d')
+
+    def acquire(self, *groups):
+        """登记一个使用者及其需要的扩展指标组；第一个使用者启动采样线程并同步采样
+        一次供首帧显示，采样线程已在运行时只唤醒它立即补采"""
+        with self._lock:
+            self._users += 1
+            for group in groups:
+                entry = self._collectors.get(group)
+                if entry is None:
+                    entry = self._collectors[group] = [self._new_collector(group), 0]
+                entry[1] += 1
+            start = self._thread is None
+            if start:
+                self._wake.clear()
+                self._thread = threading.Thread(target=self._run, name="system-sampler", daemon=True)
+        snapshot = self._snapshot
+        if snapshot is None or any(group not in snapshot for group in groups):
+            if start:
+                self.sample()
+            else:
+                self._wake.set()
+        if start:
+            self._thread.start()
+
+    def set_cgroups(self, paths):
+        """设置要监控的 cgroup 列表（相对 cgroup2 挂载点，可含通配符）"""
+        with self._sample_lock, self._lock:
+            self.cgroup_paths = tuple(paths or ())
+            entry = self._collectors.get('cgroups')
+            if entry is not None:
+                entry[0].set_paths(self.cgroup_paths)
+
+    def _new_collector(self, group):
+        collector = self.COLLECTORS[group](self.proc_root, self.sys_root)
+        if group == 'cgroups':
+            collector.set_paths(self.cgroup_paths)
+        return collector
+
+    def release(self, *groups):
+        """注销一个使用者；不再有人使用的指标组关闭其文件，没有使用者后采样线程退出"""
+        with self._lock:
+            for group in groups:
+                entry = self._collectors.get(group)
+                if entry is None:
+                    continue
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    # 采样线程可能正在使用它，由下一次采样或线程退出时关闭
+                    self._retired.append(entry[0])
+                    del self._collectors[group]
+            self._users = max(0, self._users - 1)
+            if not self._users:
+                self._wake.set()
+
+    def sample(self, *groups):
+        """采样一次并发布新快照，返回该快照
+
+        groups 为本次额外采集、但没有登记使用者的指标组（用于离屏渲染）。
+        """
+        started = time.perf_counter()
+        with self._sample_lock:
+            self._close_retired()
+            try:
+                total, idle = self._read_cpu_times()
+                mem_total, mem_available = self._read_memory()
+            except Exception as e:
+                if not self._failed:
+                    logger.warning(f"系统指标采样失败: {e}")
+                    self._failed = True
+                return self._snapshot
+
+            cpu_percent = self._snapshot['cpu_percent'] if self._snapshot else 0.0
+            prev_total, prev_idle = self._prev_cpu or (0, 0)
+            delta_total = total - prev_total
+            if delta_total > 0:
+                cpu_percent = 100.0 * (delta_total - (idle - prev_idle)) / delta_total
+            self._prev_cpu = (total, idle)
+
+            snapshot = {
+                'time': time.time(),
+                'cpu_percent': min(100.0, max(0.0, cpu_percent)),
+                'mem_percent': 100.0 * (mem_total - mem_available) / mem_total if mem_total else 0.0,
+                'mem_total': mem_total,
+                'mem_available': mem_available,
+            }
+            self._collect_groups(snapshot, groups)
+
+            with self._lock:
+                self._snapshot = snapshot
+                self._history['cpu'].append(snapshot['cpu_percent'])
+                self._history['mem'].append(snapshot['mem_percent'])
+                self._append_group_history(snapshot)
+                listeners = list(self._listeners)
+            self._failed = False
+            self.samples += 1
+            self.last_sample_ms = (time.perf_counter() - started) * 1000
+        for callback in listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.warning(f"采样监听回调出错: {e}")
+        return snapshot
+
+    def _collect_groups(self, snapshot, extra_groups):
+        """读取所有在用的扩展指标组写入快照（持有 _sample_lock、不持有 _lock 时调用）"""
+        now = time.monotonic()
+        with self._lock:
+            collectors = {group: entry[0] for group, entry in self._collectors.items()}
+        temporary = set()  # 只为本次采样创建的采集器，用完即关
+        for group in extra_groups:
+            if group not in collectors:
+                collectors[group] = self._new_collector(group)
+                temporary.add(group)
+        for group, collector in collectors.items():
+            try:
+                snapshot[group] = collector.collect(now)
+                self._failed_groups.discard(group)
+            except Exception as e:
+                snapshot[group] = None
+                if group not in self._failed_groups:
+                    logger.warning(f"采集 {group} 指标失败: {e}")
+                    self._failed_groups.add(group)
+            finally:
+                if group in temporary:
+                    collector.close()
+
+    def _append_group_history(self, snapshot):
+        """磁盘、网络吞吐和各 cgroup 的 CPU 使用率追加到历史（持有 _lock 时调用）"""
+        # 磁盘、网络的总吞吐进入历史，供迷你图显示
+        for group, series in (('disk', ('disk_read', 'disk_write')), ('net', ('net_rx', 'net_tx'))):
+            rates = snapshot.get(group)
+            if rates is None:
+                continue
+            for column, name in enumerate(series):
+                self._append_history(name, sum(rate[column] for rate in rates.values()))
+
+        # 每个 cgroup 的 CPU 使用率历史；cgroup 消失后丢弃其缓冲区
+        cgroups = snapshot.get('cgroups')
+        if cgroups is not None:
+            for name, metrics in cgroups.items():
+                if metrics['cpu_percent'] is not None:
+                    self._append_history(f"cgroup:{name}", metrics['cpu_percent'])
+            for series in [series for series in self._history if series.startswith("cgroup:")]:
+                if series[len("cgroup:"):] not in cgroups:
+                    del self._history[series]
+
+    def _append_history(self, series, value):
+        buffer = self._history.get(series)
+        if buffer is None:
+            buffer = self._history[series] = RingBuffer(self.HISTORY_SIZE)
+        buffer.append(value)
+
+    def _close_retired(self):
+        """关闭已无使用者的采集器（持有 _sample_lock 时调用）"""
+        with self._lock:
+            retired, self._retired = self._retired, []
+        for collector in retired:
+            collector.close()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            # release 唤醒后若又有人 acquire，线程继续运行；不清除事件会让 wait 立即返回而空转
+            self._wake.clear()
+            with self._sample_lock:
+                with self._lock:
+                    stopping = not self._users
+                    if stopping:
+                        self._thread = None
+                        self._retired.extend(collector for collector, _ in self._collectors.values())
+                if stopping:
+                    self._close_retired()
+                    for reader in (self._stat, self._meminfo):
+                        reader.close()
+                    return
+            self.sample()
+
+    def _read_cpu_times(self):
+        """返回累计的 (总时间, 空闲时间)"""
+        if os.name == "nt":
+            return self._read_cpu_times_windows()
+        # 第一行: cpu user nice system idle iowait irq softirq steal guest guest_nice
+        # guest 已计入 user，只累加前 8 项
+        line = self._stat.read().split(b"\n", 1)[0]
+        fields = [int(v) for v in line.split()[1:9]]
+        return sum(fields), fields[3] + fields[4]
+
+    def _read_memory(self):
+        """返回 (总内存, 可用内存)，单位字节"""
+        if os.name == "nt":
+            return self._read_memory_windows()
+        values = {}
+        for line in self._meminfo.read().split(b"\n"):
+            key, _, rest = line.partition(b":")
+            if key in self.MEMINFO_KEYS:
+                values[key] = int(rest.split()[0]) * 1024
+                if len(values) == len(self.MEMINFO_KEYS):
+                    break
+        available = values.get(b"MemAvailable")
+        if available is None:
+            # 3.14 以前的内核没有 MemAvailable
+            available = values.get(b"MemFree", 0) + values.get(b"Buffers", 0) + values.get(b"Cached", 0)
+        return values[b"MemTotal"], available
+
+    @staticmethod
+    def _read_cpu_times_windows():
+        import ctypes
+        idle, kernel, user = ctypes.c_ulonglong(), ctypes.c_ulonglong(), ctypes.c_ulonglong()
+        if not ctypes.windll.kernel32.GetSystemTimes(ctypes.byref(idle), ctypes.byref(kernel), ctypes.byref(user)):
+            raise OSError("GetSystemTimes 调用失败")
+        # 内核时间已包含空闲时间
+        return kernel.value + user.value, idle.value
+
+    @staticmethod
+    def _read_memory_windows():
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong),
+                ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+            ]
+
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            raise OSError("GlobalMemoryStatusEx 调用失败")
+        return status.ullTotalPhys, status.ullAvailPhys
+
+
+_system_sampler = SystemSampler()
+
+
+# =============================================================================
+# 数据总线 - 组件按主题订阅共享数据
+# =============================================================================
+
+class TopicProvider:
+    """主题数据源基类
+
+    一个数据源负责一个前缀下的所有主题（如 "fx." 下的 fx.USD/CNY）。总线在某个主题
+    出现第一个订阅者时调用 start，最后一个订阅者退订时调用 stop；compute 同步算出
+    主题的当前值（没有数据时返回 None），用于首次订阅和离屏渲染。
+    threaded 为 True 表示会在后台线程中发布，poll_ms 是它大约多久发布一次。
+    """
+
+    threaded = False
+    poll_ms = None
+
+    def compute(self, topic):
+        return None
+
+    def start(self, bus, topic):
+        pass
+
+    def stop(self, bus, topic):
+        pass
+
+    def published(self, topic, value):
+        """主题的新值已分发给订阅者（在主线程中调用）"""
+
+
+class DataBus:
+    """进程内数据总线
+
+    数据源按前缀登记并声明值类型，发布时检查类型；组件订阅主题而不是各自读取数据，
+    同一主题不论有多少订阅者都只由数据源计算一次。每个主题保留最新值，后来的订阅者
+    订阅时立即收到；主题没有订阅者后数据源停止，保留值也随之丢弃。
+
+    主线程中的发布同步分发；后台线程的发布先按主题合并（只留最新值），由调度器按
+    数据源的发布周期（空闲省电时按刷新策略的更长间隔）在主线程中取出分发，与其他
+    定时刷新合并唤醒，回调始终在 Tk 主线程中执行。从发布到分发完成后的下一次空闲
+    （画布已重绘）之间的耗时按主题统计，见 metrics()。
+    """
+
+    def __init__(self):
+        self.root = None
+        self.scheduler = None
+        self._main_thread = threading.main_thread()
+        self._providers = {}    # 前缀 -> (数据源, 值类型)
+        self._subscribers = {}  # 主题 -> {令牌: 回调}
+        self._topics = {}       # 令牌 -> 主题
+        self._retained = {}     # 主题 -> 最新值
+        self._pending = {}      # 主题 -> (值, 发布时刻)，后台线程发布、等待主线程分发
+        self._stats = {}        # 主题 -> [发布次数, 分发次数, 累计延迟, 最大延迟, 延迟样本数]
+        self._lock = threading.Lock()
+        self._next_token = 0
+        self._poll_token = None
+        self.refresh_policy = None
+
+    def attach(self, root, scheduler, refresh_policy=None):
+        """绑定 Tk 主循环和调度器（在主线程中调用）；后台发布的分发和数据源的定时刷新都
+        使用 scheduler，refresh_policy 进入空闲省电时分发间隔随之变长"""
+        self.root = root
+        self.scheduler = scheduler
+        self._main_thread = threading.current_thread()
+        if refresh_policy is not None:
+            self.refresh_policy = refresh_policy
+            refresh_policy.add_listener(self._update_poll)
+
+    def register(self, prefix, provider, value_type):
+        self._providers[prefix] = (provider, value_type)
+
+    def _provider(self, topic):
+        for prefix, entry in self._providers.items():
+            if topic.startswith(prefix):
+                return entry
+        raise KeyError(f"没有数据源提供主题 {topic}")
+
+    def subscribe(self, topic, callback):
+        """订阅主题，返回令牌；已有值时立即以该值回调一次"""
+        provider, _ = self._provider(topic)
+        self._next_token += 1
+        token = self._next_token
+        subscribers = self._subscribers.get(topic)
+        if subscribers is None:
+            provider.start(self, topic)
+            subscribers = self._subscribers[topic] = {}
+            self._stats.setdefault(topic, [0, 0, 0.0, 0.0, 0])
+            value = provider.compute(topic)
+            if value is not None:
+                self.publish(topic, value)
+        subscribers[token] = callback
+        self._topics[token] = topic
+        if provider.threaded:
+            self._update_poll()
+
+        value = self._retained.get(topic)
+        if value is not None:
+            self._call(callback, topic, value)
+        return token
+
+    def unsubscribe(self, token):
+        """退订；主题的最后一个订阅者退订后停止数据源"""
+        topic = self._topics.pop(token, None)
+        if topic is None:
+            return
+        subscribers = self._subscribers[topic]
+        subscribers.pop(token, None)
+        if subscribers:
+            return
+        del self._subscribers[topic]
+        self._retained.pop(topic, None)
+        with self._lock:
+            self._pending.pop(topic, None)
+        provider = self._provider(topic)[0]
+        try:
+            provider.stop(self, topic)
+        except Exception as e:
+            logger.warning(f"停止数据源失败 ({topic}): {e}")
+        if provider.threaded:
+            self._update_poll()
+
+    def latest(self, topic, default=None):
+        """主题的保留值"""
+        return self._retained.get(topic, default)
+
+    def read(self, topic):
+        """主题的当前值：有保留值时直接返回，否则让数据源同步计算一次（不保留）"""
+        value = self._retained.get(topic)
+        if value is None:
+            value = self._provider(topic)[0].compute(topic)
+        return value
+
+    def publish(self, topic, value):
+        """发布主题的新值；没有订阅者的主题直接丢弃"""
+        _, value_type = self._provider(topic)
+        if not isinstance(value, value_type):
+            raise TypeError(f"主题 {topic} 的值应为 {value_type.__name__}，实际为 {type(value).__name__}")
+        published_at = time.perf_counter()
+        if self.root is not None and threading.current_thread() is not self._main_thread:
+            with self._lock:
+                self._pending[topic] = (value, published_at)
+            return
+        self._deliver(topic, value, published_at)
+
+    def _deliver(self, topic, value, published_at):
+        subscribers = self._subscribers.get(topic)
+        if subscribers is None:
+            return
+        self._retained[topic] = value
+        stats = self._stats[topic]
+        stats[0] += 1
+        for callback in list(subscribers.values()):
+            self._call(callback, topic, value)
+            stats[1] += 1
+        try:
+            self._provider(topic)[0].published(topic, value)
+        except Exception as e:
+            logger.warning(f"数据源处理发布失败 ({topic}): {e}")
+
+        if self.root is not None:
+            self.root.after_idle(lambda: self._record_latency(stats, published_at))
+        else:
+            self._record_latency(stats, published_at)
+
+    @staticmethod
+    def _record_latency(stats, published_at):
+        latency = (time.perf_counter() - published_at) * 1000
+        stats[2] += latency
+        stats[3] = max(stats[3], latency)
+        stats[4] += 1
+
+    @staticmethod
+    def _call(callback, topic, value):
+        try:
+            callback(value)
+        except Exception as e:
+            logger.warning(f"主题 {topic} 的订阅回调出错: {e}")
+
+    def _poll_period(self):
+        """后台发布的分发间隔（毫秒）：在用的后台数据源中最长的发布周期，不短于刷新策略
+        的间隔；没有在用的后台数据源时为 None"""
+        periods = [
+            provider.poll_ms for provider in {self._provider(topic)[0] for topic in self._subscribers}
+            if provider.threaded
+        ]
+        if not periods:
+            return None
+        period = max(periods)
+        if self.refresh_policy is not None:
+            period = max(period, self.refresh_policy.interval_for())
+        return period
+
+    def _update_poll(self):
+        """按当前在用的数据源和刷新策略订阅、调整或取消分发"""
+        if self.scheduler is None:
+            return
+        period = self._poll_period()
+        if period is None:
+            if self._poll_token is not None:
+                self.scheduler.unsubscribe(self._poll_token)
+                self._poll_token = None
+        elif self._poll_token is None:
+            self._poll_token = self.scheduler.subscribe(self._poll, period)
+        else:
+            self.scheduler.set_period(self._poll_token, period)
+
+    def _poll(self):
+        """分发后台线程的发布"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for topic, (value, published_at) in pending.items():
+            self._deliver(topic, value, published_at)
+
+    def metrics(self):
+        """每个主题的发布/分发次数、订阅者数和发布到绘制完成的延迟（毫秒）"""
+        result = {}
+        for topic, (published, delivered, total, peak, samples) in self._stats.items():
+            result[topic] = {
+                'published': published,
+                'delivered': delivered,
+                'subscribers': len(self._subscribers.get(topic, ())),
+                'latency_avg_ms': round(total / samples, 3) if samples else None,
+                'latency_max_ms': round(peak, 3) if samples else None,
+            }
+        return result
+
+
+class SystemProvider(TopicProvider):
+    """系统指标主题：system.cpu、system.memory（使用率百分比）
+
+    有订阅者时登记为共享采样器的使用者，每次采样在采样线程中发布一次。
+    """
+
+    threaded = True
+    TOPICS = {'system.cpu': 'cpu_percent', 'system.memory': 'mem_percent'}
+
+    def __init__(self, sampler):
+        self.sampler = sampler
+        self.poll_ms = int(sampler.interval * 1000)
+        self._bus = None
+        self._active = set()
+
+    def compute(self, topic):
+        key = self.TOPICS[topic]
+        snapshot = self.sampler.latest()
+        return None if snapshot is None else float(snapshot[key])
+
+    def start(self, bus, topic):
+        if topic not in self.TOPICS:
+            raise KeyError(f"未知的系统指标主题 {topic}")
+        if not self._active:
+            self._bus = bus
+            self.sampler.add_listener(self._on_sample)
+            self.sampler.acquire()
+        self._active.add(topic)
+
+    def stop(self, bus, topic):
+        self._active.discard(topic)
+        if not self._active:
+            self.sampler.remove_listener(self._on_sample)
+            self.sampler.release()
+
+    def _on_sample(self, snapshot):
+        for topic in list(self._active):
+            self._bus.publish(topic, float(snapshot[self.TOPICS[topic]]))
+
+
+class TodoListProvider(TopicProvider):
+    """待办列表主题：todo.list/<列表 ID>，值为 ((内容, 是否完成), ...)
+
+    每个列表保存在 <目录>/<列表 ID>.json 中，发布新值时后台合并写入，多个待办组件
+    不再互相覆盖同一个文件。旧版 todos.json 由第一个还没有文件的列表认领。
+    """
+
+    PREFIX = "todo.list/"
+
+    def __init__(self, directory, legacy_json=None):
+        self.directory = Path(directory)
+        self.legacy_json = Path(legacy_json) if legacy_json else None
+        self._stored = {}  # 列表 ID -> 最近一次读取或写入的值，相同时不再落盘
+
+    def path(self, list_id):
+        return self.directory / f"{list_id}.json"
+
+    def compute(self, topic):
+        list_id = topic[len(self.PREFIX):]
+        path = self.path(list_id)
+        if not path.exists() and not self._migrate_legacy(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                todos = json.load(f).get('todos', [])
+            value = tuple((str(text), bool(completed)) for text, completed in todos)
+        except Exception as e:
+            logger.warning(f"加载待办事项失败 ({list_id}): {e}")
+            return None
+        self._stored[list_id] = value
+        return value
+
+    def published(self, topic, value):
+        list_id = topic[len(self.PREFIX):]
+        if self._stored.get(list_id) == value:
+            return
+        self._stored[list_id] = value
+        path = self.path(list_id)
+        data = {'todos': [list(todo) for todo in value]}
+        _persistence.submit(path, lambda: write_json_atomic(path, data))
+
+    def stop(self, bus, topic):
+        self._stored.pop(topic[len(self.PREFIX):], None)
+
+    def compact(self, live_ids):
+        """删除不属于任何现存组件的待办列表文件"""
+        live = {f"{list_id}.json" for list_id in live_ids}
+        removed = 0
+        if not self.directory.exists():
+            return removed
+        for path in self.directory.glob("*.json"):
+            if path.name not in live:
+                try:
+                    path.unlink()
+                    removed += 1
+                except Exception as e:
+                    logger.warning(f"删除孤立待办列表失败 ({path.name}): {e}")
+        if removed:
+            logger.info(f"已清理 {removed} 个孤立待办列表")
+        return removed
+
+    def _migrate_legacy(self, path):
+        """把旧 todos.json 移动为 path，成功返回 True"""
+        if not self.legacy_json or not self.legacy_json.exists():
+            return False
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self.legacy_json, path)
+            logger.info(f"已将 todos.json 迁移到 {path.name}")
+            return True
+        except Exception as e:
+            logger.error(f"迁移旧待办事项失败: {e}")
+            return False
+
+
+class FxProvider(TopicProvider):
+    """汇率主题：fx.<基准货币>/<报价货币>，值为 1 单位基准货币兑换的报价货币数
+
+    汇率来自内置的 RATES 表（可反向换算），有订阅者时每 REFRESH_MS 重新发布一次；
+    接入在线汇率时覆盖 quote 即可。
+    """
+
+    PREFIX = "fx."
+    REFRESH_MS = 5 * 60 * 1000
+    RATES = {('USD', 'CNY'): 7.24, ('EUR', 'CNY'): 7.85}
+
+    def __init__(self):
+        self._bus = None
+        self._active = set()
+        self._token = None
+
+    def quote(self, base, quote):
+        if (base, quote) in self.RATES:
+            return self.RATES[(base, quote)]
+        if (quote, base) in self.RATES:
+            return 1 / self.RATES[(quote, base)]
+        raise KeyError(f"没有 {base}/{quote} 的汇率")
+
+    def compute(self, topic):
+        base, _, quote = topic[len(self.PREFIX):].partition("/")
+        return float(self.quote(base, quote))
+
+    def start(self, bus, topic):
+        self.compute(topic)  # 不支持的货币对直接报错
+        self._active.add(topic)
+        if self._token is None and bus.scheduler is not None:
+            self._bus = bus
+            self._token = bus.scheduler.subscribe(self._refresh, self.REFRESH_MS)
+
+    def stop(self, bus, topic):
+        self._active.discard(topic)
+        if not self._active and self._token is not None:
+            bus.scheduler.unsubscribe(self._token)
+            self._token = None
+
+    def _refresh(self):
+        for topic in list(self._active):
+            try:
+                self._bus.publish(topic, self.compute(topic))
+            except Exception as e:
+                logger.warning(f"刷新汇率失败 ({topic}): {e}")
+
+
+_todo_provider = TodoListProvider(
+    Path.home() / ".dashwidgets" / "todos",
+    legacy_json=Path.home() / ".dashwidgets" / "todos.json"
+)
+_data_bus = DataBus()
+_data_bus.register("system.", SystemProvider(_system_sampler), float)
+_data_bus.register(TodoListProvider.PREFIX, _todo_provider, tuple)
+_data_bus.register(FxProvider.PREFIX, FxProvider(), float)
+
+
+# =============================================================================
+# 定时调度器 - 合并所有组件的周期刷新
+# =============================================================================
+
+class TickScheduler:
+    """应用级定时调度器
+
+    组件通过 subscribe 注册周期回调，调度器按墙上时钟对齐到周期边界（例如整秒），
+    同一时刻到期的回调在一次 after 唤醒中批量触发；subscribe_calendar 用于午夜
+    翻日等日历边界唤醒，无需轮询。回调出错时保留订阅，连续出错的周期回调按指数退避
+    （最长 MAX_BACKOFF_MS）延后下一次触发，成功一次后恢复原周期。
+    """
+
+    MAX_BACKOFF_MS = 60 * 1000
+
+    def __init__(self, root):
+        self.root = root
+        self._subscribers = {}  # token -> [callback, period_ms, boundary, next_due, 连续失败次数]
+        self._next_token = 0
+        self._after_id = None
+        self._scheduled_due = None
+
+    @staticmethod
+    def _next_period_due(now, period_ms):
+        """计算下一个对齐到周期边界的时间点（秒）"""
+        period = period_ms / 1000
+        return (int(now / period) + 1) * period
+
+    @staticmethod
+    def _next_calendar_due(boundary):
+        """计算下一个日历边界的时间点（秒）"""
+        now = datetime.datetime.now()
+        if boundary == "minute":
+            target = now.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        elif boundary == "hour":
+            target = now.replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=1)
+        else:
+            target = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time())
+        return target.timestamp()
+
+    def _compute_due(self, entry, now):
+        period_ms, boundary, failures = entry[1], entry[2], entry[4]
+        if boundary:
+            return self._next_calendar_due(boundary)
+        if failures:
+            period_ms = min(period_ms * 2 ** failures, max(period_ms, self.MAX_BACKOFF_MS))
+        return self._next_period_due(now, period_ms)
+
+    def _add(self, callback, period_ms, boundary):
+        token = self._next_token
+        self._next_token += 1
+        entry = [callback, period_ms, boundary, 0.0, 0]
+        entry[3] = self._compute_due(entry, time.time())
+        self._subscribers[token] = entry
+        self._reschedule()
+        return token
+
+    def subscribe(self, callback, period_ms):
+        """注册周期回调，返回订阅令牌"""
+        return self._add(callback, max(1, int(period_ms)), None)
+
+    def subscribe_calendar(self, callback, boundary="day"):
+        """注册日历边界回调，boundary 可为 day / hour / minute"""
+        return self._add(callback, 0, boundary)
+
+    def unsubscribe(self, token):
+        """取消订阅"""
+        if self._subscribers.pop(token, None) is not None and not self._subscribers:
+            self._cancel_wakeup()
+
+    def set_period(self, token, period_ms):
+        """修改周期订阅的间隔，下一次触发重新对齐到新周期边界"""
+        entry = self._subscribers.get(token)
+        if entry is None or entry[2]:
+            return
+        entry[1] = max(1, int(period_ms))
+        entry[3] = self._next_period_due(time.time(), entry[1])
+        self._reschedule()
+
+    def _cancel_wakeup(self):
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+        self._after_id = None
+        self._scheduled_due = None
+
+    def _reschedule(self):
+        """按最早到期时间安排唯一一次唤醒"""
+        if not self._subscribers:
+            self._cancel_wakeup()
+            return
+
+        due = min(entry[3] for entry in self._subscribers.values())
+        if self._after_id is not None and self._scheduled_due is not None and self._scheduled_due <= due:
+            return
+
+        self._cancel_wakeup()
+        delay = max(1, int((due - time.time()) * 1000 + 0.999))
+        try:
+            self._after_id = self.root.after(delay, self._tick)
+            self._scheduled_due = due
+        except Exception as e:
+            logger.warning(f"调度器唤醒失败: {e}")
+
+    def _tick(self):
+        """唤醒一次，批量触发所有到期回调"""
+        self._after_id = None
+        self._scheduled_due = None
+        now = time.time()
+
+        due_tokens = [token for token, entry in self._subscribers.items() if entry[3] <= now]
+        for token in due_tokens:
+            entry = self._subscribers.get(token)
+            if entry is None:
+                continue
+            try:
+                entry[0]()
+                entry[4] = 0
+            except Exception as e:
+                entry[4] += 1
+                # 连续失败时只在第 1、2、4、8... 次记录，避免刷屏
+                if entry[4] & (entry[4] - 1) == 0:
+                    logger.warning(f"定时回调出错（连续 {entry[4]} 次），稍后重试: {e}")
+            # 回调内可能修改了订阅，基于当前时间重新对齐，避免休眠后连续补发
+            if token in self._subscribers:
+                entry[3] = self._compute_due(entry, time.time())
+
+        self._reschedule()
+
+
+# =============================================================================
+# 动画过渡类 - 实现丝滑的动画效果
+# =============================================================================
+
+class Tween:
+    """补间动画句柄
+
+    由 FrameClock 统一驱动，进度按 time.perf_counter 计算而非帧数，
+    负载高时直接跳帧。可通过 cancel 取消，或通过 retarget 从当前值平滑转向新目标。
+    """
+
+    def __init__(self, clock, start, end, duration, apply, easing, callback):
+        self.clock = clock
+        self.start = tuple(start)
+        self.end = tuple(end)
+        self.value = self.start
+        self.duration = max(0.001, duration / 1000)
+        self.apply = apply
+        self.easing = easing
+        self.callback = callback
+        self.start_time = time.perf_counter()
+        self.done = False
+
+    def step(self, now):
+        """推进到 now 时刻，返回动画是否结束"""
+        t = (now - self.start_time) / self.duration
+        if t >= 1:
+            self.value = self.end
+        else:
+            progress = self.easing(t)
+            self.value = tuple(s + (e - s) * progress for s, e in zip(self.start, self.end))
+        self.apply(self.value)
+        return t >= 1
+
+    def cancel(self):
+        """取消动画，停留在当前值，不触发完成回调"""
+        self.done = True
+        self.clock.remove(self)
+
+    def retarget(self, end, duration=None):
+        """从当前值出发转向新的目标值"""
+        self.start = self.value
+        self.end = tuple(end)
+        if duration is not None:
+            self.duration = max(0.001, duration / 1000)
+        self.start_time = time.perf_counter()
+        if self.done:
+            self.done = False
+            self.clock.add(self)
+
+
+class FrameClock:
+    """帧时钟：所有活动补间和单帧回调在同一个 after 回调中按帧批量执行"""
+
+    FRAME_MS = 16
+
+    def __init__(self):
+        self._tweens = []
+        self._frame_callbacks = {}
+        self._host = None
+        self._after_id = None
+        self._next_frame = 0.0
+        self.frames = 0
+        self.dropped_frames = 0
+
+    @property
+    def active_count(self):
+        return len(self._tweens)
+
+    def tween(self, widget, start, end, duration, apply, easing=None, callback=None):
+        """创建并启动一个补间，返回 Tween 句柄"""
+        tween = Tween(self, start, end, duration, apply, easing or AnimationManager.ease_out_cubic, callback)
+        self._host = widget._root()
+        self.add(tween)
+        return tween
+
+    def request_frame(self, widget, callback):
+        """在下一帧执行一次 callback，同一帧内重复请求会被合并"""
+        self._host = widget._root()
+        self._frame_callbacks[callback] = None
+        self._ensure_running()
+
+    def add(self, tween):
+        if tween not in self._tweens:
+            self._tweens.append(tween)
+        self._ensure_running()
+
+    def remove(self, tween):
+        try:
+            self._tweens.remove(tween)
+        except ValueError:
+            pass
+
+    def _ensure_running(self):
+        if self._after_id is not None or self._host is None:
+            return
+        if not self._tweens and not self._frame_callbacks:
+            return
+        self._next_frame = time.perf_counter()
+        try:
+            self._after_id = self._host.after_idle(self._frame)
+        except Exception:
+            self._tweens.clear()
+            self._frame_callbacks.clear()
+
+    def _frame(self):
+        """推进所有活动补间"""
+        self._after_id = None
+        now = time.perf_counter()
+        self.frames += 1
+
+        callbacks = list(self._frame_callbacks)
+        self._frame_callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"帧回调出错: {e}")
+
+        for tween in self._tweens[:]:
+            try:
+                finished = tween.step(now)
+            except Exception:
+                # 目标控件已销毁等情况，直接丢弃该补间
+                tween.done = True
+                self.remove(tween)
+                continue
+            if finished:
+                tween.done = True
+                self.remove(tween)
+                if tween.callback:
+                    try:
+                        tween.callback()
+                    except Exception as e:
+                        logger.warning(f"动画回调出错: {e}")
+
+        if not self._tweens and not self._frame_callbacks:
+            return
+
+        # 落后时丢弃错过的帧，对齐到下一个帧边界
+        frame = self.FRAME_MS / 1000
+        self._next_frame += frame
+        now = time.perf_counter()
+        if now > self._next_frame:
+            missed = int((now - self._next_frame) / frame) + 1
+            self.dropped_frames += missed
+            self._next_frame += missed * frame
+
+        delay = max(1, int((self._next_frame - now) * 1000))
+        try:
+            self._after_id = self._host.after(delay, self._frame)
+        except Exception:
+            self._tweens.clear()
+            self._frame_callbacks.clear()
+
+
+class HoverTransitions:
+    """悬停颜色过渡管理
+
+    每个 (控件, 属性) 只保留一个进行中的补间，新的进入/离开事件从当前颜色重定向
+    该补间而不是再起一条动画链；同时进行的悬停动画数量有硬上限，超出时直接跳到终点色。
+    """
+
+    MAX_ACTIVE = 24
+
+    def __init__(self):
+        self._tweens = {}
+        self.coalesced = 0  # 被合并（重定向）的动画次数
+        self.capped = 0     # 因超过上限而直接跳到终点色的次数
 
-# 尺寸映射常量
-SIZE_MAP = {
-    "small": (150, 150),
-    "medium": (200, 200),
-    "large": (300, 300)
-}
+    @property
+    def active_count(self):
+        return sum(1 for tween in self._tweens.values() if not tween.done)
 
+    def transition(self, widget, attribute, end_color, duration=150):
+        """将控件属性颜色过渡到 end_color，返回 Tween 句柄（跳变时返回 None）"""
+        key = (str(widget), attribute)
+        end_rgb = tuple(c // 257 for c in widget.winfo_rgb(end_color))
 
-# =============================================================================
-# 工具函数
-# =============================================================================
+        tween = self._tweens.get(key)
+        if tween is not None and not tween.done:
+            tween.retarget(end_rgb, duration)
+            self.coalesced += 1
+            return tween
 
-def hex_to_rgb(hex_color):
-    """十六进制颜色转RGB"""
-    hex_color = hex_color.lstrip('#')
-    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+        # 清理已结束（包括控件销毁后被丢弃）的补间
+        for stale_key in [k for k, t in self._tweens.items() if t.done]:
+            del self._tweens[stale_key]
 
-def rgb_to_hex(rgb):
-    """RGB转十六进制颜色"""
-    return '#{:02x}{:02x}{:02x}'.format(int(rgb[0]), int(rgb[1]), int(rgb[2]))
+        if len(self._tweens) >= self.MAX_ACTIVE:
+            widget.config(**{attribute: end_color})
+            self.capped += 1
+            return None
 
-def lighten_color(hex_color, amount=20):
-    """使颜色变亮"""
-    rgb = hex_to_rgb(hex_color)
-    new_rgb = tuple(min(255, c + amount) for c in rgb)
-    return rgb_to_hex(new_rgb)
+        start_rgb = tuple(c // 257 for c in widget.winfo_rgb(widget.cget(attribute)))
 
-def darken_color(hex_color, amount=20):
-    """使颜色变暗"""
-    rgb = hex_to_rgb(hex_color)
-    new_rgb = tuple(max(0, c - amount) for c in rgb)
-    return rgb_to_hex(new_rgb)
+        def apply(rgb):
+            widget.config(**{attribute: '#%02x%02x%02x' % (int(rgb[0]), int(rgb[1]), int(rgb[2]))})
 
+        def finish():
+            if self._tweens.get(key) is tween:
+                del self._tweens[key]
+
+        tween = AnimationManager.clock.tween(widget, start_rgb, end_rgb, duration, apply, callback=finish)
+        self._tweens[key] = tween
+        return tween
 
-# =============================================================================
-# 动画过渡类 - 实现丝滑的动画效果
-# =============================================================================
 
 class AnimationManager:
     """动画管理器，处理所有UI动画效果"""
 
+    clock = FrameClock()
+    hover = HoverTransitions()
+
     @staticmethod
     def ease_out_cubic(t):
         """缓动函数：三次方缓出"""
@@ -288,114 +2828,56 @@ class AnimationManager:
     @staticmethod
     def animate_alpha(window, start_alpha, end_alpha, duration=300, callback=None):
         """透明度渐变动画"""
-        frames = int(duration / 16)  # 60fps
-        if frames == 0:
-            window.attributes('-alpha', end_alpha)
-            if callback:
-                callback()
-            return
-
-        current_alpha = start_alpha
-
-        def animate(frame):
-            nonlocal current_alpha
-            if frame >= frames:
-                window.attributes('-alpha', end_alpha)
-                if callback:
-                    callback()
-                return
-
-            # 应用缓动效果
-            progress = AnimationManager.ease_out_cubic(frame / frames)
-            current_alpha = start_alpha + (end_alpha - start_alpha) * progress
-            window.attributes('-alpha', current_alpha)
-            window.after(16, lambda: animate(frame + 1))
-
-        animate(0)
+        return AnimationManager.clock.tween(
+            window, (start_alpha,), (end_alpha,), duration,
+            lambda value: window.attributes('-alpha', value[0]),
+            callback=callback
+        )
 
     @staticmethod
     def animate_color(widget, attribute, start_color, end_color, duration=300, callback=None):
-        """颜色渐变动画"""
-        start_rgb = hex_to_rgb(start_color)
-        end_rgb = hex_to_rgb(end_color)
-        frames = int(duration / 16)
-
-        def animate(frame):
-            if frame >= frames:
-                widget.config(**{attribute: end_color})
-                if callback:
-                    callback()
-                return
-
-            progress = AnimationManager.ease_out_cubic(frame / frames)
-            current_rgb = tuple(
-                start_rgb[i] + (end_rgb[i] - start_rgb[i]) * progress
-                for i in range(3)
-            )
-            widget.config(**{attribute: rgb_to_hex(current_rgb)})
-            widget.after(16, lambda: animate(frame + 1))
+        """颜色渐变动画（RGB 分量只在创建补间时解析一次）"""
+        def apply(rgb):
+            widget.config(**{attribute: '#%02x%02x%02x' % (int(rgb[0]), int(rgb[1]), int(rgb[2]))})
 
-        animate(0)
+        return AnimationManager.clock.tween(
+            widget, hex_to_rgb(start_color), hex_to_rgb(end_color), duration, apply,
+            callback=callback
+        )
 
     @staticmethod
     def animate_scale(widget, start_scale, end_scale, duration=300, callback=None):
         """缩放动画"""
-        frames = int(duration / 16)
         current_scale = start_scale
 
-        def animate(frame):
+        def apply(value):
             nonlocal current_scale
-            if frame >= frames:
-                # 恢复原始大小
-                widget.scale('all', widget.winfo_width() / 2, widget.winfo_height() / 2,
-                            end_scale / current_scale, end_scale / current_scale)
-                current_scale = end_scale
-                if callback:
-                    callback()
-                return
-
-            progress = AnimationManager.ease_out_back(frame / frames)
-            new_scale = start_scale + (end_scale - start_scale) * progress
+            new_scale = value[0]
             scale_factor = new_scale / current_scale if current_scale > 0 else 1
             widget.scale('all', widget.winfo_width() / 2, widget.winfo_height() / 2,
-                        scale_factor, scale_factor)
+                         scale_factor, scale_factor)
             current_scale = new_scale
-            widget.after(16, lambda: animate(frame + 1))
 
-        animate(0)
+        return AnimationManager.clock.tween(
+            widget, (start_scale,), (end_scale,), duration, apply,
+            easing=AnimationManager.ease_out_back, callback=callback
+        )
 
     @staticmethod
     def animate_slide(widget, start_x, end_x, start_y, end_y, duration=300, callback=None):
         """滑动动画"""
-        frames = int(duration / 16)
-
-        def animate(frame):
-            if frame >= frames:
-                widget.place(x=end_x, y=end_y)
-                if callback:
-                    callback()
-                return
-
-            progress = AnimationManager.ease_out_cubic(frame / frames)
-            current_x = start_x + (end_x - start_x) * progress
-            current_y = start_y + (end_y - start_y) * progress
-            widget.place(x=current_x, y=current_y)
-            widget.after(16, lambda: animate(frame + 1))
-
-        animate(0)
+        return AnimationManager.clock.tween(
+            widget, (start_x, start_y), (end_x, end_y), duration,
+            lambda value: widget.place(x=value[0], y=value[1]),
+            callback=callback
+        )
 
     @staticmethod
     def create_glow_effect(canvas, x, y, radius, color):
         """创建发光效果"""
-        # 在Canvas上绘制多层圆形模拟发光
-        for i in range(radius, 0, -5):
-            # 由于Canvas不支持alpha，这里简化处理
-            canvas.create_oval(
-                x - i, y - i, x + i, y + i,
-                outline=color,
-                width=1,
-                tags="glow"
-            )
+        # 多层圆形预渲染为一张带透明度的图片，画布上只占一个元素
+        photo = _layer_cache.get(("glow", radius, color), lambda: render_glow(radius, color))
+        return canvas.create_image(x, y, image=photo, tags="glow")
 
 
 class HoverEffect:
@@ -407,7 +2889,6 @@ class HoverEffect:
         self.hover_bg_color = hover_bg_color
         self.duration = duration
         self.current_color = bg_color
-        self.animating = False
 
         # 绑定事件
         self.widget.bind('<Enter>', self._on_enter)
@@ -415,56 +2896,551 @@ class HoverEffect:
 
     def _on_enter(self, _=None):
         """鼠标进入时"""
-        if not self.animating:
-            self.animating = True
-            AnimationManager.animate_color(
-                self.widget, 'bg',
-                self.current_color, self.hover_bg_color,
-                self.duration,
-                lambda: setattr(self, 'animating', False)
-            )
-            self.current_color = self.hover_bg_color
+        self.current_color = self.hover_bg_color
+        AnimationManager.hover.transition(self.widget, 'bg', self.hover_bg_color, self.duration)
 
     def _on_leave(self, _=None):
         """鼠标离开时"""
-        if not self.animating:
-            self.animating = True
-            AnimationManager.animate_color(
-                self.widget, 'bg',
-                self.current_color, self.bg_color,
-                self.duration,
-                lambda: setattr(self, 'animating', False)
+        self.current_color = self.bg_color
+        AnimationManager.hover.transition(self.widget, 'bg', self.bg_color, self.duration)
+
+
+# =============================================================================
+# 可见性跟踪 - 不可见时暂停刷新
+# =============================================================================
+
+class VisibilityTracker:
+    """窗口可见性跟踪
+
+    综合 Map/Unmap/Visibility 事件、主动隐藏（withdraw）状态和屏幕范围判断窗口是否可见。
+    不可见期间 should_update 返回 False 并累计跳过次数，重新可见时触发一次补刷新。
+    """
+
+    def __init__(self, window, target=None, on_visible=None):
+        self.window = window
+        self.target = target or window  # 接收 Visibility 事件的控件（通常是铺满窗口的 Canvas）
+        self.on_visible = on_visible
+        self.mapped = True
+        self.obscured = False
+        self.withdrawn = False
+        self.offscreen = False
+        self.skipped_updates = 0
+        self._stale = False
+
+        window.bind('<Map>', self._on_map, add='+')
+        window.bind('<Unmap>', self._on_unmap, add='+')
+        self.target.bind('<Visibility>', self._on_visibility, add='+')
+
+    @property
+    def visible(self):
+        return self.mapped and not self.withdrawn and not self.obscured and not self.offscreen
+
+    def should_update(self):
+        """是否应执行本次刷新；不可见时记录跳过并标记需要补刷新"""
+        if self.visible:
+            return True
+        self.skipped_updates += 1
+        self._stale = True
+        return False
+
+    def set_withdrawn(self, withdrawn):
+        self.withdrawn = withdrawn
+        self._changed()
+
+    def update_bounds(self, x, y, width, height):
+        """根据窗口几何判断是否完全移出屏幕（每次重新读取虚拟桌面范围）"""
+        self.offscreen = not intersects_screen(self.window, x, y, width, height)
+        self._changed()
+
+    def _on_map(self, event):
+        if event.widget is self.window:
+            self.mapped = True
+            self._changed()
+
+    def _on_unmap(self, event):
+        if event.widget is self.window:
+            self.mapped = False
+
+    def _on_visibility(self, event):
+        if event.widget is self.target:
+            self.obscured = event.state == "VisibilityFullyObscured"
+            self._changed()
+
+    def _changed(self):
+        if self._stale and self.visible:
+            self._stale = False
+            if self.on_visible:
+                self.on_visible()
+
+
+# =============================================================================
+# 刷新策略 - 全局刷新间隔与空闲省电模式
+# =============================================================================
+
+class RefreshPolicy:
+    """刷新策略
+
+    数据类组件（如系统监控）按全局刷新间隔或组件自身覆盖值刷新；用户在若干分钟内
+    没有任何输入时整个应用进入低频模式，第一次输入立即恢复正常刷新频率。
+    """
+
+    IDLE_CHECK_MS = 5000
+
+    def __init__(self, root, scheduler, interval=2, idle_minutes=10, idle_interval=30):
+        self.root = root
+        self.scheduler = scheduler
+        self.interval_ms = int(interval * 1000)
+        self.idle_after = idle_minutes * 60
+        self.idle_interval_ms = int(idle_interval * 1000)
+        self.idle = False
+        self._last_input = time.monotonic()
+        self._last_pointer = None
+        self._listeners = []
+
+        # 应用内任意窗口的输入都会立即唤醒
+        for sequence in ('<Motion>', '<KeyPress>', '<ButtonPress>', '<MouseWheel>'):
+            root.bind_all(sequence, self._on_input, add='+')
+        self.scheduler.subscribe(self._check_idle, self.IDLE_CHECK_MS)
+
+    def add_listener(self, callback):
+        """注册策略变化回调（间隔修改、进入/退出空闲模式）"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        try:
+            self._listeners.remove(callback)
+        except ValueError:
+            pass
+
+    def set_interval(self, interval):
+        """修改全局刷新间隔（秒）"""
+        interval_ms = int(interval * 1000)
+        if interval_ms != self.interval_ms:
+            self.interval_ms = interval_ms
+            self._notify()
+
+    def interval_for(self, override=None):
+        """数据类组件的刷新间隔（毫秒），override 为组件自身设置的秒数"""
+        interval_ms = int(override * 1000) if override else self.interval_ms
+        if self.idle:
+            interval_ms = max(interval_ms, self.idle_interval_ms)
+        return interval_ms
+
+    def clock_period(self):
+        """时钟刷新周期：正常逐秒，空闲时逐分钟"""
+        return 60000 if self.idle else 1000
+
+    def _on_input(self, _=None):
+        self._last_input = time.monotonic()
+        if self.idle:
+            self.idle = False
+            logger.info("检测到用户输入，恢复正常刷新频率")
+            self._notify()
+
+    def _check_idle(self):
+        # 指针在其他程序窗口上移动同样视为活动
+        try:
+            pointer = self.root.winfo_pointerxy()
+        except Exception:
+            pointer = None
+        if pointer != self._last_pointer:
+            self._last_pointer = pointer
+            self._on_input()
+            return
+
+        if not self.idle and time.monotonic() - self._last_input >= self.idle_after:
+            self.idle = True
+            logger.info("用户空闲，进入低频刷新模式")
+            self._notify()
+
+    def _notify(self):
+        for callback in self._listeners[:]:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"应用刷新策略失败: {e}")
+
+
+# =============================================================================
+# 场景图 - 画布元素的保留模式管理
+# =============================================================================
+
+class SceneGraph:
+    """保留模式场景图
+
+    组件以节点（名称、类型、坐标、属性）声明画布内容，场景图记住每个节点最近一次
+    下发给 Tk 的坐标和属性；更新时只对真正变化的部分调用 coords/itemconfig。
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self._nodes = {}  # 名称 -> [item ID, 坐标, 属性]
+        self.calls_issued = 0   # 实际发出的 Tk 调用次数
+        self.calls_skipped = 0  # 因无变化而省略的调用次数
+
+    def __contains__(self, name):
+        return name in self._nodes
+
+    def item(self, name):
+        """节点对应的画布 item ID"""
+        return self._nodes[name][0]
+
+    def names(self, prefix=""):
+        return [name for name in self._nodes if name.startswith(prefix)]
+
+    def prop(self, name, key, default=None):
+        """节点最近一次下发的属性值"""
+        node = self._nodes.get(name)
+        return default if node is None else node[2].get(key, default)
+
+    def node(self, name, kind, coords, **props):
+        """声明节点：不存在则创建，已存在则按差异更新"""
+        if name in self._nodes:
+            self.update(name, coords, **props)
+            return self._nodes[name][0]
+
+        item = getattr(self.canvas, f"create_{kind}")(*coords, **props)
+        self._nodes[name] = [item, tuple(coords), props]
+        self.calls_issued += 1
+        return item
+
+    def update(self, name, coords=None, **props):
+        """更新节点，只下发发生变化的坐标和属性"""
+        node = self._nodes.get(name)
+        if node is None:
+            return
+        item, current_coords, current_props = node
+
+        if coords is not None:
+            coords = tuple(coords)
+            if coords != current_coords:
+                self.canvas.coords(item, *coords)
+                node[1] = coords
+                self.calls_issued += 1
+            else:
+                self.calls_skipped += 1
+
+        changed = {key: value for key, value in props.items() if current_props.get(key) != value}
+        if changed:
+            self.canvas.itemconfig(item, **changed)
+            current_props.update(changed)
+            self.calls_issued += 1
+        elif props:
+            self.calls_skipped += 1
+
+    def remove(self, name):
+        node = self._nodes.pop(name, None)
+        if node is not None:
+            self.canvas.delete(node[0])
+
+
+# =============================================================================
+# 图表 - 迷你图、折线图和仪表盘
+# =============================================================================
+
+class Chart:
+    """画布图表
+
+    kind 为 "sparkline"（只有折线）、"line"（带边框和网格线的折线图）或 "gauge"（仪表盘弧线）。
+    节点由场景图管理：每个序列只创建一条 line，之后刷新只用 coords 更新顶点；
+    序列先用 LTTB 降采样到不超过图表的像素宽度。max_value 为 None 时按当前数据的
+    最大值自动缩放（吞吐量等没有固定上限的指标）。
+    """
+
+    GRID_LINES = (0.25, 0.5, 0.75)
+    GAUGE_START = 225    # 度：Tk 以 3 点钟方向为 0，逆时针为正
+    GAUGE_EXTENT = -270  # 顺时针扫过 270 度
+
+    def __init__(self, scene, name, kind="line", colors=("#007AFF",), max_value=100.0, line_width=2, grid_color="#E0E0E0"):
+        self.scene = scene
+        self.name = name
+        self.kind = kind
+        self.colors = colors
+        self.max_value = max_value
+        self.line_width = line_width
+        self.grid_color = grid_color
+        self.box = None
+        self._series = ()  # 最近一次的数据，重新布局时用来重画
+        self._scale = max_value or 1.0
+
+    def place(self, box):
+        """设置图表区域 (x0, y0, x1, y1)，首次调用时创建静态节点"""
+        self.box = tuple(box)
+        x0, y0, x1, y1 = self.box
+        if self.kind == "line":
+            self.scene.node(f"{self.name}_frame", "rectangle", self.box, outline=self.grid_color, width=1)
+            for i, fraction in enumerate(self.GRID_LINES):
+                y = y1 - (y1 - y0) * fraction
+                self.scene.node(f"{self.name}_grid{i}", "line", (x0, y, x1, y), fill=self.grid_color, width=1)
+        elif self.kind == "gauge":
+            self.scene.node(
+                f"{self.name}_track", "arc", self.box,
+                start=self.GAUGE_START, extent=self.GAUGE_EXTENT,
+                style="arc", outline=self.grid_color, width=self.line_width
+            )
+        self.update(*self._series)
+
+    def update(self, *series):
+        """刷新数据：折线类每个参数是一条序列，仪表盘只取一个数值"""
+        self._series = series
+        if self.box is None or not series:
+            return
+        if self.kind == "gauge":
+            self.scene.node(
+                f"{self.name}_arc", "arc", self.box,
+                start=self.GAUGE_START, extent=self.GAUGE_EXTENT * self._fraction(series[0] or 0),
+                style="arc", outline=self.colors[0], width=self.line_width
+            )
+            return
+        if self.max_value is None:
+            self._scale = max((max(values) for values in series if len(values)), default=0.0) or 1.0
+        for i, values in enumerate(series):
+            self.scene.node(
+                f"{self.name}_line{i}", "line", self._points(values),
+                fill=self.colors[i % len(self.colors)], width=self.line_width
+            )
+
+    def _fraction(self, value):
+        return min(1.0, max(0.0, value / self._scale))
+
+    def _points(self, values):
+        """序列 -> 画布顶点坐标（扁平元组）"""
+        x0, y0, x1, y1 = self.box
+        width, height = x1 - x0, y1 - y0
+        n = len(values)
+        if n < 2:
+            # 数据不足两个点时画一条水平线
+            y = y1 - height * self._fraction(values[0] if n else 0)
+            return (x0, y, x1, y)
+
+        step = width / (n - 1)
+        points = []
+        for index, value in lttb(values, max(3, int(width))):
+            points.append(x0 + index * step)
+            points.append(y1 - height * self._fraction(value))
+        return tuple(points)
+
+
+# =============================================================================
+# 离屏画布 - 不依赖显示环境的 Pillow 画布后端
+# =============================================================================
+
+class PillowCanvas:
+    """离屏画布
+
+    实现组件绘制用到的 tk.Canvas 子集（create_*、coords、itemconfig、delete），图元按创建
+    顺序记录在内存中，render() 时用 Pillow 画成图片；事件绑定类接口为空操作。
+    与场景图配合，组件的 _create_*_widget 代码无需修改即可离屏渲染。
+    """
+
+    # Tk 锚点 -> Pillow 文本锚点
+    TEXT_ANCHORS = {
+        "center": "mm", "n": "mt", "s": "mb", "e": "rm", "w": "lm",
+        "nw": "lt", "ne": "rt", "sw": "lb", "se": "rb"
+    }
+
+    def __init__(self, width, height, bg="#FFFFFF", **options):
+        self.width = width
+        self.height = height
+        self.options = dict(options, bg=bg)
+        self._items = {}  # item ID -> [类型, 坐标, 属性]
+        self._next_id = 1
+
+    def _create(self, kind, coords, props):
+        if len(coords) == 1 and isinstance(coords[0], (tuple, list)):
+            coords = coords[0]
+        item = self._next_id
+        self._next_id += 1
+        self._items[item] = [kind, tuple(coords), dict(props)]
+        return item
+
+    def create_text(self, *coords, **props):
+        return self._create("text", coords, props)
+
+    def create_line(self, *coords, **props):
+        return self._create("line", coords, props)
+
+    def create_rectangle(self, *coords, **props):
+        return self._create("rectangle", coords, props)
+
+    def create_oval(self, *coords, **props):
+        return self._create("oval", coords, props)
+
+    def create_arc(self, *coords, **props):
+        return self._create("arc", coords, props)
+
+    def create_image(self, *coords, **props):
+        return self._create("image", coords, props)
+
+    def coords(self, item, *coords):
+        if coords:
+            self._items[item][1] = tuple(coords)
+        return list(self._items[item][1])
+
+    def itemconfig(self, item, **props):
+        self._items[item][2].update(props)
+
+    itemconfigure = itemconfig
+
+    def delete(self, item):
+        if item == "all":
+            self._items.clear()
+        else:
+            self._items.pop(item, None)
+
+    def config(self, **options):
+        self.options.update(options)
+
+    configure = config
+
+    def bind(self, *args, **kwargs):
+        """离屏画布没有事件"""
+
+    tag_bind = bind
+
+    def winfo_exists(self):
+        return True
+
+    def resize(self, width, height):
+        self.width = width
+        self.height = height
+
+    def render(self):
+        """按创建顺序绘制所有可见图元，返回 RGBA 图像"""
+        image = Image.new("RGBA", (self.width, self.height), self.options["bg"])
+        draw = ImageDraw.Draw(image)
+        for kind, coords, props in self._items.values():
+            if props.get("state") == "hidden":
+                continue
+            getattr(self, f"_draw_{kind}")(image, draw, coords, props)
+        return image
+
+    @staticmethod
+    def _color(value):
+        """Tk 的空字符串表示不绘制"""
+        return value or None
+
+    def _draw_text(self, image, draw, coords, props):
+        text = str(props.get("text", ""))
+        if not text:
+            return
+        font = _font_pool.pil_font(props.get("font", ("Arial", 10)))
+        anchor = self.TEXT_ANCHORS.get(props.get("anchor", "center"), "mm")
+        fill = self._color(props.get("fill", "black"))
+        if "\n" in text:
+            # 多行文本只支持水平锚点，垂直方向按首行顶端对齐
+            draw.multiline_text(coords[:2], text, fill=fill, font=font, anchor=anchor[0] + "a")
+        else:
+            draw.text(coords[:2], text, fill=fill, font=font, anchor=anchor)
+
+    def _draw_line(self, image, draw, coords, props):
+        draw.line(coords, fill=self._color(props.get("fill", "black")), width=int(props.get("width", 1)))
+
+    def _box(self, coords):
+        """Tk 的矩形不包含右下边界；宽或高为 0 时 Tk 不绘制，返回 None"""
+        x0, y0, x1, y1 = coords
+        if x0 == x1 or y0 == y1:
+            return None
+        return [min(x0, x1), min(y0, y1), max(x0, x1) - 1, max(y0, y1) - 1]
+
+    def _draw_rectangle(self, image, draw, coords, props):
+        box = self._box(coords)
+        if box is None:
+            return
+        draw.rectangle(
+            box,
+            fill=self._color(props.get("fill", "")),
+            outline=self._color(props.get("outline", "black")),
+            width=int(props.get("width", 1))
+        )
+
+    def _draw_oval(self, image, draw, coords, props):
+        box = self._box(coords)
+        if box is None:
+            return
+        draw.ellipse(
+            box,
+            fill=self._color(props.get("fill", "")),
+            outline=self._color(props.get("outline", "black")),
+            width=int(props.get("width", 1))
+        )
+
+    def _draw_arc(self, image, draw, coords, props):
+        start = float(props.get("start", 0))
+        extent = float(props.get("extent", 90))
+        box = self._box(coords)
+        if not extent or box is None:
+            return
+        # Tk 角度逆时针为正，Pillow 顺时针为正
+        a, b = -start, -(start + extent)
+        start, end = min(a, b), max(a, b)
+        width = int(props.get("width", 1))
+        if props.get("style", "pieslice") == "arc":
+            draw.arc(box, start, end, fill=self._color(props.get("outline", "black")), width=width)
+        else:
+            draw.pieslice(
+                box, start, end,
+                fill=self._color(props.get("fill", "")),
+                outline=self._color(props.get("outline", "black")),
+                width=width
             )
-            self.current_color = self.bg_color
+
+    def _draw_image(self, image, draw, coords, props):
+        layer = props.get("image")
+        if layer is None:
+            return
+        x, y = coords[:2]
+        anchor = props.get("anchor", "center")
+        if "e" in anchor:
+            x -= layer.width
+        elif "w" not in anchor:
+            x -= layer.width // 2
+        if "s" in anchor:
+            y -= layer.height
+        elif "n" not in anchor:
+            y -= layer.height // 2
+        image.paste(layer, (int(x), int(y)), layer if layer.mode == "RGBA" else None)
 
 
 class DraggableWidget:
     """可拖拽的桌面小组件"""
 
-    def __init__(self, parent, template, x=100, y=100, size="medium", light_mode=True, theme_colors=None):
-        self.template = template
-        self.x = x
-        self.y = y
-        self.size = size  # 自定义尺寸
-        self.resizing = False
-        self.resize_edge = None  # 'n', 's', 'e', 'w', 'ne', 'nw', 'se', 'sw'
+    DEFAULT_TODOS = [["完成项目设计", False], ["准备会议材料", False], ["回复邮件", False]]
+    EXCHANGE_PAIRS = (("USD", "CNY"), ("EUR", "CNY"))
+    DEFAULT_NOTE = """记得今天下午3点
+参加产品评审会议
 
-        # 组件个性化设置
-        self.widget_opacity = 88  # 默认透明度 88%
-        self.widget_bg_color = "#FFFDE7"  # 默认背景色（浅黄色）
-        self.widget_border_color = "#FFD54F"  # 默认边框色（金黄色）
-        self.widget_corner_radius = 0  # 默认圆角（tkinter Canvas不支持圆角，仅作为设置选项）
-        self.follow_theme = False  # 是否跟随主窗口主题
+需要准备的材料:
+1. 功能演示
+2. 数据报告
+3. 问题清单"""
 
-        # 接收主题信息
-        self.light_mode = light_mode
-        self.theme_colors = theme_colors or ThemeColors(light_mode=light_mode)
+    # 待办事项文字颜色（液态玻璃效果）
+    TODO_TEXT_COLOR = "#1A1A1A"
+    TODO_COMPLETED_COLOR = "#6B7280"
+
+    NOTE_AUTOSAVE_MS = 800  # 笔记停止输入多久后自动保存
+
+    THERMAL_ROWS = 3  # 温度电池组件显示的温度区数量
+    PROCESS_ROWS = 8  # 进程组件显示的行数
+    CGROUP_ROWS = 3   # 容器资源组件下方列出的其他 cgroup 行数
+    SAMPLER_READY_POLL_MS = 50  # 等待补采结果时的轮询间隔
+    BATTERY_STATUS = {"Charging": "充电中", "Discharging": "放电中", "Full": "已充满", "Not charging": "未充电"}
+
+    def __init__(self, parent, template, x=100, y=100, size="medium", light_mode=True, theme_colors=None, scheduler=None, refresh_policy=None, uid=None, width=None, height=None, on_close=None):
+        self.uid = uid or uuid.uuid4().hex  # 稳定的组件实例标识，用作配置键
+        self.on_close = on_close  # 组件自行关闭后通知主应用
+        self.x = x
+        self.y = y
+        self._init_settings(template, size, light_mode, theme_colors)
 
         # 加载组件配置
         self._load_widget_config()
 
-        # 根据组件大小设置尺寸
-        width, height = SIZE_MAP.get(size, template.get_size_dimensions())
+        # 根据组件大小设置尺寸（恢复会话时使用保存的实际尺寸）
+        default_width, default_height = SIZE_MAP.get(size, template.get_size_dimensions())
+        width = int(width or default_width)
+        height = int(height or default_height)
         self.width = width
         self.height = height
         self.min_width = 100
@@ -480,13 +3456,26 @@ class DraggableWidget:
         self.window.geometry(f"+{x}+{y}")
         self.window.resizable(False, False)
 
+        # 定时刷新统一交给应用级调度器，单独使用时退化为组件私有调度器
+        self.scheduler = scheduler or TickScheduler(self.window)
+        self.refresh_policy = refresh_policy
+        self._tick_tokens = {}
+        self._topic_tokens = {}  # 数据总线订阅
+        if self.refresh_policy:
+            self.refresh_policy.add_listener(self._on_refresh_policy_change)
+
         # 应用主题颜色（如果跟随主题）
         if self.follow_theme:
             self._apply_theme_colors()
 
         # 待办事项数据
         if template.name == "待办事项":
-            self.todos = self._load_todos() or [["完成项目设计", False], ["准备会议材料", False], ["回复邮件", False]]
+            self.todos = None
+            self._todos_value = None  # 本组件最近发布的值，用于忽略自己的回显
+            self.todo_scroll = 0  # 列表顶部第一条可见待办的索引
+            self._subscribe_topic("todos", f"todo.list/{self.uid}", self._on_todos)
+            if self.todos is None:
+                self.todos = [list(todo) for todo in self.DEFAULT_TODOS]
 
         # 使用 Canvas 作为主容器，增加圆角阴影效果
         self.canvas = tk.Canvas(
@@ -500,6 +3489,13 @@ class DraggableWidget:
         )
         self.canvas.pack(fill="both", expand=True)
 
+        # 不可见（隐藏、被完全遮挡、移出屏幕）时暂停刷新，重新可见时补刷新一次
+        self.visibility = VisibilityTracker(self.window, self.canvas, on_visible=self._catch_up_refresh)
+        self.visibility.update_bounds(x, y, width, height)
+
+        # 场景图：画布元素按名声明，更新时只下发变化的部分
+        self.scene = SceneGraph(self.canvas)
+
         # 绘制圆角效果（通过多层矩形模拟）
         self._draw_rounded_corner_background(width, height)
 
@@ -520,12 +3516,24 @@ class DraggableWidget:
         self._start_window_y = 0
         self._hover_state = False  # 悬停状态
 
+        # 窗口几何缓存 [x, y, 宽, 高]：拖拽/缩放只修改缓存，每帧最多向 Tk 提交一次
+        self._geometry = [x, y, width, height]
+        self._applied_geometry = tuple(self._geometry)
+        self._geometry_pending = False
+        self.drag_stats = {"events": 0, "applied": 0}  # 收到的移动事件数 / 实际提交的几何数
+        self._saved_layout = None  # 最近一次写入会话的布局
+
         # 绑定鼠标事件
         self.canvas.bind("<Button-1>", self._on_press)
         self.canvas.bind("<B1-Motion>", self._on_drag)
+        self.canvas.bind("<ButtonRelease-1>", self._on_release)
+        self.window.bind("<Configure>", self._on_configure, add="+")
         self.canvas.bind("<Motion>", self._on_motion)
         self.canvas.bind("<Enter>", self._on_mouse_enter)
         self.canvas.bind("<Leave>", self._on_mouse_leave)
+        if self.template.name == "待办事项":
+            # 必须在拖拽绑定之后追加，否则会被上面的 <Button-1> 绑定替换掉
+            self.canvas.bind("<Button-1>", self._on_todo_click, add="+")
 
         # 创建调整大小的边框
         self.resize_margin = 8  # 边缘检测范围
@@ -548,41 +3556,80 @@ class DraggableWidget:
         self.window.bind("<Button-3>", self._show_context_menu)  # Windows
         self.window.bind("<Button-2>", self._show_context_menu)  # macOS
 
+    def _init_settings(self, template, size, light_mode, theme_colors):
+        """模板、尺寸档位、个性化设置默认值和主题"""
+        self.template = template
+        self.size = size  # 自定义尺寸
+        self.resizing = False
+        self.resize_edge = None  # 'n', 's', 'e', 'w', 'ne', 'nw', 'se', 'sw'
+
+        # 组件个性化设置
+        self.widget_opacity = 88  # 默认透明度 88%
+        self.widget_bg_color = "#FFFDE7"  # 默认背景色（浅黄色）
+        self.widget_border_color = "#FFD54F"  # 默认边框色（金黄色）
+        self.widget_corner_radius = 0  # 圆角半径（0 表示默认 12px，背景图层按此渲染）
+        self.follow_theme = False  # 是否跟随主窗口主题
+        self.refresh_interval = 0  # 刷新间隔（秒），0 表示使用全局设置
+
+        # 接收主题信息
+        self.light_mode = light_mode
+        self.theme_colors = theme_colors or ThemeColors(light_mode=light_mode)
+
+    def _layer(self, key, render):
+        """获取预渲染的静态图层（桌面组件为 PhotoImage）"""
+        return _layer_cache.get(key, render)
+
+    def _layout_background(self, width, height):
+        """圆角背景布局：元素名 -> (坐标, 字体)"""
+        return {"bg_layer": ((0, 0), None)}
+
+    def _background_layer(self, width, height):
+        """预渲染的圆角背景图层"""
+        radius = self.widget_corner_radius or 12  # 圆角半径
+        key = ("background", width, height, self.widget_bg_color, self.widget_border_color, radius, self.light_mode)
+        return self._layer(
+            key,
+            lambda: render_rounded_background(width, height, self.widget_bg_color, self.widget_border_color, radius)
+        )
+
     def _draw_rounded_corner_background(self, width, height):
         """绘制圆角背景效果"""
-        radius = 12  # 圆角半径
-        # 使用多个小矩形模拟圆角效果
-        # 四个角
-        corner_size = radius
-        # 左上角
-        self.canvas.create_rectangle(
-            0, 0, corner_size, corner_size,
-            fill="", outline=self.widget_border_color, width=1, tags="rounded_bg"
-        )
-        # 右上角
-        self.canvas.create_rectangle(
-            width - corner_size, 0, width, corner_size,
-            fill="", outline=self.widget_border_color, width=1, tags="rounded_bg"
-        )
-        # 左下角
-        self.canvas.create_rectangle(
-            0, height - corner_size, corner_size, height,
-            fill="", outline=self.widget_border_color, width=1, tags="rounded_bg"
-        )
-        # 右下角
-        self.canvas.create_rectangle(
-            width - corner_size, height - corner_size, width, height,
-            fill="", outline=self.widget_border_color, width=1, tags="rounded_bg"
+        # 整个背景（含抗锯齿圆角边框）是一张预渲染图片，画布上只占一个元素
+        layout = self._layout_background(width, height)
+        self._add_node("image", "bg_layer", layout, image=self._background_layer(width, height), anchor="nw", tags="rounded_bg")
+
+    def _update_static_layers(self, width, height):
+        """尺寸或颜色变化后切换到对应的预渲染图层"""
+        self.scene.update("bg_layer", image=self._background_layer(width, height))
+        if "clock_decor" in self.scene:
+            self.scene.update("clock_decor", image=self._clock_decor_layer(width, height))
+
+    def _clock_decor_colors(self):
+        """时钟装饰的 (填充, 描边, 圆点) 颜色：跟随主题时取主题色，否则用默认浅色"""
+        if self.follow_theme and self.theme_colors:
+            return (self.theme_colors.bg_hint, self.theme_colors.border, self.theme_colors.border)
+        return CLOCK_DECOR_COLORS
+
+    def _clock_decor_layer(self, width, height):
+        """时钟装饰图层，颜色是缓存键的一部分"""
+        colors = self._clock_decor_colors()
+        return self._layer(
+            ("clock_decor", width, height) + colors,
+            lambda: render_clock_decor(width, height, *colors)
         )
 
     def _on_mouse_enter(self, _=None):
         """鼠标进入组件时"""
         self._hover_state = True
         if self.window.winfo_exists():
-            AnimationManager.animate_color(
+            # 跟随主题时使用主题预先算好的悬停色
+            if self.follow_theme and self.theme_colors:
+                hover_color = self.theme_colors.border_hover
+            else:
+                hover_color = lighten_color(self.widget_border_color, 20)
+            AnimationManager.hover.transition(
                 self.canvas, 'highlightbackground',
-                self.widget_border_color,
-                lighten_color(self.widget_border_color, 20),
+                hover_color,
                 duration=150
             )
 
@@ -590,15 +3637,109 @@ class DraggableWidget:
         """鼠标离开组件时"""
         self._hover_state = False
         if self.window.winfo_exists():
-            AnimationManager.animate_color(
+            AnimationManager.hover.transition(
                 self.canvas, 'highlightbackground',
-                self.canvas['highlightbackground'],
                 self.widget_border_color,
                 duration=150
             )
 
+    def _subscribe_tick(self, name, callback, period):
+        """注册周期刷新，同名订阅会被替换（重建内容时不会重复订阅）
+
+        period 可以是毫秒数，也可以是返回毫秒数的函数（刷新策略变化时重新求值）。
+        """
+        self._unsubscribe_tick(name)
+        period_ms = period() if callable(period) else period
+        self._tick_tokens[name] = (self.scheduler.subscribe(callback, period_ms), callback, period)
+
+    def _subscribe_calendar(self, name, callback, boundary="day"):
+        """注册日历边界刷新（如午夜翻日）"""
+        self._unsubscribe_tick(name)
+        self._tick_tokens[name] = (self.scheduler.subscribe_calendar(callback, boundary), callback, None)
+
+    def _subscribe_topic(self, name, topic, callback):
+        """订阅数据总线主题，同名订阅会被替换；已有值时立即回调一次"""
+        self._unsubscribe_topic(name)
+        if _data_bus.root is None:
+            # 单独使用组件（没有应用主窗口）时总线绑定到组件窗口
+            _data_bus.attach(self.window, self.scheduler, self.refresh_policy)
+        self._topic_tokens[name] = (_data_bus.subscribe(topic, callback), topic, callback)
+
+    def _unsubscribe_topic(self, name):
+        entry = self._topic_tokens.pop(name, None)
+        if entry is not None:
+            _data_bus.unsubscribe(entry[0])
+
+    def _unsubscribe_tick(self, name):
+        entry = self._tick_tokens.pop(name, None)
+        if entry is not None:
+            self.scheduler.unsubscribe(entry[0])
+
+    def _data_period(self):
+        """数据类组件的刷新间隔（毫秒）"""
+        if self.refresh_policy:
+            return self.refresh_policy.interval_for(self.refresh_interval)
+        return (self.refresh_interval or 2) * 1000
+
+    def _clock_period(self):
+        """时钟刷新周期（毫秒）"""
+        return self.refresh_policy.clock_period() if self.refresh_policy else 1000
+
+    def _on_refresh_policy_change(self):
+        """刷新策略变化：重新计算周期并立即刷新一次"""
+        for token, callback, period in list(self._tick_tokens.values()):
+            if callable(period):
+                try:
+                    self.scheduler.set_period(token, period())
+                    callback()
+                except Exception as e:
+                    logger.warning(f"按新刷新策略刷新组件失败: {e}")
+
+    def _catch_up_refresh(self):
+        """重新可见时立即执行一次所有刷新"""
+        for _, callback, _ in list(self._tick_tokens.values()):
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"补刷新组件失败: {e}")
+        for _, topic, callback in list(self._topic_tokens.values()):
+            value = _data_bus.latest(topic)
+            if value is not None:
+                try:
+                    callback(value)
+                except Exception as e:
+                    logger.warning(f"补刷新组件失败: {e}")
+
+    def toggle_visibility(self):
+        """显示/隐藏组件窗口"""
+        if self.visibility.withdrawn:
+            self.window.deiconify()
+            self.window.attributes('-topmost', True)
+            self.visibility.set_withdrawn(False)
+        else:
+            self.window.withdraw()
+            self.visibility.set_withdrawn(True)
+
+    def stop_updates(self):
+        """取消该组件的所有定时刷新和数据订阅"""
+        for name in list(self._tick_tokens):
+            self._unsubscribe_tick(name)
+        for name in list(self._topic_tokens):
+            self._unsubscribe_topic(name)
+        if self.refresh_policy:
+            self.refresh_policy.remove_listener(self._on_refresh_policy_change)
+        if getattr(self, '_sampler_groups', None) is not None:
+            _system_sampler.release(*self._sampler_groups)
+            self._sampler_groups = None
+        self._flush_note()
+
     def _close_widget(self):
         """关闭组件（带动画）"""
+        self.stop_updates()
+        self._delete_session()
+        if self.on_close:
+            self.on_close(self)
+
         def destroy_callback():
             if self.window.winfo_exists():
                 self.window.destroy()
@@ -611,6 +3752,13 @@ class DraggableWidget:
             callback=destroy_callback
         )
 
+    def _add_node(self, kind, name, layout, **props):
+        """按布局声明场景节点，返回画布 item ID"""
+        coords, font = layout[name]
+        if font is not None:
+            props["font"] = font
+        return self.scene.node(name, kind, coords, **props)
+
     def _create_widget_content(self, canvas, width, height):
         """创建组件内容"""
         # 根据组件类型创建不同内容
@@ -623,167 +3771,206 @@ class DraggableWidget:
         elif self.template.name == "笔记":
             self._create_note_widget(canvas, width, height)
         elif self.template.name == "系统监控":
-            self._create_system_monitor_widget(canvas, width, height)
+            self._create_system_monitor_widget(canvas, width, height)
+        elif self.template.name == "CPU核心":
+            self._create_cpu_cores_widget(canvas, width, height)
+        elif self.template.name == "磁盘网络":
+            self._create_disk_net_widget(canvas, width, height)
+        elif self.template.name == "温度电池":
+            self._create_thermal_power_widget(canvas, width, height)
+        elif self.template.name == "进程":
+            self._create_process_widget(canvas, width, height)
+        elif self.template.name == "容器资源":
+            self._create_cgroup_widget(canvas, width, height)
+        elif self.template.name == "日历":
+            self._create_calendar_widget(canvas, width, height)
+        elif self.template.name == "计时器":
+            self._create_timer_widget(canvas, width, height)
+        elif self.template.name == "汇率":
+            self._create_exchange_widget(canvas, width, height)
+
+    def _content_layout(self, width, height):
+        """按组件类型计算内容布局：元素名 -> (坐标, 字体)"""
+        if self.template.name == "时钟":
+            return self._layout_clock(width, height)
+        elif self.template.name == "天气":
+            return self._layout_weather(width, height)
+        elif self.template.name == "待办事项":
+            return self._layout_todo(width, height)
+        elif self.template.name == "笔记":
+            return self._layout_note(width, height)
+        elif self.template.name == "系统监控":
+            return self._layout_system_monitor(width, height)
+        elif self.template.name == "CPU核心":
+            return self._layout_cpu_cores(width, height)
+        elif self.template.name == "磁盘网络":
+            return self._layout_disk_net(width, height)
+        elif self.template.name == "温度电池":
+            return self._layout_thermal_power(width, height)
+        elif self.template.name == "进程":
+            return self._layout_process(width, height)
+        elif self.template.name == "容器资源":
+            return self._layout_cgroup(width, height)
         elif self.template.name == "日历":
-            self._create_calendar_widget(canvas, width, height)
+            return self._layout_calendar(width, height)
         elif self.template.name == "计时器":
-            self._create_timer_widget(canvas, width, height)
+            return self._layout_timer(width, height)
         elif self.template.name == "汇率":
-            self._create_exchange_widget(canvas, width, height)
+            return self._layout_exchange(width, height)
+        return {}
 
-    def _create_clock_widget(self, canvas, width, height):
-        """创建时钟组件 - 现代圆润设计"""
+    def relayout(self, width=None, height=None, static_layers=True):
+        """按新尺寸增量更新元素位置和字体（只发 coords/itemconfig，不重建画布）
+
+        static_layers 为 False 时（缩放过程中）暂不重新渲染静态图层，结束后再统一更新。
+        """
+        width = int(width or self.width)
+        height = int(height or self.height)
+
+        layout = self._layout_background(width, height)
+        layout.update(self._content_layout(width, height))
+        for name, (coords, font) in layout.items():
+            if font is not None:
+                self.scene.update(name, coords, font=font)
+            else:
+                self.scene.update(name, coords)
+
+        if static_layers:
+            self._update_static_layers(width, height)
+
+        if self.template.name == "笔记":
+            self._place_note_controls(width, height)
+        elif self.template.name == "待办事项":
+            self._render_todo_list(width, height)
+        elif self.template.name == "系统监控":
+            self.monitor_chart.place(self._monitor_metrics(width, height)['history_box'])
+        elif self.template.name == "磁盘网络":
+            boxes = self._disk_net_boxes(width, height)
+            self.disk_chart.place(boxes['disk'])
+            self.net_chart.place(boxes['net'])
+        elif self.template.name == "温度电池":
+            self.battery_gauge.place(self._battery_gauge_box(width, height))
+        elif self.template.name == "容器资源":
+            self.cgroup_chart.place(self._cgroup_chart_box(width, height))
+
+    def _layout_clock(self, width, height):
+        """时钟布局"""
         # 根据组件大小计算字体大小
         icon_size = int(width * 0.22)
         time_size = int(width * 0.14)
         date_size = int(width * 0.055)
+        # 光晕圆、装饰圆点和日期背景框合成为一张静态图层
+        layout = {
+            "clock_decor": ((0, 0), None),
+            "icon": ((width//2, height//3), ("Segoe UI Emoji", icon_size)),
+        }
+        # 用最宽的数字样本适配宽度，避免逐秒变化时字号跳动
+        time_font = _text_fitter.fit_font("88:88:88", width * 0.85, time_size, bold=True)
+        layout["time"] = ((width//2, height//2 + height//12), time_font)
+        layout["date"] = ((width//2, height - height//6), _text_fitter.fit_font("0000年00月00日", 130, date_size))
+        return layout
+
+    def _create_clock_widget(self, canvas, width, height):
+        """创建时钟组件 - 现代圆润设计"""
+        layout = self._layout_clock(width, height)
 
         # 现代设计颜色
         text_primary = "#1F2937"
         text_secondary = "#6B7280"
 
-        # 绘制装饰性圆形背景（渐变效果模拟）
-        glow_radius = min(width, height) * 0.25
-        canvas.create_oval(
-            width//2 - glow_radius, height//3 - glow_radius,
-            width//2 + glow_radius, height//3 + glow_radius,
-            fill="#F3F4F6",
-            outline="#E5E7EB",
-            width=2,
-            tags="clock_bg"
-        )
+        # 装饰性圆形背景、小圆点和日期背景框（预渲染图层）
+        decor = self._clock_decor_layer(width, height)
+        self._add_node("image", "clock_decor", layout, image=decor, anchor="nw", tags="decor")
 
         # 时钟图标
-        canvas.create_text(
-            width//2, height//3,
-            text=self.template.icon_name,
-            font=("Segoe UI Emoji", icon_size),
-            tags="clock_icon"
-        )
-
-        # 装饰性元素 - 小圆点
-        for i in range(3):
-            x = width//2 - 30 + i * 30
-            canvas.create_oval(
-                x, height//2 - 40, x + 6, height//2 - 34,
-                fill="#E0E7FF", outline="", tags="decor"
-            )
+        self._add_node("text", "icon", layout, text=self.template.icon_name, tags="clock_icon")
 
         # 时间
-        self.time_text = canvas.create_text(
-            width//2, height//2 + height//12,
+        self._add_node(
+            "text", "time", layout,
             text=datetime.datetime.now().strftime("%H:%M:%S"),
-            font=get_font(time_size, bold=True),
             fill=text_primary,
             tags="clock_time"
         )
 
-        # 日期 - 添加圆角背景框
-        date_bg_height = 28
-        canvas.create_rectangle(
-            width//2 - 70, height - height//6 - date_bg_height//2,
-            width//2 + 70, height - height//6 + date_bg_height//2,
-            fill="#F3F4F6",
-            outline="#E5E7EB",
-            width=1,
-            tags="date_bg"
-        )
-
-        canvas.create_text(
-            width//2, height - height//6,
+        # 日期
+        self._add_node(
+            "text", "date", layout,
             text=datetime.datetime.now().strftime("%Y年%m月%d日"),
-            font=get_font(date_size),
             fill=text_secondary,
             tags="clock_date"
         )
 
-        # 定时更新
-        self._update_clock()
+        # 整秒刷新时间，午夜刷新日期
+        self._subscribe_tick("clock", self._update_clock, self._clock_period)
+        self._subscribe_calendar("clock_date", self._update_clock_date)
 
     def _update_clock(self):
-        """更新时钟"""
-        if not hasattr(self, 'window') or not self.window.winfo_exists():
+        """更新时钟（由调度器在整秒边界触发）"""
+        if not self.window.winfo_exists() or not self.visibility.should_update():
             return
 
-        if hasattr(self, 'time_text'):
-            current_time = datetime.datetime.now().strftime("%H:%M:%S")
-            try:
-                self.canvas.itemconfig(self.time_text, text=current_time)
-            except Exception:
-                return
+        # 低频模式下逐分钟刷新，只显示到分钟
+        time_format = "%H:%M" if self.refresh_policy and self.refresh_policy.idle else "%H:%M:%S"
+        current_time = datetime.datetime.now().strftime(time_format)
+        self.scene.update("time", text=current_time)
 
-            self.window.after(1000, self._update_clock)
+    def _update_clock_date(self):
+        """更新时钟日期（午夜翻日时触发）"""
+        if not self.window.winfo_exists() or not self.visibility.should_update():
+            return
 
-    def _create_weather_widget(self, canvas, width, height):
-        """创建天气组件 - 现代圆润设计"""
+        self.scene.update("date", text=datetime.datetime.now().strftime("%Y年%m月%d日"))
+
+    def _layout_weather(self, width, height):
+        """天气布局"""
         # 根据组件大小计算字体大小
         icon_size = int(width * 0.26)
         temp_size = int(width * 0.16)
         desc_size = int(width * 0.065)
         loc_size = int(width * 0.05)
+        temp_bg_height = 80
+        loc_bg_width = 100
+        loc_bg_height = 26
+
+        return {
+            "temp_bg": ((20, height//2 - 10, width - 20, height//2 + temp_bg_height - 10), None),
+            "icon": ((width//2, height//3), ("Segoe UI Emoji", icon_size)),
+            "temp": ((width//2, height//2 + 15), get_font(temp_size, bold=True)),
+            "desc": ((width//2, height//2 + 45), get_font(desc_size)),
+            "loc_bg": ((
+                width//2 - loc_bg_width//2, height - height//8 - loc_bg_height//2,
+                width//2 + loc_bg_width//2, height - height//8 + loc_bg_height//2
+            ), None),
+            "loc": ((width//2, height - height//8), get_font(loc_size)),
+        }
+
+    def _create_weather_widget(self, canvas, width, height):
+        """创建天气组件 - 现代圆润设计"""
+        layout = self._layout_weather(width, height)
 
         # 现代设计颜色
         text_secondary = "#6B7280"
         text_hint = "#9CA3AF"
 
         # 绘制温度渐变背景（模拟）
-        temp_bg_height = 80
-        canvas.create_rectangle(
-            20, height//2 - 10, width - 20, height//2 + temp_bg_height - 10,
-            fill="#EFF6FF",
-            outline="#DBEAFE",
-            width=1,
-            tags="weather_bg"
-        )
+        self._add_node("rectangle", "temp_bg", layout, fill="#EFF6FF", outline="#DBEAFE", width=1, tags="weather_bg")
 
         # 天气图标
-        canvas.create_text(
-            width//2, height//3,
-            text=self.template.icon_name,
-            font=("Segoe UI Emoji", icon_size),
-            tags="weather_icon"
-        )
+        self._add_node("text", "icon", layout, text=self.template.icon_name, tags="weather_icon")
 
         # 温度
-        canvas.create_text(
-            width//2, height//2 + 15,
-            text="25°C",
-            font=get_font(temp_size, bold=True),
-            fill="#3B82F6",
-            tags="weather_temp"
-        )
+        self._add_node("text", "temp", layout, text="25°C", fill="#3B82F6", tags="weather_temp")
 
         # 天气描述
-        canvas.create_text(
-            width//2, height//2 + 45,
-            text="晴朗",
-            font=get_font(desc_size),
-            fill=text_secondary,
-            tags="weather_desc"
-        )
+        self._add_node("text", "desc", layout, text="晴朗", fill=text_secondary, tags="weather_desc")
 
         # 地点 - 圆角标签样式
-        loc_bg_width = 100
-        loc_bg_height = 26
-        canvas.create_rectangle(
-            width//2 - loc_bg_width//2, height - height//8 - loc_bg_height//2,
-            width//2 + loc_bg_width//2, height - height//8 + loc_bg_height//2,
-            fill="#F9FAFB",
-            outline="#E5E7EB",
-            width=1,
-            tags="loc_bg"
-        )
-
-        canvas.create_text(
-            width//2, height - height//8,
-            text="📍 北京市",
-            font=get_font(loc_size),
-            fill=text_hint,
-            tags="weather_loc"
-        )
+        self._add_node("rectangle", "loc_bg", layout, fill="#F9FAFB", outline="#E5E7EB", width=1, tags="loc_bg")
+        self._add_node("text", "loc", layout, text="📍 北京市", fill=text_hint, tags="weather_loc")
 
-    def _create_todo_widget(self, canvas, width, height):
-        """创建待办事项组件 - 液态玻璃效果"""
+    def _layout_todo(self, width, height):
+        """待办事项布局（包括每一行待办）"""
         # 根据组件大小计算字体和位置
         title_size = int(width * 0.07)
         title_y = int(height * 0.1)
@@ -791,6 +3978,44 @@ class DraggableWidget:
         btn_height = int(height * 0.08)
         btn_y = height - btn_height - int(height * 0.05)
         btn_text_size = int(width * 0.04)
+        btn_width = int(width * 0.4)
+        margin = int(width * 0.1)
+
+        layout = {
+            "title": ((width//2, title_y), get_font(title_size, bold=True)),
+            "divider": ((margin, line_y, width-margin, line_y), None),
+            "add_bg": ((width//2 - btn_width//2, btn_y, width//2 + btn_width//2, btn_y + btn_height), None),
+            "add_text": ((width//2, btn_y + btn_height//2), get_font(btn_text_size)),
+        }
+
+        # 待办事项列表：只为可见行布局槽位
+        start_y, line_height, rows = self._todo_viewport(width, height)
+        row_font = get_font(int(width * 0.04))
+        for slot in range(rows):
+            layout[f"row_{slot}"] = ((margin, start_y + slot * line_height), row_font)
+
+        # 滚动条滑块
+        track_top = start_y - line_height // 2
+        track_height = rows * line_height
+        total = max(len(self.todos), rows)
+        thumb_x = width - margin // 2
+        thumb_top = track_top + track_height * self.todo_scroll // total
+        thumb_bottom = track_top + track_height * (self.todo_scroll + rows) // total
+        layout["scroll_thumb"] = ((thumb_x, thumb_top, thumb_x, thumb_bottom), None)
+        return layout
+
+    def _todo_viewport(self, width, height):
+        """待办列表可见区域：(首行中心 y, 行高, 可见行数)"""
+        line_height = max(1, int(height * 0.08))
+        start_y = int(height * 0.2)
+        btn_y = height - int(height * 0.08) - int(height * 0.05)
+        # 最后一行的下沿不能压到添加按钮
+        rows = max(1, (btn_y - start_y - line_height // 2) // line_height + 1)
+        return start_y, line_height, rows
+
+    def _create_todo_widget(self, canvas, width, height):
+        """创建待办事项组件 - 液态玻璃效果"""
+        layout = self._layout_todo(width, height)
 
         # 液态玻璃效果颜色
         text_primary = "#1A1A1A"
@@ -798,70 +4023,116 @@ class DraggableWidget:
         accent_color = "#3B82F6"
 
         # 标题
-        canvas.create_text(
-            width//2, title_y,
-            text="📝 待办事项",
-            font=get_font(title_size, bold=True),
-            fill=text_primary
-        )
+        self._add_node("text", "title", layout, text="📝 待办事项", fill=text_primary)
 
         # 分隔线
-        margin = int(width * 0.1)
-        canvas.create_line(margin, line_y, width-margin, line_y, fill=border_color, width=1)
+        self._add_node("line", "divider", layout, fill=border_color, width=1)
 
         # 待办事项列表
-        self._render_todo_list(canvas, width, height)
+        self._render_todo_list(width, height)
 
         # 添加按钮
-        btn_width = int(width * 0.4)
-        canvas.create_rectangle(
-            width//2 - btn_width//2, btn_y,
-            width//2 + btn_width//2, btn_y + btn_height,
-            fill=accent_color,
-            outline=""
-        )
-        add_btn_text = canvas.create_text(
-            width//2, btn_y + btn_height//2,
-            text="+ 添加",
-            fill="white",
-            font=get_font(btn_text_size)
-        )
+        self._add_node("rectangle", "add_bg", layout, fill=accent_color, outline="")
+        add_btn_text = self._add_node("text", "add_text", layout, text="+ 添加", fill="white")
 
         # 绑定按钮点击事件
         self.canvas.tag_bind(add_btn_text, "<Button-1>", self._add_todo)
 
-    def _render_todo_list(self, canvas, width, height):
-        """渲染待办事项列表"""
-        canvas.delete("todo_item")
-
-        margin = int(width * 0.1)
-        line_height = int(height * 0.08)
-        start_y = int(height * 0.2)
-        font_size = int(width * 0.04)
+        # 列表只用一个画布级点击处理（按坐标命中行，在 __init__ 绑定拖拽之后追加）和滚轮滚动
+        self.canvas.bind("<MouseWheel>", self._on_todo_wheel)
+        self.canvas.bind("<Button-4>", self._on_todo_wheel)
+        self.canvas.bind("<Button-5>", self._on_todo_wheel)
+
+    def _render_todo_list(self, width, height):
+        """渲染待办事项列表
+
+        画布上只保留可见行数个文本槽位，滚动或数据变化时改写槽位内容，
+        不再逐条创建和删除。
+        """
+        layout = self._layout_todo(width, height)
+        _, _, rows = self._todo_viewport(width, height)
+
+        # 可见行数变化时增减槽位
+        for name in self.scene.names("row_"):
+            if int(name[4:]) >= rows:
+                self.scene.remove(name)
+        for slot in range(rows):
+            if f"row_{slot}" not in self.scene:
+                self._add_node("text", f"row_{slot}", layout, text="", fill=self.TODO_TEXT_COLOR, anchor="w", tags="todo_item")
+        if "scroll_thumb" not in self.scene:
+            self._add_node("line", "scroll_thumb", layout, fill="#BFDBFE", width=3, capstyle="round", state="hidden")
+
+        self.todo_scroll = min(self.todo_scroll, max(0, len(self.todos) - rows))
+        self._refresh_todo_rows(width, height)
+
+    def _refresh_todo_rows(self, width=None, height=None):
+        """按当前滚动位置填充所有可见槽位和滚动条"""
+        width = int(width or self.width)
+        height = int(height or self.height)
+        _, _, rows = self._todo_viewport(width, height)
+        for slot in range(rows):
+            self._update_todo_row(slot, width)
+
+        layout = self._layout_todo(width, height)
+        self.scene.update(
+            "scroll_thumb", layout["scroll_thumb"][0],
+            state="normal" if len(self.todos) > rows else "hidden"
+        )
 
-        # 液态玻璃效果颜色
-        text_primary = "#1A1A1A"
-        text_completed = "#6B7280"
-
-        y_pos = start_y
-        for i, (todo, completed) in enumerate(self.todos):
-            # 待办事项文本
-            text = f"☑ {todo}" if completed else f"☐ {todo}"
-            color = text_completed if completed else text_primary
-
-            todo_text = canvas.create_text(
-                margin, y_pos,
-                text=text,
-                font=get_font(font_size),
-                fill=color,
-                anchor="w",
-                tags=("todo_item", f"todo_{i}")
+    def _update_todo_row(self, slot, width):
+        """只更新一个槽位的文本和颜色"""
+        index = self.todo_scroll + slot
+        if index < len(self.todos):
+            todo, completed = self.todos[index]
+            self.scene.update(
+                f"row_{slot}",
+                text=self._todo_display_text(todo, completed, width),
+                fill=self.TODO_COMPLETED_COLOR if completed else self.TODO_TEXT_COLOR,
+                state="normal"
             )
+        else:
+            self.scene.update(f"row_{slot}", state="hidden")
+
+    def _todo_display_text(self, todo, completed, width):
+        """待办事项显示文本，按行宽截断"""
+        text = f"☑ {todo}" if completed else f"☐ {todo}"
+        margin = int(width * 0.1)
+        return _text_fitter.ellipsize(text, width - 2 * margin, int(width * 0.04))
+
+    def _todo_index_at(self, x, y):
+        """命中测试：坐标处的待办索引，没有则返回 None"""
+        start_y, line_height, rows = self._todo_viewport(self.width, self.height)
+        margin = int(self.width * 0.1)
+        if not margin <= x <= self.width - margin:
+            return None
+        slot = (y - (start_y - line_height // 2)) // line_height
+        index = self.todo_scroll + slot
+        if 0 <= slot < rows and index < len(self.todos):
+            return index
+        return None
 
-            # 绑定点击事件
-            canvas.tag_bind(todo_text, "<Button-1>", lambda _, idx=i: self._toggle_todo(idx))
+    def _on_todo_click(self, event):
+        """列表点击：切换被点中的待办"""
+        if self.resizing:
+            return
+        index = self._todo_index_at(event.x, event.y)
+        if index is not None:
+            self._toggle_todo(index)
+
+    def _on_todo_wheel(self, event):
+        """滚轮滚动待办列表（Windows/macOS 用 delta，X11 用 Button-4/5）"""
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self._scroll_todos(-1)
+        else:
+            self._scroll_todos(1)
 
-            y_pos += line_height
+    def _scroll_todos(self, rows_delta):
+        """滚动若干行，越界时夹到列表两端"""
+        _, _, rows = self._todo_viewport(self.width, self.height)
+        scroll = min(max(self.todo_scroll + rows_delta, 0), max(0, len(self.todos) - rows))
+        if scroll != self.todo_scroll:
+            self.todo_scroll = scroll
+            self._refresh_todo_rows()
 
     def _add_todo(self, event=None):
         """添加新的待办事项"""
@@ -875,311 +4146,737 @@ class DraggableWidget:
         )
 
         if new_todo and new_todo.strip():
+            # 过长的待办事项在显示时按行宽加省略号，保存完整内容
             todo_text = new_todo.strip()
-            # 限制长度以避免UI显示问题
-            if len(todo_text) > 100:
-                todo_text = todo_text[:100] + "..."
-                from tkinter import messagebox
-                messagebox.showwarning("提示", "待办事项过长，已截断为100字符", parent=self.window)
-
             self.todos.append([todo_text, False])
-            self._render_todo_list(self.canvas, self.width, self.height)
+            # 滚动到底部让新添加的待办可见
+            _, _, rows = self._todo_viewport(self.width, self.height)
+            self.todo_scroll = max(0, len(self.todos) - rows)
+            self._refresh_todo_rows()
             self._save_todos()  # 持久化保存
 
     def _toggle_todo(self, index):
         """切换待办事项完成状态"""
         if 0 <= index < len(self.todos):
             self.todos[index][1] = not self.todos[index][1]
-            self._render_todo_list(self.canvas, self.width, self.height)
+            # 只有在可见区域内时才需要更新对应的一行
+            _, _, rows = self._todo_viewport(self.width, self.height)
+            slot = index - self.todo_scroll
+            if 0 <= slot < rows:
+                self._update_todo_row(slot, self.width)
             self._save_todos()
 
     def _delete_todo(self, index):
         """删除待办事项"""
         if 0 <= index < len(self.todos):
             self.todos.pop(index)
-            self._render_todo_list(self.canvas, self.width, self.height)
+            self._render_todo_list(self.width, self.height)
             self._save_todos()
 
     def _save_todos(self):
-        """保存待办事项到文件"""
-        data_dir = Path.home() / ".dashwidgets"
-        data_dir.mkdir(exist_ok=True)
-        todo_file = data_dir / "todos.json"
-
-        try:
-            data = {'todos': self.todos}
-            with open(todo_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"保存待办事项失败: {e}")
+        """发布到本组件的待办列表主题，由数据源后台合并写入（连续勾选只落盘一次）"""
+        self._todos_value = tuple((text, completed) for text, completed in self.todos)
+        _data_bus.publish(f"todo.list/{self.uid}", self._todos_value)
 
-    def _load_todos(self):
-        """加载保存的待办事项"""
-        data_dir = Path.home() / ".dashwidgets"
-        todo_file = data_dir / "todos.json"
-
-        if todo_file.exists():
-            try:
-                with open(todo_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return data.get('todos', [])
-            except Exception as e:
-                logger.warning(f"加载待办事项失败: {e}")
-        return None
+    def _on_todos(self, value):
+        """待办列表主题更新：首次订阅时载入，其他订阅者修改后重新绘制"""
+        if value is self._todos_value:
+            return
+        self._todos_value = value
+        self.todos = [list(todo) for todo in value]
+        if hasattr(self, 'scene'):
+            self._render_todo_list(self.width, self.height)
 
     def _clear_completed_todos(self):
         """清空已完成的待办事项"""
         self.todos = [[todo, completed] for todo, completed in self.todos if not completed]
-        self._render_todo_list(self.canvas, self.width, self.height)
+        self._render_todo_list(self.width, self.height)
+        self._save_todos()
 
-    def _create_note_widget(self, canvas, width, height):
-        """创建笔记组件"""
-        # 根据组件大小计算字体和位置
+    def _layout_note(self, width, height):
+        """笔记布局（画布部分）"""
         title_size = int(width * 0.07)
         title_y = int(height * 0.1)
         line_y = int(height * 0.15)
         margin = int(width * 0.1)
+
+        return {
+            "title": ((width//2, title_y), get_font(title_size, bold=True)),
+            "divider": ((margin, line_y, width-margin, line_y), None),
+        }
+
+    def _place_note_controls(self, width, height):
+        """放置笔记编辑框和保存按钮"""
+        line_y = int(height * 0.15)
+        margin = int(width * 0.1)
         font_size = int(width * 0.04)
         btn_height = int(height * 0.08)
+        btn_width = int(width * 0.25)
+
+        self.note_text.config(font=get_font(font_size))
+        self.note_text.place(x=margin, y=line_y + 10, width=width-2*margin, height=height-line_y-btn_height-20)
+        self.note_save_btn.config(font=get_font(int(font_size*0.8)))
+        self.note_save_btn.place(x=width//2 - btn_width//2, y=height-btn_height-10, width=btn_width, height=btn_height)
+
+    def _create_note_widget(self, canvas, width, height):
+        """创建笔记组件"""
+        layout = self._layout_note(width, height)
 
         # 标题
-        canvas.create_text(
-            width//2, title_y,
-            text="📌 笔记",
-            font=get_font(title_size, bold=True),
-            fill="#333333"
-        )
+        self._add_node("text", "title", layout, text="📌 笔记", fill="#333333")
 
         # 分隔线
-        canvas.create_line(margin, line_y, width-margin, line_y, fill="#E0E0E0", width=1)
+        self._add_node("line", "divider", layout, fill="#E0E0E0", width=1)
 
         # 笔记内容（使用 Text widget 实现可编辑）
         self.note_text = tk.Text(
             self.window,
-            font=get_font(font_size),
             bg="#FFF9C4",
             borderwidth=0,
             highlightthickness=0,
             wrap="word"
         )
 
-        default_note = """记得今天下午3点
-参加产品评审会议
-
-需要准备的材料:
-1. 功能演示
-2. 数据报告
-3. 问题清单"""
-
-        self.note_text.insert("1.0", default_note)
-        self.note_text.place(x=margin, y=line_y + 10, width=width-2*margin, height=height-line_y-btn_height-20)
+        self.note_text.bind("<<Modified>>", self._on_note_modified)
+        self._note_autosave_id = None
+        self._note_loading = False
+        self._note_dirty = False
+        self._load_note()
 
         # 保存按钮
-        btn_width = int(width * 0.25)
-        save_btn = tk.Button(
+        self.note_save_btn = tk.Button(
             self.window,
             text="💾 保存",
             bg="#007AFF",
             fg="white",
             borderwidth=0,
-            font=get_font(int(font_size*0.8)),
             command=self._save_note
         )
-        save_btn.place(x=width//2 - btn_width//2, y=height-btn_height-10, width=btn_width, height=btn_height)
+        self._place_note_controls(width, height)
+
+    def _load_note(self):
+        """加载笔记：第一屏同步插入，其余部分分批在空闲时追加"""
+        chunks = _note_store.iter_chunks(self.uid)
+        self._note_loading = True
+        self.note_text.insert("1.0", next(chunks, ""))
+        self._stream_note(chunks)
+
+    def _stream_note(self, chunks):
+        """每次追加一块，直到读完；加载期间的修改事件不触发自动保存"""
+        if not self.note_text.winfo_exists():
+            chunks.close()
+            return
+        chunk = next(chunks, None)
+        if chunk is not None:
+            self.note_text.insert("end-1c", chunk)
+            self.note_text.after(1, self._stream_note, chunks)
+            return
+
+        self._note_loading = False
+        self.note_text.edit_reset()
+        self.note_text.edit_modified(False)
+        if self._note_dirty:
+            # 加载过程中用户已经改过内容
+            self._note_dirty = False
+            self._schedule_note_autosave()
+
+    def _on_note_modified(self, event=None):
+        """<<Modified>> 只在修改标志变化时触发，处理后复位标志以便接收下一次修改"""
+        if not self.note_text.edit_modified():
+            return
+        self.note_text.edit_modified(False)
+        if self._note_loading:
+            self._note_dirty = True
+            return
+        self._schedule_note_autosave()
+
+    def _schedule_note_autosave(self):
+        """防抖：停止输入 NOTE_AUTOSAVE_MS 后才保存"""
+        if self._note_autosave_id is not None:
+            self.note_text.after_cancel(self._note_autosave_id)
+        self._note_autosave_id = self.note_text.after(self.NOTE_AUTOSAVE_MS, self._autosave_note)
+
+    def _autosave_note(self):
+        """拍下当前内容快照，交给后台线程写入该笔记的文件"""
+        self._note_autosave_id = None
+        uid, text = self.uid, self.note_text.get("1.0", "end-1c")
+        _persistence.submit(("note", uid), lambda: _note_store.save(uid, text), delay=0)
+
+    def _flush_note(self):
+        """立即提交尚在防抖中的笔记修改"""
+        if getattr(self, '_note_autosave_id', None) is not None:
+            self.note_text.after_cancel(self._note_autosave_id)
+            self._autosave_note()
 
     def _save_note(self):
         """保存笔记"""
-        note_content = self.note_text.get("1.0", "end-1c")
+        if self._note_autosave_id is not None:
+            self.note_text.after_cancel(self._note_autosave_id)
+        self._autosave_note()
 
-        # 创建数据目录
-        data_dir = Path.home() / ".dashwidgets"
-        data_dir.mkdir(exist_ok=True)
+        from tkinter import messagebox
+        messagebox.showinfo("笔记已保存", "笔记内容已保存！", parent=self.window)
 
-        # 保存笔记到文件
-        note_file = data_dir / "notes.json"
-        try:
-            data = {}
-            if note_file.exists():
-                with open(note_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+    def _monitor_metrics(self, width, height):
+        """系统监控进度条的几何参数"""
+        bar_height = int(height * 0.05)
+        bar_spacing = int(height * 0.03)
+        cpu_y = int(height * 0.25)
+        return {
+            'bar_width': int(width * 0.6),
+            'bar_height': bar_height,
+            'margin': int(width * 0.1),
+            'cpu_y': cpu_y,
+            'mem_y': cpu_y + bar_height + bar_spacing * 2,
+            'history_box': (int(width * 0.1), int(height * 0.52), width - int(width * 0.1), int(height * 0.88))
+        }
 
-            data['note'] = note_content
-            with open(note_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+    def _layout_system_monitor(self, width, height):
+        """系统监控布局（进度条长度取决于最近一次采样值）"""
+        title_size = int(width * 0.06)
+        title_y = int(height * 0.1)
+        font_size = int(width * 0.04)
+        m = self._monitor_metrics(width, height)
+        margin, bar_width, bar_height = m['margin'], m['bar_width'], m['bar_height']
+        cpu_percent, mem_percent = self.monitor_values
 
-            from tkinter import messagebox
-            messagebox.showinfo("笔记已保存", "笔记内容已保存！", parent=self.window)
-        except Exception as e:
-            logger.error(f"保存笔记失败: {e}")
+        layout = {"title": ((width//2, title_y), get_font(title_size, bold=True))}
+        for key, y, percent in (("cpu", m['cpu_y'], cpu_percent), ("mem", m['mem_y'], mem_percent)):
+            layout[f"{key}_text"] = ((margin, y - bar_height - 5), get_font(font_size))
+            layout[f"{key}_bg"] = ((margin, y, margin + bar_width, y + bar_height), None)
+            layout[f"{key}_bar"] = ((margin, y, margin + ((percent or 0) / 100) * bar_width, y + bar_height), None)
+        return layout
 
     def _create_system_monitor_widget(self, canvas, width, height):
         """创建系统监控组件"""
-        # 根据组件大小计算字体和位置
-        title_size = int(width * 0.06)
-        title_y = int(height * 0.1)
-        margin = int(width * 0.1)
-        font_size = int(width * 0.04)
-        bar_height = int(height * 0.05)
-        bar_spacing = int(height * 0.03)
-        start_y = int(height * 0.25)
-        bar_width = int(width * 0.6)
+        self._acquire_system_sampler()
+        self.monitor_values = self._read_monitor_values()
+        cpu_percent, mem_percent = self.monitor_values
+        layout = self._layout_system_monitor(width, height)
 
         # 标题
-        canvas.create_text(
-            width//2, title_y,
-            text="📊 系统监控",
-            font=get_font(title_size, bold=True),
-            fill="#333333"
-        )
-
-        # 初始化监控元素ID
-        self.monitor_elements = {}
-        self.monitor_config = {
-            'bar_width': bar_width,
-            'bar_height': bar_height,
-            'margin': margin,
-            'start_y': start_y,
-            'bar_spacing': bar_spacing
-        }
+        self._add_node("text", "title", layout, text="📊 系统监控", fill="#333333")
 
         # CPU 使用率
-        cpu_percent = self._get_cpu_usage()
-        cpu_y = start_y
-        self.monitor_elements['cpu_text'] = canvas.create_text(
-            margin, cpu_y - bar_height - 5,
-            text=f"CPU: {cpu_percent}%",
-            font=get_font(font_size),
-            fill="#333333",
-            anchor="w"
-        )
+        self._add_node("text", "cpu_text", layout, text=f"CPU: {self._format_percent(cpu_percent)}", fill="#333333", anchor="w")
 
         # CPU 进度条背景
-        canvas.create_rectangle(
-            margin, cpu_y,
-            margin + bar_width, cpu_y + bar_height,
-            outline="#E0E0E0",
-            width=1,
-            tags="monitor_bg"
-        )
+        self._add_node("rectangle", "cpu_bg", layout, outline="#E0E0E0", width=1, tags="monitor_bg")
 
         # CPU 进度条
-        self.monitor_elements['cpu_bar'] = canvas.create_rectangle(
-            margin, cpu_y,
-            margin + (cpu_percent / 100) * bar_width, cpu_y + bar_height,
-            fill="#34C759",
-            outline="",
-            tags="monitor_fg"
-        )
+        self._add_node("rectangle", "cpu_bar", layout, fill="#34C759", outline="", tags="monitor_fg")
 
         # 内存使用
-        mem_percent = self._get_memory_usage()
-        mem_y = cpu_y + bar_height + bar_spacing * 2
-        self.monitor_elements['mem_text'] = canvas.create_text(
-            margin, mem_y - bar_height - 5,
-            text=f"内存: {mem_percent}%",
-            font=get_font(font_size),
-            fill="#333333",
-            anchor="w"
-        )
+        self._add_node("text", "mem_text", layout, text=f"内存: {self._format_percent(mem_percent)}", fill="#333333", anchor="w")
 
         # 内存进度条背景
-        canvas.create_rectangle(
-            margin, mem_y,
-            margin + bar_width, mem_y + bar_height,
-            outline="#E0E0E0",
-            width=1,
-            tags="monitor_bg"
-        )
+        self._add_node("rectangle", "mem_bg", layout, outline="#E0E0E0", width=1, tags="monitor_bg")
 
         # 内存进度条
-        self.monitor_elements['mem_bar'] = canvas.create_rectangle(
-            margin, mem_y,
-            margin + (mem_percent / 100) * bar_width, mem_y + bar_height,
-            fill="#007AFF",
-            outline="",
-            tags="monitor_fg"
-        )
+        self._add_node("rectangle", "mem_bar", layout, fill="#007AFF", outline="", tags="monitor_fg")
+
+        # CPU / 内存历史曲线
+        self.monitor_chart = Chart(self.scene, "history", kind="line", colors=("#34C759", "#007AFF"))
+        self.monitor_chart.place(self._monitor_metrics(width, height)['history_box'])
+        self._update_monitor_chart()
+
+        # 订阅 CPU / 内存主题，按刷新策略限频绘制（默认每2秒）
+        self._monitor_rendered = 0.0
+        self._monitor_pending = False
+        self._subscribe_topic("cpu", "system.cpu", self._on_system_metric)
+        self._subscribe_topic("memory", "system.memory", self._on_system_metric)
+
+    def _acquire_system_sampler(self, *groups, on_ready=None):
+        """登记为共享采样器的使用者（及所需的扩展指标组），stop_updates 时注销
+
+        采样线程已在运行时 acquire 只唤醒它补采；此时 on_ready 在所需指标组到达后立即
+        调用一次，不必等到下一个刷新周期。
+        """
+        if getattr(self, '_sampler_groups', None) is None:
+            _system_sampler.acquire(*groups)
+            self._sampler_groups = groups
+            if on_ready is not None and self._sampler_loading(*groups):
+                deadline = time.monotonic() + self._data_period() / 1000
+                self._wait_for_sampler(groups, on_ready, deadline)
+
+    def _wait_for_sampler(self, groups, on_ready, deadline):
+        """补采期间短暂轮询快照；超过一个刷新周期后交给定时刷新"""
+        if self._sampler_groups is None:
+            return
+        if not self._sampler_loading(*groups):
+            on_ready()
+        elif time.monotonic() < deadline:
+            self.window.after(
+                self.SAMPLER_READY_POLL_MS,
+                lambda: self._wait_for_sampler(groups, on_ready, deadline)
+            )
 
-        # 每2秒刷新一次
-        self._update_system_monitor()
+    @staticmethod
+    def _sampler_loading(*groups):
+        """所需指标组是否还没有采样过（快照中没有该键；值为 None 表示采集失败）"""
+        snapshot = _system_sampler.latest()
+        return snapshot is None or any(group not in snapshot for group in groups)
+
+    def _read_monitor_values(self):
+        """读取 CPU / 内存主题的当前值，返回 (CPU%, 内存%)，尚无数据时为 None"""
+        values = (_data_bus.read("system.cpu"), _data_bus.read("system.memory"))
+        return tuple(None if value is None else round(value) for value in values)
+
+    def _on_system_metric(self, value):
+        """CPU / 内存主题更新：同一批到达的两个主题合并为一次绘制，距上次绘制不足刷新间隔时跳过"""
+        if self._monitor_pending:
+            return
+        if (time.monotonic() - self._monitor_rendered) * 1000 < self._data_period() * 0.9:
+            return
+        self._monitor_pending = True
+        self.window.after_idle(self._update_system_monitor)
 
-    def _get_cpu_usage(self):
-        """获取CPU使用率（模拟）"""
-        return random.randint(20, 80)
+    def _update_monitor_chart(self):
+        """用共享采样器的历史序列刷新曲线"""
+        self.monitor_chart.update(_system_sampler.history('cpu'), _system_sampler.history('mem'))
 
-    def _get_memory_usage(self):
-        """获取内存使用率（模拟）"""
-        return random.randint(30, 70)
+    @staticmethod
+    def _format_percent(percent):
+        return "--" if percent is None else f"{percent}%"
 
     def _update_system_monitor(self):
         """更新系统监控数据"""
-        if not hasattr(self, 'monitor_elements') or not hasattr(self, 'window'):
+        if not hasattr(self, 'monitor_values') or not hasattr(self, 'window'):
+            return
+
+        self._monitor_pending = False
+
+        # 不可见时不更新画布
+        if not self.visibility.should_update():
             return
 
         try:
-            # 获取新的数据
-            cpu_percent = self._get_cpu_usage()
-            mem_percent = self._get_memory_usage()
-
-            # 获取配置
-            config = getattr(self, 'monitor_config', {
-                'bar_width': 100,
-                'bar_height': 10,
-                'margin': 25,
-                'start_y': self.height // 2,
-                'bar_spacing': 30
-            })
-
-            bar_width = config['bar_width']
-            bar_height = config['bar_height']
-            margin = config['margin']
-            start_y = config['start_y']
-            bar_spacing = config['bar_spacing']
-
-            # 更新CPU显示
-            self.canvas.itemconfig(
-                self.monitor_elements['cpu_text'],
-                text=f"CPU: {cpu_percent}%"
-            )
+            self._monitor_rendered = time.monotonic()
+            cpu_percent, mem_percent = self.monitor_values = self._read_monitor_values()
+
+            m = self._monitor_metrics(self.width, self.height)
+            margin, bar_width, bar_height = m['margin'], m['bar_width'], m['bar_height']
+
+            for key, label, y, percent in (
+                ("cpu", "CPU", m['cpu_y'], cpu_percent),
+                ("mem", "内存", m['mem_y'], mem_percent),
+            ):
+                # 根据使用率改变颜色；文字、长度和颜色未变化时场景图不会重复下发
+                self.scene.update(f"{key}_text", text=f"{label}: {self._format_percent(percent)}")
+                percent = percent or 0
+                color = usage_color(percent)
+                self.scene.update(
+                    f"{key}_bar",
+                    (margin, y, margin + (percent / 100) * bar_width, y + bar_height),
+                    fill=color
+                )
 
-            # 更新CPU进度条
-            cpu_y = start_y
-            self.canvas.coords(
-                self.monitor_elements['cpu_bar'],
-                margin, cpu_y,
-                margin + (cpu_percent / 100) * bar_width, cpu_y + bar_height
-            )
+            self._update_monitor_chart()
 
-            # 根据使用率改变颜色
-            cpu_color = "#34C759" if cpu_percent < 50 else "#FF9500" if cpu_percent < 80 else "#FF3B30"
-            self.canvas.itemconfig(self.monitor_elements['cpu_bar'], fill=cpu_color)
+        except Exception:
+            pass
 
-            # 更新内存显示
-            self.canvas.itemconfig(
-                self.monitor_elements['mem_text'],
-                text=f"内存: {mem_percent}%"
-            )
+    def _core_cells(self, width, height, count):
+        """每核 CPU 网格：按区域宽高比排列，返回每个格子的矩形；没有核心数据时为空"""
+        if count <= 0:
+            return []
+        x0, y0 = int(width * 0.08), int(height * 0.24)
+        x1, y1 = width - x0, height - int(height * 0.08)
+        cols = max(1, min(count, round((count * (x1 - x0) / (y1 - y0)) ** 0.5)))
+        rows = -(-count // cols)
+        cols = -(-count // rows)  # 行数确定后尽量填满每一行
+        cell_w = (x1 - x0) / cols
+        cell_h = (y1 - y0) / rows
+        gap = 1 if min(cell_w, cell_h) < 12 else 2
+        return [
+            (int(x0 + col * cell_w), int(y0 + row * cell_h),
+             int(x0 + (col + 1) * cell_w) - gap, int(y0 + (row + 1) * cell_h) - gap)
+            for row, col in (divmod(i, cols) for i in range(count))
+        ]
 
-            # 更新内存进度条
-            mem_y = cpu_y + bar_height + bar_spacing * 2
-            self.canvas.coords(
-                self.monitor_elements['mem_bar'],
-                margin, mem_y,
-                margin + (mem_percent / 100) * bar_width, mem_y + bar_height
-            )
+    def _layout_cpu_cores(self, width, height):
+        """每核 CPU 布局（柱高取决于最近一次采样值）"""
+        title_size = int(width * 0.06)
+        font_size = int(width * 0.045)
+        layout = {
+            "title": ((width//2, int(height * 0.09)), get_font(title_size, bold=True)),
+            "summary": ((width//2, int(height * 0.17)), get_font(font_size)),
+        }
+        for i, (x0, y0, x1, y1) in enumerate(self._core_cells(width, height, len(self.core_values))):
+            percent = self.core_values[i]
+            layout[f"core_bg{i}"] = ((x0, y0, x1, y1), None)
+            layout[f"core_bar{i}"] = ((x0, y1 - int((y1 - y0) * percent / 100), x1, y1), None)
+        return layout
+
+    def _create_cpu_cores_widget(self, canvas, width, height):
+        """创建每核 CPU 组件：每个核心一个格子，柱高和颜色表示使用率"""
+        self._acquire_system_sampler("cores", on_ready=self._update_cpu_cores)
+        self.core_values = self._read_core_values()
+        layout = self._layout_cpu_cores(width, height)
+        self._add_node("text", "title", layout, text=f"🧮 CPU 核心 ({len(self.core_values)})", fill="#333333")
+        self._add_node("text", "summary", layout, text=self._core_summary(), fill="#333333")
+        self._sync_core_nodes(layout)
+        self._subscribe_tick("monitor", self._update_cpu_cores, self._data_period)
+
+    def _read_core_values(self):
+        """各核心使用率（取整，减少无变化的画布更新）"""
+        snapshot = _system_sampler.latest() or {}
+        return [round(percent) for percent in snapshot.get('cores') or ()]
+
+    def _core_summary(self):
+        if not self.core_values:
+            return "加载中…" if self._sampler_loading("cores") else "不可用"
+        return f"平均 {round(sum(self.core_values) / len(self.core_values))}% · 最高 {max(self.core_values)}%"
+
+    def _sync_core_nodes(self, layout):
+        """创建缺少的格子节点，删除多余的（核心上下线）"""
+        count = len(self.core_values)
+        for i in range(count):
+            if f"core_bg{i}" not in self.scene:
+                self._add_node("rectangle", f"core_bg{i}", layout, fill="", outline="#E0E0E0", width=1)
+                self._add_node("rectangle", f"core_bar{i}", layout, fill=usage_color(self.core_values[i]), outline="")
+        for name in self.scene.names("core_"):
+            if int(name[len(name.rstrip("0123456789")):]) >= count:
+                self.scene.remove(name)
+
+    def _update_cpu_cores(self):
+        """更新每核 CPU：只有柱高或颜色变化的格子才会下发画布调用"""
+        if not hasattr(self, 'core_values') or not self.visibility.should_update():
+            return
+        try:
+            values = self._read_core_values()
+            resized = len(values) != len(self.core_values)
+            self.core_values = values
+            layout = self._layout_cpu_cores(self.width, self.height)
+            if resized:
+                self._sync_core_nodes(layout)
+                for name in self.scene.names("core_bg"):
+                    self.scene.update(name, layout[name][0])
+                self.scene.update("title", text=f"🧮 CPU 核心 ({len(values)})")
+            for i, percent in enumerate(values):
+                self.scene.update(f"core_bar{i}", layout[f"core_bar{i}"][0], fill=usage_color(percent))
+            self.scene.update("summary", text=self._core_summary())
+        except Exception:
+            pass
+
+    def _disk_net_boxes(self, width, height):
+        margin = int(width * 0.08)
+        return {
+            'disk': (margin, int(height * 0.3), width - margin, int(height * 0.54)),
+            'net': (margin, int(height * 0.7), width - margin, int(height * 0.92)),
+        }
+
+    def _layout_disk_net(self, width, height):
+        """磁盘网络布局"""
+        title_size = int(width * 0.06)
+        font_size = int(width * 0.045)
+        margin = int(width * 0.08)
+        return {
+            "title": ((width//2, int(height * 0.09)), get_font(title_size, bold=True)),
+            "disk_text": ((margin, int(height * 0.22)), get_font(font_size)),
+            "net_text": ((margin, int(height * 0.62)), get_font(font_size)),
+        }
 
-            # 根据使用率改变颜色
-            mem_color = "#34C759" if mem_percent < 50 else "#FF9500" if mem_percent < 80 else "#FF3B30"
-            self.canvas.itemconfig(self.monitor_elements['mem_bar'], fill=mem_color)
+    def _create_disk_net_widget(self, canvas, width, height):
+        """创建磁盘网络组件：合计吞吐文字加读/写、收/发两条迷你图"""
+        self._acquire_system_sampler("disk", "net", on_ready=self._update_disk_net)
+        layout = self._layout_disk_net(width, height)
+        self._add_node("text", "title", layout, text="💾 磁盘与网络", fill="#333333")
+        self._add_node("text", "disk_text", layout, text="", fill="#333333", anchor="w")
+        self._add_node("text", "net_text", layout, text="", fill="#333333", anchor="w")
+
+        boxes = self._disk_net_boxes(width, height)
+        self.disk_chart = Chart(self.scene, "disk_chart", kind="sparkline", colors=("#34C759", "#FF9500"), max_value=None)
+        self.disk_chart.place(boxes['disk'])
+        self.net_chart = Chart(self.scene, "net_chart", kind="sparkline", colors=("#007AFF", "#AF52DE"), max_value=None)
+        self.net_chart.place(boxes['net'])
+
+        self._refresh_disk_net()
+        self._subscribe_tick("monitor", self._update_disk_net, self._data_period)
+
+    def _update_disk_net(self):
+        """定时刷新：不可见时跳过"""
+        if hasattr(self, 'disk_chart') and self.visibility.should_update():
+            self._refresh_disk_net()
+
+    def _refresh_disk_net(self):
+        """更新磁盘网络吞吐"""
+        try:
+            snapshot = _system_sampler.latest() or {}
+            for key, label, names in (("disk", "磁盘 读 {} 写 {}", ('disk_read', 'disk_write')),
+                                      ("net", "网络 ↓ {} ↑ {}", ('net_rx', 'net_tx'))):
+                rates = snapshot.get(key)
+                if key not in snapshot:
+                    text = f"{label.split()[0]} 加载中…"
+                elif rates is None:
+                    text = f"{label.split()[0]} 不可用"
+                else:
+                    text = label.format(*(format_rate(sum(rate[i] for rate in rates.values())) for i in (0, 1)))
+                self.scene.update(f"{key}_text", text=text)
+                getattr(self, f"{key}_chart").update(*(_system_sampler.history(name) for name in names))
+        except Exception:
+            pass
 
-            # 2秒后再次刷新
-            self.window.after(2000, self._update_system_monitor)
+    def _battery_gauge_box(self, width, height):
+        size = int(min(width, height) * 0.36)
+        cx, cy = width // 2, int(height * 0.68)
+        return (cx - size // 2, cy - size // 2, cx + size // 2, cy + size // 2)
 
+    def _layout_thermal_power(self, width, height):
+        """温度电池布局：最多三个温度区，下方是电量仪表盘"""
+        title_size = int(width * 0.07)
+        font_size = int(width * 0.06)
+        margin = int(width * 0.1)
+        layout = {"title": ((width//2, int(height * 0.1)), get_font(title_size, bold=True))}
+        for i in range(self.THERMAL_ROWS):
+            layout[f"temp{i}"] = ((margin, int(height * (0.23 + i * 0.09))), get_font(font_size))
+        x0, y0, x1, y1 = self._battery_gauge_box(width, height)
+        layout["battery_text"] = (((x0 + x1) // 2, (y0 + y1) // 2), get_font(font_size, bold=True))
+        layout["battery_status"] = ((width//2, y1 + int(height * 0.04)), get_font(int(width * 0.05)))
+        return layout
+
+    def _create_thermal_power_widget(self, canvas, width, height):
+        """创建温度电池组件"""
+        self._acquire_system_sampler("thermal", "power", on_ready=self._update_thermal_power)
+        layout = self._layout_thermal_power(width, height)
+        self._add_node("text", "title", layout, text="🌡 温度与电池", fill="#333333")
+        for i in range(self.THERMAL_ROWS):
+            self._add_node("text", f"temp{i}", layout, text="", fill="#333333", anchor="w")
+        self.battery_gauge = Chart(self.scene, "battery", kind="gauge", colors=("#34C759",), line_width=4)
+        self.battery_gauge.place(self._battery_gauge_box(width, height))
+        self._add_node("text", "battery_text", layout, text="", fill="#333333")
+        self._add_node("text", "battery_status", layout, text="", fill="#666666")
+
+        self._refresh_thermal_power()
+        self._subscribe_tick("monitor", self._update_thermal_power, self._data_period)
+
+    def _update_thermal_power(self):
+        """定时刷新：不可见时跳过"""
+        if hasattr(self, 'battery_gauge') and self.visibility.should_update():
+            self._refresh_thermal_power()
+
+    def _refresh_thermal_power(self):
+        """更新温度和电池读数"""
+        try:
+            snapshot = _system_sampler.latest() or {}
+            loading = 'thermal' not in snapshot or 'power' not in snapshot
+
+            # 温度最高的几个温度区
+            zones = sorted(snapshot.get('thermal') or (), key=lambda zone: -zone[1])
+            lines = [f"{name[:12]} {celsius:.0f}°C" for name, celsius in zones[:self.THERMAL_ROWS]]
+            if not lines:
+                lines = ["加载中…" if loading else "无温度传感器"]
+            for i in range(self.THERMAL_ROWS):
+                self.scene.update(f"temp{i}", text=lines[i] if i < len(lines) else "")
+
+            batteries = snapshot.get('power') or ()
+            if batteries:
+                _, capacity, status = batteries[0]
+                color = "#FF3B30" if capacity < 20 else "#FF9500" if capacity < 50 else "#34C759"
+                self.battery_gauge.colors = (color,)
+                self.battery_gauge.update(capacity)
+                self.scene.update("battery_text", text=f"{capacity}%")
+                self.scene.update("battery_status", text=self.BATTERY_STATUS.get(status, status))
+            else:
+                self.battery_gauge.update(0)
+                self.scene.update("battery_text", text="--")
+                self.scene.update("battery_status", text="" if loading else "无电池")
         except Exception:
             pass
 
-    def _create_calendar_widget(self, canvas, width, height):
-        """创建日历组件"""
+    def _layout_process(self, width, height):
+        """进程列表布局：表头加固定行数，每行名称、CPU、内存三列"""
+        title_size = int(width * 0.055)
+        font_size = int(width * 0.042)
+        name_x, cpu_x, mem_x = int(width * 0.08), int(width * 0.63), int(width * 0.92)
+        header_y = int(height * 0.17)
+        row_height = (height * 0.9 - header_y) / (self.PROCESS_ROWS + 1)
+        layout = {
+            "title": ((width//2, int(height * 0.08)), get_font(title_size, bold=True)),
+            "header_name": ((name_x, header_y), get_font(font_size, bold=True)),
+            "header_cpu": ((cpu_x, header_y), get_font(font_size, bold=True)),
+            "header_mem": ((mem_x, header_y), get_font(font_size, bold=True)),
+        }
+        for i in range(self.PROCESS_ROWS):
+            y = int(header_y + row_height * (i + 1))
+            layout[f"proc_name{i}"] = ((name_x, y), get_font(font_size))
+            layout[f"proc_cpu{i}"] = ((cpu_x, y), get_font(font_size))
+            layout[f"proc_mem{i}"] = ((mem_x, y), get_font(font_size))
+        return layout
+
+    def _create_process_widget(self, canvas, width, height):
+        """创建进程组件：点击表头的 CPU / 内存切换排序"""
+        self._acquire_system_sampler("processes", on_ready=self._update_processes)
+        self.process_sort = "cpu"
+        layout = self._layout_process(width, height)
+        self._add_node("text", "title", layout, text="📋 进程", fill="#333333")
+        self._add_node("text", "header_name", layout, text="名称", fill="#666666", anchor="w")
+        for key in ("cpu", "mem"):
+            item = self._add_node("text", f"header_{key}", layout, text="", fill="#666666", anchor="e")
+            self.canvas.tag_bind(item, "<Button-1>", lambda event, key=key: self._sort_processes(key))
+        for i in range(self.PROCESS_ROWS):
+            self._add_node("text", f"proc_name{i}", layout, text="", fill="#333333", anchor="w")
+            self._add_node("text", f"proc_cpu{i}", layout, text="", fill="#333333", anchor="e")
+            self._add_node("text", f"proc_mem{i}", layout, text="", fill="#333333", anchor="e")
+
+        self._refresh_processes()
+        self._subscribe_tick("monitor", self._update_processes, self._data_period)
+
+    def _sort_processes(self, key):
+        self.process_sort = key
+        self._refresh_processes()
+
+    def _update_processes(self):
+        """定时刷新：不可见时跳过"""
+        if hasattr(self, 'process_sort') and self.visibility.should_update():
+            self._refresh_processes()
+
+    def _refresh_processes(self):
+        """更新进程列表；行节点固定，只改文字"""
+        try:
+            snapshot = _system_sampler.latest() or {}
+            top = snapshot.get('processes')
+            self.scene.update("header_cpu", text="CPU ▼" if self.process_sort == "cpu" else "CPU")
+            self.scene.update("header_mem", text="内存 ▼" if self.process_sort == "mem" else "内存")
+            if top is None:
+                self.scene.update("title", text="📋 进程（加载中）" if 'processes' not in snapshot else "📋 进程（不可用）")
+                rows = []
+            else:
+                self.scene.update("title", text=f"📋 进程 ({top['count']})")
+                rows = top[self.process_sort]
+            for i in range(self.PROCESS_ROWS):
+                if i < len(rows):
+                    _, name, cpu_percent, rss = rows[i]
+                    if len(name) > 11:
+                        name = name[:10] + "…"
+                    texts = (name, f"{cpu_percent:.1f}%", format_bytes(rss))
+                else:
+                    texts = ("", "", "")
+                for column, text in zip(("name", "cpu", "mem"), texts):
+                    self.scene.update(f"proc_{column}{i}", text=text)
+        except Exception:
+            pass
+
+    def _cgroup_chart_box(self, width, height):
+        margin = int(width * 0.08)
+        return (margin, int(height * 0.5), width - margin, int(height * 0.7))
+
+    def _layout_cgroup(self, width, height):
+        """容器资源布局：当前 cgroup 的详情和 CPU 曲线，下方列出其他 cgroup"""
+        title_size = int(width * 0.055)
+        font_size = int(width * 0.042)
+        margin = int(width * 0.08)
+        layout = {
+            "title": ((width//2, int(height * 0.07)), get_font(title_size, bold=True)),
+            "cg_name": ((margin, int(height * 0.15)), get_font(font_size, bold=True)),
+        }
+        for i, key in enumerate(("cg_cpu", "cg_mem", "cg_io", "cg_psi")):
+            layout[key] = ((margin, int(height * (0.22 + i * 0.065))), get_font(font_size))
+        for i in range(self.CGROUP_ROWS):
+            y = int(height * (0.78 + i * 0.07))
+            layout[f"cg_row_name{i}"] = ((margin, y), get_font(font_size))
+            layout[f"cg_row_cpu{i}"] = ((int(width * 0.72), y), get_font(font_size))
+            layout[f"cg_row_mem{i}"] = ((width - margin, y), get_font(font_size))
+        return layout
+
+    def _create_cgroup_widget(self, canvas, width, height):
+        """创建容器资源组件：点击下方的行切换详情显示的 cgroup"""
+        self._acquire_system_sampler("cgroups", on_ready=self._update_cgroups)
+        self.cgroup_focus = None  # 详情显示的 cgroup，None 表示第一个
+        self._cgroup_rows = [None] * self.CGROUP_ROWS
+        layout = self._layout_cgroup(width, height)
+        self._add_node("text", "title", layout, text="📦 容器资源", fill="#333333")
+        for key in ("cg_name", "cg_cpu", "cg_mem", "cg_io", "cg_psi"):
+            self._add_node("text", key, layout, text="", fill="#333333", anchor="w")
+        for i in range(self.CGROUP_ROWS):
+            for column, anchor in (("name", "w"), ("cpu", "e"), ("mem", "e")):
+                item = self._add_node("text", f"cg_row_{column}{i}", layout, text="", fill="#666666", anchor=anchor)
+                self.canvas.tag_bind(item, "<Button-1>", lambda event, i=i: self._focus_cgroup_row(i))
+        self.cgroup_chart = Chart(self.scene, "cg_chart", kind="line", colors=("#34C759",), max_value=None)
+        self.cgroup_chart.place(self._cgroup_chart_box(width, height))
+
+        self._refresh_cgroups()
+        self._subscribe_tick("monitor", self._update_cgroups, self._data_period)
+
+    def _focus_cgroup_row(self, index):
+        if self._cgroup_rows[index] is not None:
+            self.cgroup_focus = self._cgroup_rows[index]
+            self._refresh_cgroups()
+
+    def _update_cgroups(self):
+        """定时刷新：不可见时跳过"""
+        if hasattr(self, 'cgroup_chart') and self.visibility.should_update():
+            self._refresh_cgroups()
+
+    @staticmethod
+    def _short_cgroup_name(name, limit):
+        """cgroup 路径太长时保留末尾部分"""
+        return name if len(name) <= limit else "…" + name[-(limit - 1):]
+
+    def _refresh_cgroups(self):
+        """更新容器资源"""
+        try:
+            snapshot = _system_sampler.latest() or {}
+            cgroups = snapshot.get('cgroups')
+            if not cgroups:
+                if 'cgroups' not in snapshot:
+                    status = "加载中…"
+                elif cgroups is None:
+                    status = "不可用（需要 cgroup v2）"
+                else:
+                    status = "没有匹配的 cgroup"
+                self.scene.update("title", text="📦 容器资源")
+                self.scene.update("cg_name", text=status)
+                for key in ("cg_cpu", "cg_mem", "cg_io", "cg_psi"):
+                    self.scene.update(key, text="")
+                cgroups = {}
+            else:
+                if self.cgroup_focus not in cgroups:
+                    self.cgroup_focus = next(iter(cgroups))
+                name, m = self.cgroup_focus, cgroups[self.cgroup_focus]
+                na = "--"
+                self.scene.update("title", text=f"📦 容器资源 ({len(cgroups)})")
+                self.scene.update("cg_name", text=self._short_cgroup_name(name, 28))
+                cpu = na if m['cpu_percent'] is None else f"{m['cpu_percent']:.1f}%"
+                self.scene.update("cg_cpu", text=f"CPU {cpu} · 节流 {m['throttled_percent']:.1f}%")
+                memory = na if m['memory'] is None else format_bytes(m['memory'])
+                limit = "无限制" if m['memory_max'] is None else format_bytes(m['memory_max'])
+                self.scene.update("cg_mem", text=f"内存 {memory} / {limit}")
+                if m['io_read'] is None:
+                    self.scene.update("cg_io", text=f"I/O {na}")
+                else:
+                    self.scene.update("cg_io", text=f"I/O 读 {format_rate(m['io_read'])} 写 {format_rate(m['io_write'])}")
+                self.scene.update(
+                    "cg_psi",
+                    text=f"压力 CPU {m['psi_cpu']:.1f}% · 内存 {m['psi_memory']:.1f}% · I/O {m['psi_io']:.1f}%"
+                )
+                self.cgroup_chart.update(_system_sampler.history(f"cgroup:{name}"))
+
+            # 其他 cgroup 按 CPU 使用率排序
+            others = heapq.nlargest(
+                self.CGROUP_ROWS,
+                (item for item in cgroups.items() if item[0] != self.cgroup_focus),
+                key=lambda item: item[1]['cpu_percent'] or 0.0
+            )
+            for i in range(self.CGROUP_ROWS):
+                if i < len(others):
+                    name, m = others[i]
+                    self._cgroup_rows[i] = name
+                    texts = (
+                        self._short_cgroup_name(name, 12),
+                        "--" if m['cpu_percent'] is None else f"{m['cpu_percent']:.1f}%",
+                        "--" if m['memory'] is None else format_bytes(m['memory']),
+                    )
+                else:
+                    self._cgroup_rows[i] = None
+                    texts = ("", "", "")
+                for column, text in zip(("name", "cpu", "mem"), texts):
+                    self.scene.update(f"cg_row_{column}{i}", text=text)
+        except Exception:
+            pass
+
+    def _layout_calendar(self, width, height):
+        """日历布局"""
         # 根据组件大小计算字体和位置
         icon_size = int(width * 0.2)
         day_size = int(width * 0.24)
@@ -1187,28 +4884,40 @@ class DraggableWidget:
         icon_y = int(height * 0.25)
         year_y = int(height * 0.85)
 
+        return {
+            "icon": ((width//2, icon_y), ("Segoe UI Emoji", icon_size)),
+            "day": ((width//2, height//2 + height//20), get_font(day_size, bold=True)),
+            "month": ((width//2, year_y), get_font(year_size)),
+        }
+
+    def _create_calendar_widget(self, canvas, width, height):
+        """创建日历组件"""
+        layout = self._layout_calendar(width, height)
+
         # 图标
-        canvas.create_text(width//2, icon_y, text=self.template.icon_name, font=("Segoe UI Emoji", icon_size))
+        self._add_node("text", "icon", layout, text=self.template.icon_name)
 
         # 日期
         now = datetime.datetime.now()
-        canvas.create_text(
-            width//2, height//2 + height//20,
-            text=str(now.day),
-            font=get_font(day_size, bold=True),
-            fill="#333333"
-        )
+        self._add_node("text", "day", layout, text=str(now.day), fill="#333333")
 
         # 年月
-        canvas.create_text(
-            width//2, year_y,
-            text=f"{now.year}年 {now.month}月",
-            font=get_font(year_size),
-            fill="#666666"
-        )
+        self._add_node("text", "month", layout, text=f"{now.year}年 {now.month}月", fill="#666666")
 
-    def _create_timer_widget(self, canvas, width, height):
-        """创建计时器组件"""
+        # 午夜翻日
+        self._subscribe_calendar("calendar", self._update_calendar)
+
+    def _update_calendar(self):
+        """更新日历日期（午夜翻日时触发）"""
+        if not self.window.winfo_exists() or not self.visibility.should_update():
+            return
+
+        now = datetime.datetime.now()
+        self.scene.update("day", text=str(now.day))
+        self.scene.update("month", text=f"{now.year}年 {now.month}月")
+
+    def _layout_timer(self, width, height):
+        """计时器布局"""
         # 根据组件大小计算字体和位置
         icon_size = int(width * 0.15)
         time_size = int(width * 0.14)
@@ -1217,33 +4926,29 @@ class DraggableWidget:
         btn_y = height - int(height * 0.15)
         btn_text_size = int(width * 0.06)
 
+        return {
+            "icon": ((width//2, icon_y), ("Segoe UI Emoji", icon_size)),
+            "time": ((width//2, height//2 + height//20), get_font(time_size, bold=True)),
+            "btn": ((width//2 - btn_radius, btn_y - btn_radius, width//2 + btn_radius, btn_y + btn_radius), None),
+            "btn_text": ((width//2, btn_y), get_font(btn_text_size)),
+        }
+
+    def _create_timer_widget(self, canvas, width, height):
+        """创建计时器组件"""
+        layout = self._layout_timer(width, height)
+
         # 图标
-        canvas.create_text(width//2, icon_y, text=self.template.icon_name, font=("Segoe UI Emoji", icon_size))
+        self._add_node("text", "icon", layout, text=self.template.icon_name)
 
         # 计时器显示
-        canvas.create_text(
-            width//2, height//2 + height//20,
-            text="00:00",
-            font=get_font(time_size, bold=True),
-            fill="#333333"
-        )
+        self._add_node("text", "time", layout, text="00:00", fill="#333333")
 
         # 按钮
-        canvas.create_oval(
-            width//2 - btn_radius, btn_y - btn_radius,
-            width//2 + btn_radius, btn_y + btn_radius,
-            fill="#007AFF",
-            outline=""
-        )
-        canvas.create_text(
-            width//2, btn_y,
-            text="▶",
-            fill="white",
-            font=get_font(btn_text_size)
-        )
+        self._add_node("oval", "btn", layout, fill="#007AFF", outline="")
+        self._add_node("text", "btn_text", layout, text="▶", fill="white")
 
-    def _create_exchange_widget(self, canvas, width, height):
-        """创建汇率组件"""
+    def _layout_exchange(self, width, height):
+        """汇率布局"""
         # 根据组件大小计算字体和位置
         title_size = int(width * 0.06)
         title_y = int(height * 0.1)
@@ -1252,35 +4957,46 @@ class DraggableWidget:
         time_size = int(width * 0.04)
         time_y = height - int(height * 0.1)
 
-        # 标题
-        canvas.create_text(
-            width//2, title_y,
-            text="💱 汇率",
-            font=get_font(title_size, bold=True),
-            fill="#333333"
-        )
+        return {
+            "title": ((width//2, title_y), get_font(title_size, bold=True)),
+            "main": ((width//2, height//2 - height//15), _text_fitter.fit_font(self.exchange_lines[0], width * 0.9, main_size, bold=True)),
+            "sub": ((width//2, height//2 + height//10), _text_fitter.fit_font(self.exchange_lines[1], width * 0.9, sub_size)),
+            "updated": ((width//2, time_y), get_font(time_size)),
+        }
 
-        # 汇率信息
-        canvas.create_text(
-            width//2, height//2 - height//15,
-            text="1 USD = 7.24 CNY",
-            font=get_font(main_size, bold=True),
-            fill="#007AFF"
-        )
+    def _exchange_lines(self):
+        """按汇率主题的当前值生成两行文字"""
+        lines = []
+        for base, quote in self.EXCHANGE_PAIRS:
+            rate = _data_bus.read(f"fx.{base}/{quote}")
+            lines.append(f"1 {base} = {'--' if rate is None else f'{rate:.2f}'} {quote}")
+        return tuple(lines)
 
-        canvas.create_text(
-            width//2, height//2 + height//10,
-            text="1 EUR = 7.85 CNY",
-            font=get_font(sub_size),
-            fill="#333333"
-        )
+    def _create_exchange_widget(self, canvas, width, height):
+        """创建汇率组件"""
+        self.exchange_lines = self._exchange_lines()
+        layout = self._layout_exchange(width, height)
 
-        canvas.create_text(
-            width//2, time_y,
-            text="更新于 5分钟前",
-            font=get_font(time_size),
-            fill="#999999"
-        )
+        # 标题
+        self._add_node("text", "title", layout, text="💱 汇率", fill="#333333")
+
+        # 汇率信息
+        self._add_node("text", "main", layout, text=self.exchange_lines[0], fill="#007AFF")
+        self._add_node("text", "sub", layout, text=self.exchange_lines[1], fill="#333333")
+        self._add_node("text", "updated", layout, text=time.strftime("更新于 %H:%M"), fill="#999999")
+
+        # 每个货币对订阅一个主题，多个汇率组件共用同一份数据
+        for base, quote in self.EXCHANGE_PAIRS:
+            self._subscribe_topic(f"fx_{base}", f"fx.{base}/{quote}", self._on_exchange_rate)
+
+    def _on_exchange_rate(self, value):
+        """汇率主题更新：刷新文字并按新文字重新适配字号"""
+        self.exchange_lines = self._exchange_lines()
+        layout = self._layout_exchange(self.width, self.height)
+        for name, text in (("main", self.exchange_lines[0]), ("sub", self.exchange_lines[1])):
+            coords, font = layout[name]
+            self.scene.update(name, coords, font=font, text=text)
+        self.scene.update("updated", text=time.strftime("更新于 %H:%M"))
 
     def _create_resize_handlers(self):
         """创建调整大小的手柄（透明区域）"""
@@ -1346,8 +5062,7 @@ class DraggableWidget:
         self._start_y = event.y_root
         self._start_width = self.width
         self._start_height = self.height
-        self._start_window_x = self.window.winfo_x()
-        self._start_window_y = self.window.winfo_y()
+        self._start_window_x, self._start_window_y = self._geometry[0], self._geometry[1]
 
     def _do_resize(self, event):
         """执行调整大小"""
@@ -1375,18 +5090,8 @@ class DraggableWidget:
             new_height = max(self.min_height, self._start_height - dy)
             new_y = self._start_window_y + (self._start_height - new_height)
 
-        # 应用新尺寸
-        self.width = new_width
-        self.height = new_height
-
-        # 更新窗口
-        self.window.geometry(f"{new_width}x{new_height}+{new_x}+{new_y}")
-
-        # 更新Canvas
-        self.canvas.config(width=new_width, height=new_height)
-
-        # 更新调整区域
-        self._update_resize_handlers()
+        # 只更新几何缓存，由帧时钟合并提交
+        self._set_geometry(new_x, new_y, new_width, new_height)
 
     def _end_resize(self, event):
         """结束调整大小"""
@@ -1394,10 +5099,8 @@ class DraggableWidget:
         if self.resizing:
             self.resizing = False
             self.resize_edge = None
-
-            # 重新创建内容以适应新尺寸
-            self.canvas.delete("all")
-            self._create_widget_content(self.canvas, self.width, self.height)
+            self._flush_geometry()
+            self.relayout()
 
     def _on_motion(self, event):
         """鼠标移动事件（用于更新光标）"""
@@ -1440,18 +5143,85 @@ class DraggableWidget:
         if self.resizing:
             return
 
-        self._start_x = event.x
-        self._start_y = event.y
+        # 记录指针相对窗口左上角的偏移，拖拽时无需再查询窗口位置
+        self._start_x = event.x_root - self._geometry[0]
+        self._start_y = event.y_root - self._geometry[1]
 
     def _on_drag(self, event):
         """鼠标拖拽事件"""
         # 如果正在调整大小，不触发拖拽
         if self.resizing:
             return
-
-        x = self.window.winfo_x() + (event.x - self._start_x)
-        y = self.window.winfo_y() + (event.y - self._start_y)
-        self.window.geometry(f"+{x}+{y}")
+
+        self._set_geometry(event.x_root - self._start_x, event.y_root - self._start_y, self.width, self.height)
+
+    def _on_release(self, _=None):
+        """鼠标释放：立即提交尚未应用的位置"""
+        if not self.resizing:
+            self._flush_geometry()
+
+    def _set_geometry(self, x, y, width, height):
+        """更新几何缓存并请求在下一帧提交"""
+        self._geometry = [x, y, width, height]
+        self.width = width
+        self.height = height
+        self.drag_stats["events"] += 1
+        if not self._geometry_pending:
+            self._geometry_pending = True
+            AnimationManager.clock.request_frame(self.window, self._apply_geometry)
+
+    def _apply_geometry(self):
+        """将几何缓存提交给 Tk，只在尺寸变化时才调整 Canvas 和缩放手柄"""
+        if not self._geometry_pending or not self.window.winfo_exists():
+            return
+        self._geometry_pending = False
+
+        x, y, width, height = self._geometry
+        _, _, applied_width, applied_height = self._applied_geometry
+        if (width, height) != (applied_width, applied_height):
+            self.window.geometry(f"{width}x{height}+{x}+{y}")
+            self.canvas.config(width=width, height=height)
+            self._update_resize_handlers()
+            # 缩放过程中实时调整内容布局，静态图层在结束时再重新渲染
+            self.relayout(width, height, static_layers=not self.resizing)
+        else:
+            self.window.geometry(f"+{x}+{y}")
+
+        self._applied_geometry = (x, y, width, height)
+        self.drag_stats["applied"] += 1
+        self.visibility.update_bounds(x, y, width, height)
+
+    def _flush_geometry(self):
+        """立即提交待应用的几何并记录本次拖拽/缩放的合并比例"""
+        if self._geometry_pending:
+            self._apply_geometry()
+        events, applied = self.drag_stats["events"], self.drag_stats["applied"]
+        if applied:
+            logger.debug(f"{self.template.name} 移动事件 {events} 次，实际提交 {applied} 次（{events / applied:.1f}:1）")
+        self.drag_stats = {"events": 0, "applied": 0}
+        self._save_session()
+
+    def _save_session(self):
+        """把模板、尺寸档位和几何写入会话布局（后台执行，布局未变化时跳过）"""
+        x, y, width, height = self._geometry
+        layout = {"size": self.size, "x": int(x), "y": int(y), "width": int(width), "height": int(height)}
+        if layout == self._saved_layout:
+            return
+        self._saved_layout = layout
+        uid, template_name = self.uid, self.template.name
+        _persistence.submit(("session", uid), lambda: _config_store.put_session(uid, template_name, layout))
+
+    def _delete_session(self):
+        """从会话布局中移除（与未执行的保存共用同一个 key，会直接取代它）"""
+        uid = self.uid
+        _persistence.submit(("session", uid), lambda: _config_store.delete_session(uid))
+
+    def _on_configure(self, event):
+        """窗口被外部移动或缩放时同步几何缓存"""
+        if event.widget is not self.window or self._geometry_pending or self.resizing:
+            return
+        self._geometry = [event.x, event.y, event.width, event.height]
+        self._applied_geometry = tuple(self._geometry)
 
     def _show_context_menu(self, event):
         """显示右键菜单"""
@@ -1462,12 +5232,11 @@ class DraggableWidget:
         # 创建设置窗口
         settings_window = tk.Toplevel(self.window)
         settings_window.title(f"{self.template.name} - 设置")
-        settings_window.geometry("400x320")
+        settings_window.geometry("400x380")
         settings_window.resizable(False, False)
 
         # 设置窗口在组件附近显示
-        widget_x = self.window.winfo_x()
-        widget_y = self.window.winfo_y()
+        widget_x, widget_y = self._geometry[0], self._geometry[1]
         settings_window.geometry(f"+{widget_x + 50}+{widget_y + 50}")
 
         # 创建主容器
@@ -1560,6 +5329,33 @@ class DraggableWidget:
         follow_theme_check.pack(anchor="w")
         self.follow_theme_var = follow_theme_var
 
+        # 刷新间隔设置（0 表示跟随全局设置）
+        refresh_frame = tk.Frame(content_frame, bg="#F5F5F5")
+        refresh_frame.pack(fill="x", pady=(0, 15))
+
+        refresh_label = tk.Label(
+            refresh_frame,
+            text="刷新间隔（秒，0 = 跟随全局设置）:",
+            font=("Microsoft YaHei UI", 11),
+            bg="#F5F5F5",
+            fg="#333333",
+            anchor="w"
+        )
+        refresh_label.pack(fill="x", pady=(0, 5))
+
+        refresh_slider = tk.Scale(
+            refresh_frame,
+            from_=0,
+            to=60,
+            orient="horizontal",
+            bg="#F5F5F5",
+            fg="#333333",
+            highlightthickness=0
+        )
+        refresh_slider.set(self.refresh_interval)
+        refresh_slider.pack(fill="x")
+        self.refresh_slider = refresh_slider
+
         # 背景颜色设置（当不跟随主题时可用）
         bg_color_frame = tk.Frame(content_frame, bg="#F5F5F5")
         bg_color_frame.pack(fill="x", pady=(0, 15))
@@ -1755,6 +5551,10 @@ class DraggableWidget:
         # 应用跟随主题设置
         self.follow_theme = self.follow_theme_var.get()
 
+        # 应用刷新间隔
+        self.refresh_interval = int(self.refresh_slider.get())
+        self._on_refresh_policy_change()
+
         # 如果跟随主题，应用主题颜色
         if self.follow_theme:
             self._apply_theme_colors()
@@ -1764,6 +5564,7 @@ class DraggableWidget:
                 bg=self.widget_bg_color,
                 highlightbackground=self.widget_border_color
             )
+            self._update_static_layers(self.width, self.height)
 
         # 更新窗口透明度
         self.window.attributes('-alpha', self.widget_opacity / 100)
@@ -1775,68 +5576,51 @@ class DraggableWidget:
         messagebox.showinfo("成功", "组件设置已保存！", parent=self.window)
         settings_window.destroy()
 
-    def _save_widget_config(self):
-        """保存组件配置到文件"""
-        data_dir = Path.home() / ".dashwidgets"
-        data_dir.mkdir(exist_ok=True)
+    def _widget_config(self):
+        """当前的个性化设置"""
+        return {
+            "opacity": self.widget_opacity,
+            "bg_color": self.widget_bg_color,
+            "border_color": self.widget_border_color,
+            "corner_radius": self.widget_corner_radius,
+            "follow_theme": self.follow_theme,
+            "refresh_interval": self.refresh_interval
+        }
 
-        config_file = data_dir / "widget_configs.json"
+    def _save_widget_config(self):
+        """保存组件配置（按组件 UUID 写入配置库，后台执行）"""
+        uid, template_name, config = self.uid, self.template.name, self._widget_config()
+        _persistence.submit(("widget_config", uid), lambda: _config_store.put(uid, template_name, config))
 
+    def _load_widget_config(self):
+        """加载组件配置：优先读取本组件的配置，新组件沿用同类组件最近的配置"""
         try:
-            # 加载现有配置
-            configs = {}
-            if config_file.exists():
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    configs = json.load(f)
-
-            # 保存当前组件配置
-            widget_key = f"{self.template.name}_{id(self)}"
-            configs[widget_key] = {
-                "opacity": self.widget_opacity,
-                "bg_color": self.widget_bg_color,
-                "border_color": self.widget_border_color,
-                "corner_radius": self.widget_corner_radius,
-                "follow_theme": self.follow_theme
-            }
-
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(configs, f, ensure_ascii=False, indent=2)
-
+            config = _config_store.get(self.uid) or _config_store.latest(self.template.name)
         except Exception as e:
-            logger.error(f"保存组件配置失败: {e}")
-
-    def _load_widget_config(self):
-        """加载组件配置"""
-        data_dir = Path.home() / ".dashwidgets"
-        config_file = data_dir / "widget_configs.json"
-
-        if config_file.exists():
-            try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    configs = json.load(f)
+            logger.warning(f"加载组件配置失败: {e}")
+            return
 
-                # 尝试查找匹配的配置
-                for widget_key, config in configs.items():
-                    if widget_key.startswith(self.template.name):
-                        self.widget_opacity = config.get("opacity", 88)
-                        self.widget_bg_color = config.get("bg_color", "#FFFDE7")
-                        self.widget_border_color = config.get("border_color", "#FFD54F")
-                        self.widget_corner_radius = config.get("corner_radius", 0)
-                        self.follow_theme = config.get("follow_theme", False)
-                        logger.info(f"加载组件配置: {widget_key}")
-                        break
-            except Exception as e:
-                logger.warning(f"加载组件配置失败: {e}")
+        if config:
+            self.widget_opacity = config.get("opacity", 88)
+            self.widget_bg_color = config.get("bg_color", "#FFFDE7")
+            self.widget_border_color = config.get("border_color", "#FFD54F")
+            self.widget_corner_radius = config.get("corner_radius", 0)
+            self.follow_theme = config.get("follow_theme", False)
+            self.refresh_interval = config.get("refresh_interval", 0)
+            logger.info(f"加载组件配置: {self.template.name} ({self.uid})")
 
     def _apply_theme_colors(self):
         """应用主题颜色到组件"""
         if self.follow_theme and self.theme_colors:
             self.widget_bg_color = self.theme_colors.bg_card
             self.widget_border_color = self.theme_colors.border
-            self.canvas.config(
-                bg=self.widget_bg_color,
-                highlightbackground=self.widget_border_color
-            )
+            # 初始化阶段画布尚未创建，颜色会在创建画布时直接使用
+            if hasattr(self, 'scene'):
+                self.canvas.config(
+                    bg=self.widget_bg_color,
+                    highlightbackground=self.widget_border_color
+                )
+                self._update_static_layers(self.width, self.height)
 
     def update_theme(self, light_mode, theme_colors):
         """更新组件主题（由主应用调用）"""
@@ -1852,8 +5636,7 @@ class DraggableWidget:
         target_width, target_height = SIZE_MAP.get(self.size, (200, 200))
 
         # 获取当前窗口位置
-        current_x = self.window.winfo_x()
-        current_y = self.window.winfo_y()
+        current_x, current_y = self._geometry[0], self._geometry[1]
 
         # 计算居中位置
         new_x = max(0, current_x + (self.width - target_width) // 2)
@@ -1870,49 +5653,332 @@ class DraggableWidget:
 
     def _animate_size_change(self, start_w, start_h, end_w, end_h, new_x, new_y):
         """窗口大小变化动画"""
-        duration = 300
-        frames = int(duration / 16)
-
-        def animate(frame):
-            nonlocal start_w, start_h
-            if frame >= frames:
-                # 动画结束，应用最终尺寸
-                self.width = end_w
-                self.height = end_h
-                self.window.geometry(f"{int(end_w)}x{int(end_h)}+{new_x}+{new_y}")
-                self.canvas.config(width=int(end_w), height=int(end_h))
-                self._update_resize_handlers()
-                self.canvas.delete("all")
-                self._create_widget_content(self.canvas, int(end_w), int(end_h))
-                return
+        start_x, start_y = self._geometry[0], self._geometry[1]
+
+        def apply(value):
+            curr_w, curr_h, curr_x, curr_y = (int(v) for v in value)
+            self.window.geometry(f"{curr_w}x{curr_h}+{curr_x}+{curr_y}")
+            self.canvas.config(width=curr_w, height=curr_h)
+            self.relayout(curr_w, curr_h, static_layers=False)
+            self._geometry = [curr_x, curr_y, curr_w, curr_h]
+            self._applied_geometry = tuple(self._geometry)
+
+        def finish():
+            # 动画结束，应用最终尺寸
+            self.width = end_w
+            self.height = end_h
+            self.visibility.update_bounds(new_x, new_y, end_w, end_h)
+            self._update_resize_handlers()
+            self.relayout(end_w, end_h)
+            self._save_session()
+
+        return AnimationManager.clock.tween(
+            self.window,
+            (start_w, start_h, start_x, start_y),
+            (end_w, end_h, new_x, new_y),
+            300, apply, callback=finish
+        )
+
+    def _refresh(self):
+        """刷新组件"""
+        self.relayout()
+        self._catch_up_refresh()
 
-            progress = AnimationManager.ease_out_cubic(frame / frames)
-            curr_w = start_w + (end_w - start_w) * progress
-            curr_h = start_h + (end_h - start_h) * progress
-            curr_x = self.window.winfo_x() + (new_x - self.window.winfo_x()) * progress
-            curr_y = self.window.winfo_y() + (new_y - self.window.winfo_y()) * progress
 
-            self.window.geometry(f"{int(curr_w)}x{int(curr_h)}+{int(curr_x)}+{int(curr_y)}")
-            self.canvas.config(width=int(curr_w), height=int(curr_h))
+class HeadlessWidget(DraggableWidget):
+    """无头组件
 
-            self.window.after(16, lambda: animate(frame + 1))
+    与桌面组件共用布局和绘制代码，只是画布换成 PillowCanvas：不创建窗口、不订阅定时刷新，
+    可在没有显示环境时渲染，用于像素级回归测试、排版/绘制性能测试和导出仪表盘快照。
+    """
 
-        animate(0)
+    def __init__(self, template, width=None, height=None, light_mode=True, theme_colors=None, todos=None, note=None):
+        self._init_settings(template, template.size, light_mode, theme_colors)
 
-    def _refresh(self):
-        """刷新组件"""
-        self.canvas.delete("all")
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
-        self._create_widget_content(self.canvas, width, height)
+        default_width, default_height = SIZE_MAP.get(template.size, template.get_size_dimensions())
+        self.width = int(width or default_width)
+        self.height = int(height or default_height)
+        self.window = None
+        self.refresh_policy = None
+
+        if template.name == "待办事项":
+            self.todos = [list(todo) for todo in (todos if todos is not None else self.DEFAULT_TODOS)]
+            self.todo_scroll = 0
+        self.note = self.DEFAULT_NOTE if note is None else note
+
+        self.canvas = PillowCanvas(self.width, self.height, bg=self.widget_bg_color)
+        self.scene = SceneGraph(self.canvas)
+        self._draw_rounded_corner_background(self.width, self.height)
+        self._create_widget_content(self.canvas, self.width, self.height)
+
+    def render(self, width=None, height=None):
+        """渲染为 PIL 图像；传入新尺寸时先增量重排"""
+        width = int(width or self.width)
+        height = int(height or self.height)
+        if (width, height) != (self.width, self.height):
+            self.width = width
+            self.height = height
+            self.canvas.resize(width, height)
+            self.relayout(width, height)
+        return self.canvas.render()
+
+    def _layer(self, key, render):
+        return _headless_layer_cache.get(key, render)
+
+    def _subscribe_tick(self, name, callback, period):
+        """离屏渲染不需要定时刷新"""
+
+    def _subscribe_calendar(self, name, callback, boundary="day"):
+        """离屏渲染不需要定时刷新"""
+
+    def _subscribe_topic(self, name, topic, callback):
+        """离屏渲染只使用创建时读取的数据，不订阅主题"""
+
+    def _acquire_system_sampler(self, *groups, on_ready=None):
+        """只同步采样一次，不启动采样线程"""
+        snapshot = _system_sampler.latest()
+        if snapshot is None or any(group not in snapshot for group in groups):
+            _system_sampler.sample(*groups)
+
+    def _layout_note(self, width, height):
+        # 笔记内容用画布文本代替 Text 控件
+        layout = super()._layout_note(width, height)
+        layout["note_body"] = ((int(width * 0.1), int(height * 0.15) + 10), get_font(int(width * 0.04)))
+        return layout
+
+    def _create_note_widget(self, canvas, width, height):
+        layout = self._layout_note(width, height)
+        self._add_node("text", "title", layout, text="📌 笔记", fill="#333333")
+        self._add_node("line", "divider", layout, fill="#E0E0E0", width=1)
+        self._add_node("text", "note_body", layout, text=self.note, fill="#333333", anchor="nw")
+
+    def _place_note_controls(self, width, height):
+        """没有 Text/Button 控件需要放置"""
+
+
+def render_widget_snapshot(template, width=None, height=None, light_mode=True, **data):
+    """离屏渲染一个组件，返回 PIL 图像
+
+    template 可以是 WidgetTemplate 或模板名称；data 传给 HeadlessWidget（todos、note）。
+    """
+    if isinstance(template, str):
+        template = next(t for t in WIDGET_TEMPLATES if t.name == template)
+    return HeadlessWidget(template, width, height, light_mode=light_mode, **data).render()
+
+
+# =============================================================================
+# 组件列表视图 - 固定数量的卡片循环复用
+# =============================================================================
+
+class WidgetCard:
+    """"已添加组件"列表中的一张卡片
+
+    卡片只创建一次，滚动时通过 bind 换绑到另一个组件，只改文字，不重建子控件。
+    """
+
+    SIZE_NAMES = {"small": "小", "medium": "中", "large": "大"}
+
+    def __init__(self, parent, theme, on_toggle, on_close):
+        self.widget = None  # 当前绑定的桌面组件
+
+        self.frame = ctk.CTkFrame(parent, height=WidgetListView.CARD_HEIGHT, corner_radius=8)
+        theme.bind(self.frame, fg_color="bg_input")
+        self.frame.pack_propagate(False)
+
+        # 图标和名称
+        info_frame = ctk.CTkFrame(self.frame, fg_color="transparent")
+        info_frame.pack(side="left", padx=12, pady=15, fill="both", expand=True)
+
+        self.icon_label = ctk.CTkLabel(info_frame, text="", font=("Segoe UI Emoji", 20))
+        self.icon_label.pack(side="left")
+
+        self.name_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=("Arial", 13)
+        )
+        theme.bind(self.name_label, text_color="text_primary")
+        self.name_label.pack(side="left", padx=8)
+
+        # 尺寸标签
+        self.size_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=("Arial", 10)
+        )
+        theme.bind(self.size_label, text_color="text_hint")
+        self.size_label.pack(side="left")
+
+        # 操作按钮（回调在点击时才读取当前绑定的组件）
+        button_frame = ctk.CTkFrame(self.frame, fg_color="transparent")
+        button_frame.pack(side="right", padx=12, pady=15)
+
+        # 显示/隐藏按钮
+        visibility_btn = ctk.CTkButton(
+            button_frame,
+            text="👁",
+            width=32,
+            height=32,
+            corner_radius=6,
+            font=("Arial", 12),
+            fg_color="transparent",
+            command=lambda: self.widget is not None and on_toggle(self.widget)
+        )
+        theme.bind(visibility_btn, text_color="text_secondary", hover_color="border")
+        visibility_btn.pack(side="left", padx=2)
+
+        # 关闭按钮
+        close_btn = ctk.CTkButton(
+            button_frame,
+            text="✕",
+            width=32,
+            height=32,
+            corner_radius=6,
+            font=("Arial", 12),
+            fg_color="transparent",
+            text_color="#FF3B30",
+            hover_color="#FFE5E5",
+            command=lambda: self.widget is not None and on_close(self.widget)
+        )
+        close_btn.pack(side="left", padx=2)
+
+    def bind(self, widget):
+        """换绑到另一个组件"""
+        if widget is self.widget:
+            return
+        self.widget = widget
+        self.icon_label.configure(text=widget.template.icon_name)
+        self.name_label.configure(text=widget.template.name)
+        self.size_label.configure(text=f"({self.SIZE_NAMES.get(widget.size, '中')})")
+
+
+class WidgetListView(ctk.CTkFrame):
+    """回收复用的组件列表
+
+    model 是已添加组件的列表（与 DashWidgetsApp.active_widgets 为同一对象），视图只创建
+    能填满可见区域的卡片数量，滚动时按偏移把卡片重新放置并换绑到对应的组件。
+    数据变化后调用 refresh() 即可。
+    """
+
+    CARD_HEIGHT = 60
+    CARD_SPACING = 12
+    SCROLL_STEP = 36  # 每格滚轮滚动的像素
+
+    def __init__(self, parent, theme, model, on_toggle, on_close):
+        super().__init__(parent, fg_color="transparent", corner_radius=0)
+        self.theme = theme
+        self.model = model
+        self._on_toggle = on_toggle
+        self._on_close = on_close
+        self._cards = []
+        self._offset = 0  # 内容滚动的像素偏移
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent", corner_radius=0)
+        self.viewport.pack(side="left", fill="both", expand=True)
+        self.viewport.bind("<Configure>", lambda _: self.refresh())
+
+        # 欢迎提示
+        self.empty_label = ctk.CTkLabel(
+            self.viewport,
+            text="从左侧组件库添加组件到桌面",
+            font=("Arial", 14)
+        )
+        theme.bind(self.empty_label, text_color="text_hint")
+
+        self._bind_wheel(self.viewport)
+        self.refresh()
+
+    @property
+    def pitch(self):
+        """每张卡片占用的高度（含间距）"""
+        return self.CARD_HEIGHT + self.CARD_SPACING
+
+    def _max_offset(self):
+        return max(0, len(self.model) * self.pitch - self.viewport.winfo_height())
+
+    def refresh(self):
+        """按当前模型和滚动位置重新放置、换绑卡片"""
+        if not self.winfo_exists():
+            return
+
+        if not self.model:
+            for card in self._cards:
+                card.frame.place_forget()
+                card.widget = None
+            self.empty_label.place(relx=0.5, y=30, anchor="n")
+            self._offset = 0
+            self.scrollbar.set(0, 1)
+            return
+        self.empty_label.place_forget()
+
+        view_height = max(1, self.viewport.winfo_height())
+        self._offset = min(max(self._offset, 0), self._max_offset())
+
+        # 卡片池只随可见区域增长：可见行数 + 1 张用于滚动时的半截卡片
+        needed = min(len(self.model), view_height // self.pitch + 2)
+        while len(self._cards) < needed:
+            card = WidgetCard(self.viewport, self.theme, self._on_toggle, self._on_close)
+            self._bind_wheel(card.frame)
+            self._cards.append(card)
+
+        first = self._offset // self.pitch
+        shift = self._offset % self.pitch
+        for slot, card in enumerate(self._cards):
+            index = first + slot
+            if slot < needed and index < len(self.model):
+                card.bind(self.model[index])
+                card.frame.place(x=0, y=slot * self.pitch - shift + self.CARD_SPACING // 2, relwidth=1)
+            else:
+                card.frame.place_forget()
+                card.widget = None
+
+        total = len(self.model) * self.pitch
+        self.scrollbar.set(self._offset / total, min(1.0, (self._offset + view_height) / total))
+
+    def scroll_to(self, offset):
+        self._offset = int(offset)
+        self.refresh()
+
+    def _on_scrollbar(self, *args):
+        """滚动条回调：("moveto", 比例) 或 ("scroll", 步数, 单位)"""
+        total = len(self.model) * self.pitch
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = self.viewport.winfo_height() if args[2] == "pages" else self.SCROLL_STEP
+            self.scroll_to(self._offset + int(args[1]) * step)
+
+    def _bind_wheel(self, widget):
+        """滚轮事件只投递给指针下的控件，因此给列表内每个底层 Tk 控件都绑定"""
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            # 绕过 CTk 对 bind 的封装，直接绑定到底层 Tk 控件
+            tk.Misc.bind(widget, sequence, self._on_wheel, "+")
+        for child in widget.winfo_children():
+            self._bind_wheel(child)
+
+    def _on_wheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self._offset - self.SCROLL_STEP)
+        else:
+            self.scroll_to(self._offset + self.SCROLL_STEP)
+
+    def scroll_to_end(self):
+        self.scroll_to(self._max_offset())
 
 
 class DashWidgetsApp:
     """主应用程序类"""
 
+    RESTORE_SLICE_MS = 12        # 启动恢复布局时每个时间片的预算
+    PENDING_CHECK_MS = 5000      # 检查屏幕外组件是否已回到屏幕内的间隔
+
     def __init__(self):
         # 加载已保存的设置
         settings = self._load_settings()
+        self.settings = settings
 
         # 设置外观
         theme = settings.get('theme', '浅色')
@@ -1944,16 +6010,35 @@ class DashWidgetsApp:
             pass
 
         self.active_widgets = []  # 已激活的组件列表
+        self.scheduler = TickScheduler(self.root)  # 所有组件共享的定时调度器
+        self.panel_visibility = VisibilityTracker(self.root, on_visible=self._update_stats)  # 控制面板可见性
+        self.refresh_policy = RefreshPolicy(
+            self.root,
+            self.scheduler,
+            interval=settings.get('refresh_interval', 2),
+            idle_minutes=settings.get('idle_minutes', 10),
+            idle_interval=settings.get('idle_refresh_interval', 30)
+        )
+        _system_sampler.set_cgroups(settings.get('cgroups'))  # 容器资源组件监控的 cgroup
+        _data_bus.attach(self.root, self.scheduler, self.refresh_policy)  # 组件共享的数据总线
         self.light_mode = True  # 当前是否为浅色模式
         self.theme = ThemeColors(light_mode=self.light_mode)  # 主题颜色
+        self.theme.subscribe(self._on_theme_changed)
 
         # 创建托盘图标
         self.tray_icon = None
         self.tray_thread = None
 
+        # 屏幕外的已保存组件：uid -> (模板, 布局)，需要时才创建
+        self.pending_widgets = {}
+        self._pending_token = None
+
         self._create_ui()
         self._create_tray_icon()
 
+        # 界面显示后再逐批恢复上次的组件布局
+        self.root.after(100, self._restore_session)
+
     def _load_settings(self):
         """加载设置"""
         data_dir = Path.home() / ".dashwidgets"
@@ -2000,7 +6085,8 @@ class DashWidgetsApp:
     def _create_ui(self):
         """创建用户界面 - 现代圆润设计"""
         # 主容器
-        main_container = ctk.CTkFrame(self.root, corner_radius=0, fg_color=self.theme.bg_main)
+        main_container = ctk.CTkFrame(self.root, corner_radius=0)
+        self.theme.bind(main_container, fg_color="bg_main")
         main_container.pack(fill="both", expand=True)
 
         # 入场动画
@@ -2022,7 +6108,8 @@ class DashWidgetsApp:
 
     def _create_navbar(self, parent):
         """创建顶部导航栏 - 现代圆润设计"""
-        nav_bar = ctk.CTkFrame(parent, height=64, corner_radius=0, fg_color=self.theme.bg_nav)
+        nav_bar = ctk.CTkFrame(parent, height=64, corner_radius=0)
+        self.theme.bind(nav_bar, fg_color="bg_nav")
         nav_bar.pack(fill="x")
 
         # Logo 和标题
@@ -2047,7 +6134,8 @@ class DashWidgetsApp:
         except Exception as e:
             logger.warning(f"加载 logo 失败，使用默认图标: {e}")
             # 如果加载失败，使用备用的 emoji logo
-            logo_frame = ctk.CTkFrame(title_container, width=40, height=40, corner_radius=10, fg_color=self.theme.accent)
+            logo_frame = ctk.CTkFrame(title_container, width=40, height=40, corner_radius=10)
+            self.theme.bind(logo_frame, fg_color="accent")
             logo_frame.pack(side="left", padx=(0, 12))
             logo_frame.pack_propagate(False)
 
@@ -2062,9 +6150,9 @@ class DashWidgetsApp:
         title_label = ctk.CTkLabel(
             title_container,
             text="DashWidgets",
-            font=("Microsoft YaHei UI", 22, "bold"),
-            text_color=self.theme.text_primary
+            font=("Microsoft YaHei UI", 22, "bold")
         )
+        self.theme.bind(title_label, text_color="text_primary")
         title_label.pack(side="left")
 
         # 右侧功能按钮
@@ -2079,11 +6167,9 @@ class DashWidgetsApp:
             height=38,
             corner_radius=10,
             font=("Microsoft YaHei UI", 12),
-            hover_color=self.theme.hover,
-            fg_color=self.theme.bg_button,
-            text_color=self.theme.text_primary,
             command=self.minimize_to_tray
         )
+        self.theme.bind(minimize_btn, hover_color="hover", fg_color="bg_button", text_color="text_primary")
         minimize_btn.pack(side="left", padx=6)
 
         # 设置按钮
@@ -2094,11 +6180,9 @@ class DashWidgetsApp:
             height=38,
             corner_radius=10,
             font=("Microsoft YaHei UI", 12),
-            hover_color=self.theme.hover,
-            fg_color=self.theme.bg_button,
-            text_color=self.theme.text_primary,
             command=self.show_settings_window
         )
+        self.theme.bind(settings_btn, hover_color="hover", fg_color="bg_button", text_color="text_primary")
         settings_btn.pack(side="left", padx=6)
 
         # 关于按钮
@@ -2109,30 +6193,30 @@ class DashWidgetsApp:
             height=38,
             corner_radius=10,
             font=("Microsoft YaHei UI", 12),
-            hover_color=self.theme.hover,
-            fg_color=self.theme.bg_button,
-            text_color=self.theme.text_primary,
             command=self.show_about_dialog
         )
+        self.theme.bind(about_btn, hover_color="hover", fg_color="bg_button", text_color="text_primary")
         about_btn.pack(side="left", padx=6)
 
     def _create_widget_library(self, parent):
         """创建左侧组件库 - 现代圆润设计"""
         # 组件库框架
-        library_frame = ctk.CTkFrame(parent, width=380, corner_radius=16, fg_color=self.theme.bg_card)
+        library_frame = ctk.CTkFrame(parent, width=380, corner_radius=16)
+        self.theme.bind(library_frame, fg_color="bg_card")
         library_frame.pack(side="left", fill="y", padx=(0, 16))
         library_frame.pack_propagate(False)
 
         # 标题区域
-        header_frame = ctk.CTkFrame(library_frame, height=64, fg_color=self.theme.bg_hint, corner_radius=16)
+        header_frame = ctk.CTkFrame(library_frame, height=64, corner_radius=16)
+        self.theme.bind(header_frame, fg_color="bg_hint")
         header_frame.pack(fill="x")
 
         header_label = ctk.CTkLabel(
             header_frame,
             text="🧩 组件库",
-            font=("Microsoft YaHei UI", 17, "bold"),
-            text_color=self.theme.text_primary
+            font=("Microsoft YaHei UI", 17, "bold")
         )
+        self.theme.bind(header_label, text_color="text_primary")
         header_label.pack(pady=15)
 
         # 搜索框
@@ -2151,10 +6235,9 @@ class DashWidgetsApp:
         scrollable_frame = ctk.CTkScrollableFrame(
             library_frame,
             fg_color="transparent",
-            corner_radius=0,
-            scrollbar_button_color=self.theme.border,
-            scrollbar_button_hover_color=self.theme.text_hint
+            corner_radius=0
         )
+        self.theme.bind(scrollable_frame, scrollbar_button_color="border", scrollbar_button_hover_color="text_hint")
         scrollable_frame.pack(fill="both", expand=True, padx=15, pady=5)
 
         # 添加组件模板
@@ -2163,12 +6246,14 @@ class DashWidgetsApp:
 
     def _add_widget_template(self, parent, template):
         """添加组件模板卡片 - 现代圆润设计"""
-        card = ctk.CTkFrame(parent, height=100, corner_radius=14, fg_color=self.theme.bg_input, border_width=1, border_color=self.theme.border)
+        card = ctk.CTkFrame(parent, height=100, corner_radius=14, border_width=1)
+        self.theme.bind(card, fg_color="bg_input", border_color="border")
         card.pack(fill="x", pady=10)
         card.pack_propagate(False)
 
         # 组件图标 - 圆形背景
-        icon_bg = ctk.CTkFrame(card, width=56, height=56, corner_radius=14, fg_color=self.theme.accent)
+        icon_bg = ctk.CTkFrame(card, width=56, height=56, corner_radius=14)
+        self.theme.bind(icon_bg, fg_color="accent")
         icon_bg.pack(side="left", padx=16, pady=22)
         icon_bg.pack_propagate(False)
 
@@ -2188,18 +6273,18 @@ class DashWidgetsApp:
             info_frame,
             text=template.name,
             font=("Microsoft YaHei UI", 15, "bold"),
-            text_color=self.theme.text_primary,
             anchor="w"
         )
+        self.theme.bind(name_label, text_color="text_primary")
         name_label.pack(fill="x", pady=(6, 3))
 
         desc_label = ctk.CTkLabel(
             info_frame,
             text=template.description,
             font=("Microsoft YaHei UI", 11),
-            text_color=self.theme.text_secondary,
             anchor="w"
         )
+        self.theme.bind(desc_label, text_color="text_secondary")
         desc_label.pack(fill="x", pady=(0, 6))
 
         # 添加按钮 - 圆形按钮
@@ -2210,75 +6295,67 @@ class DashWidgetsApp:
             height=44,
             corner_radius=12,
             font=("Microsoft YaHei UI", 22, "bold"),
-            fg_color=self.theme.accent,
-            hover_color=self.theme.hover,
             text_color="white",
             command=lambda t=template: self.create_widget(t)
         )
+        self.theme.bind(add_btn, fg_color="accent", hover_color="hover")
         add_btn.pack(side="right", padx=16, pady=28)
 
     def _create_active_widgets_panel(self, parent):
         """创建右侧已添加组件面板 - 现代圆润设计"""
-        panel_frame = ctk.CTkFrame(parent, corner_radius=16, fg_color=self.theme.bg_card)
+        panel_frame = ctk.CTkFrame(parent, corner_radius=16)
+        self.theme.bind(panel_frame, fg_color="bg_card")
         panel_frame.pack(side="right", fill="both", expand=True)
 
         # 标题区域
-        header_frame = ctk.CTkFrame(panel_frame, height=64, fg_color=self.theme.bg_hint, corner_radius=16)
+        header_frame = ctk.CTkFrame(panel_frame, height=64, corner_radius=16)
+        self.theme.bind(header_frame, fg_color="bg_hint")
         header_frame.pack(fill="x")
 
         header_label = ctk.CTkLabel(
             header_frame,
             text="🖥 已添加组件",
-            font=("Microsoft YaHei UI", 17, "bold"),
-            text_color=self.theme.text_primary
+            font=("Microsoft YaHei UI", 17, "bold")
         )
+        self.theme.bind(header_label, text_color="text_primary")
         header_label.pack(side="left", padx=20, pady=15)
 
         # 统计信息
         self.stats_label = ctk.CTkLabel(
             header_frame,
             text="0 个组件",
-            font=("Arial", 12),
-            text_color=self.theme.text_secondary
+            font=("Arial", 12)
         )
+        self.theme.bind(self.stats_label, text_color="text_secondary")
         self.stats_label.pack(side="right", padx=20, pady=15)
+        self.stats_label.bind("<Button-1>", lambda _: self.materialize_pending())
 
         # 提示信息
-        hint_frame = ctk.CTkFrame(panel_frame, corner_radius=12, fg_color=self.theme.bg_hint)
+        hint_frame = ctk.CTkFrame(panel_frame, corner_radius=12)
+        self.theme.bind(hint_frame, fg_color="bg_hint")
         hint_frame.pack(fill="x", padx=20, pady=20)
 
         hint_label = ctk.CTkLabel(
             hint_frame,
             text="💡 提示：点击左侧组件添加到桌面，添加后可以自由拖拽。右键点击组件可以设置、刷新或关闭。",
             font=("Arial", 11),
-            text_color=self.theme.text_secondary,
             wraplength=600
         )
+        self.theme.bind(hint_label, text_color="text_secondary")
         hint_label.pack(padx=15, pady=10)
 
-        # 组件列表（可滚动）
-        self.widgets_list = ctk.CTkScrollableFrame(
+        # 组件列表（回收复用卡片，直接绑定 active_widgets）
+        self.widgets_list = WidgetListView(
             panel_frame,
-            fg_color="transparent",
-            corner_radius=0
+            self.theme,
+            self.active_widgets,
+            on_toggle=lambda widget: widget.toggle_visibility(),
+            on_close=self.remove_widget
         )
         self.widgets_list.pack(fill="both", expand=True, padx=20, pady=(0, 20))
 
-        # 欢迎提示
-        self.welcome_label = ctk.CTkLabel(
-            self.widgets_list,
-            text="从左侧组件库添加组件到桌面",
-            font=("Arial", 14),
-            text_color=self.theme.text_hint
-        )
-        self.welcome_label.pack(pady=30)
-
     def create_widget(self, template):
         """创建桌面组件"""
-        # 移除欢迎提示
-        if hasattr(self, 'welcome_label') and self.welcome_label.winfo_exists():
-            self.welcome_label.destroy()
-
         # 获取当前设置的默认尺寸
         if hasattr(self, 'size_menu'):
             size_map = {"小号": "small", "中号": "medium", "大号": "large"}
@@ -2286,125 +6363,156 @@ class DashWidgetsApp:
         else:
             size = template.size
 
-        # 创建可拖拽的组件，传递主题信息
+        widget = self._spawn_widget(template, size)
+        widget._save_session()
+
+        # 在列表中添加记录并滚动到新组件
+        self.widgets_list.scroll_to_end()
+        self._update_stats()
+
+    def _spawn_widget(self, template, size, **kwargs):
+        """创建可拖拽的组件并加入列表模型（kwargs 为恢复会话时的 uid 和几何）"""
         widget = DraggableWidget(
             self.root,
             template,
             size=size,
             light_mode=self.light_mode,
-            theme_colors=self.theme
+            theme_colors=self.theme,
+            scheduler=self.scheduler,
+            refresh_policy=self.refresh_policy,
+            on_close=self._forget_widget,
+            **kwargs
         )
+        self.active_widgets.append(widget)
+        return widget
 
-        # 在列表中添加记录
-        self._add_widget_to_list(template, widget, size)
+    def remove_widget(self, widget):
+        """移除组件"""
+        # 取消该组件在调度器中的所有定时刷新
+        widget.stop_updates()
 
-        self.active_widgets.append(widget)
+        widget.window.destroy()
+        widget._delete_session()
+        self._forget_widget(widget)
+
+    def _forget_widget(self, widget):
+        """组件关闭后从列表模型中移除"""
+        if widget in self.active_widgets:
+            self.active_widgets.remove(widget)
+        self.widgets_list.refresh()  # 没有组件时列表会显示欢迎提示
         self._update_stats()
 
-    def _add_widget_to_list(self, template, widget, size="medium"):
-        """在列表中添加组件记录"""
-        card = ctk.CTkFrame(self.widgets_list, height=60, corner_radius=8, fg_color=self.theme.bg_input)
-        card.pack(fill="x", pady=6)
-        card.pack_propagate(False)
-
-        # 图标和名称
-        info_frame = ctk.CTkFrame(card, fg_color="transparent")
-        info_frame.pack(side="left", padx=12, pady=15, fill="both", expand=True)
+    def _restore_session(self):
+        """恢复上次的组件布局：屏幕内的组件按时间片逐批创建，屏幕外的延后到需要时创建"""
+        try:
+            entries = _config_store.session()
+        except Exception as e:
+            logger.warning(f"读取组件布局失败: {e}")
+            return
 
-        icon_name_label = ctk.CTkLabel(
-            info_frame,
-            text=template.icon_name,
-            font=("Segoe UI Emoji", 20)
-        )
-        icon_name_label.pack(side="left")
+        templates = {template.name: template for template in WIDGET_TEMPLATES}
+        queue = deque()
+        for uid, template_name, layout in entries:
+            template = templates.get(template_name)
+            if template is None:
+                continue
+            if self._on_screen(layout):
+                queue.append((uid, template, layout))
+            else:
+                self.pending_widgets[uid] = (template, layout)
 
-        name_label = ctk.CTkLabel(
-            info_frame,
-            text=template.name,
-            font=("Arial", 13),
-            text_color=self.theme.text_primary
-        )
-        name_label.pack(side="left", padx=8)
+        if self.pending_widgets:
+            self._pending_token = self.scheduler.subscribe(self._check_pending_widgets, self.PENDING_CHECK_MS)
+        if queue:
+            logger.info(f"恢复 {len(queue)} 个组件，{len(self.pending_widgets)} 个在屏幕外延后创建")
+            self._restore_chunk(queue)
+        else:
+            self._update_stats()
 
-        # 尺寸标签
-        size_map = {"small": "小", "medium": "中", "large": "大"}
-        size_label = ctk.CTkLabel(
-            info_frame,
-            text=f"({size_map.get(size, '中')})",
-            font=("Arial", 10),
-            text_color=self.theme.text_hint
-        )
-        size_label.pack(side="left")
+    def _restore_chunk(self, queue):
+        """在一个时间片内尽量多地创建组件，剩余的交给下一轮事件循环"""
+        deadline = time.perf_counter() + self.RESTORE_SLICE_MS / 1000
+        while queue and time.perf_counter() < deadline:
+            uid, template, layout = queue.popleft()
+            self._restore_widget(uid, template, layout)
 
-        # 操作按钮
-        button_frame = ctk.CTkFrame(card, fg_color="transparent")
-        button_frame.pack(side="right", padx=12, pady=15)
+        self.widgets_list.refresh()
+        self._update_stats()
+        if queue:
+            self.root.after(1, self._restore_chunk, queue)
 
-        # 显示/隐藏按钮
-        visibility_btn = ctk.CTkButton(
-            button_frame,
-            text="👁",
-            width=32,
-            height=32,
-            corner_radius=6,
-            font=("Arial", 12),
-            fg_color="transparent",
-            text_color=self.theme.text_secondary,
-            hover_color=self.theme.border
-        )
-        visibility_btn.pack(side="left", padx=2)
+    def _restore_widget(self, uid, template, layout, x=None, y=None):
+        try:
+            widget = self._spawn_widget(
+                template, layout.get("size", template.size),
+                uid=uid,
+                x=layout["x"] if x is None else x,
+                y=layout["y"] if y is None else y,
+                width=layout.get("width"),
+                height=layout.get("height")
+            )
+            if x is None and y is None:
+                widget._saved_layout = layout  # 与数据库一致，松开鼠标时无需重写
+            return widget
+        except Exception as e:
+            logger.warning(f"恢复组件 {template.name} 失败: {e}")
+            return None
 
-        # 关闭按钮
-        close_btn = ctk.CTkButton(
-            button_frame,
-            text="✕",
-            width=32,
-            height=32,
-            corner_radius=6,
-            font=("Arial", 12),
-            fg_color="transparent",
-            text_color="#FF3B30",
-            hover_color="#FFE5E5",
-            command=lambda w=widget, c=card: self.remove_widget(w, c)
+    def _on_screen(self, layout):
+        """布局矩形是否与虚拟桌面相交（与组件可见性判断共用同一范围）"""
+        return intersects_screen(
+            self.root, layout["x"], layout["y"], layout.get("width", 0), layout.get("height", 0)
         )
-        close_btn.pack(side="left", padx=2)
 
-    def remove_widget(self, widget, card):
-        """移除组件"""
-        try:
-            # 取消所有待处理的after回调（如果有）
-            if hasattr(widget, '_after_ids'):
-                for after_id in widget._after_ids:
-                    try:
-                        self.root.after_cancel(after_id)
-                    except:
-                        pass
-        except:
-            pass
+    def _check_pending_widgets(self):
+        """屏幕布局变化（如接回副屏）后，创建已回到屏幕内的组件"""
+        visible = [uid for uid, (_, layout) in self.pending_widgets.items() if self._on_screen(layout)]
+        if visible:
+            self.materialize_pending(visible, move_on_screen=False)
+
+    def materialize_pending(self, uids=None, move_on_screen=True):
+        """按需创建屏幕外的组件；move_on_screen 时把它们移到屏幕内可见的位置"""
+        uids = list(self.pending_widgets) if uids is None else uids
+        for i, uid in enumerate(uids):
+            entry = self.pending_widgets.pop(uid, None)
+            if entry is None:
+                continue
+            template, layout = entry
+            if move_on_screen:
+                offset = 30 * (i % 10)
+                widget = self._restore_widget(uid, template, layout, x=100 + offset, y=100 + offset)
+                if widget is not None:
+                    widget._save_session()
+            else:
+                self._restore_widget(uid, template, layout)
 
-        widget.window.destroy()
-        card.destroy()
-        self.active_widgets.remove(widget)
+        if not self.pending_widgets and self._pending_token is not None:
+            self.scheduler.unsubscribe(self._pending_token)
+            self._pending_token = None
+        self.widgets_list.refresh()
         self._update_stats()
 
-        # 如果没有组件了，显示欢迎提示
-        if len(self.active_widgets) == 0:
-            self.welcome_label = ctk.CTkLabel(
-                self.widgets_list,
-                text="从左侧组件库添加组件到桌面",
-                font=("Arial", 14),
-                text_color="#999999"
-            )
-            self.welcome_label.pack(pady=30)
-
     def _update_stats(self):
         """更新统计信息"""
-        self.stats_label.configure(text=f"{len(self.active_widgets)} 个组件")
+        # 控制面板隐藏到托盘时推迟更新，重新显示时补刷新
+        if not self.panel_visibility.should_update():
+            return
+        text = f"{len(self.widgets_list.model)} 个组件"
+        if self.pending_widgets:
+            # 点击统计信息即可把屏幕外的组件拉回来
+            text += f" · {len(self.pending_widgets)} 个在屏幕外"
+        self.stats_label.configure(text=text)
 
     def minimize_to_tray(self):
         """最小化到托盘"""
         self.root.withdraw()
-        # TODO: 实现系统托盘功能
+        self.panel_visibility.set_withdrawn(True)
+
+    def show_panel(self):
+        """从托盘恢复控制面板"""
+        self.root.deiconify()
+        self.root.lift()
+        self.panel_visibility.set_withdrawn(False)
 
     def show_settings_window(self):
         """显示设置窗口 - 现代圆润设计"""
@@ -2416,11 +6524,13 @@ class DashWidgetsApp:
         # 入场动画
         settings_window.attributes('-alpha', 0)
 
-        container = ctk.CTkFrame(settings_window, corner_radius=0, fg_color=self.theme.bg_main)
+        container = ctk.CTkFrame(settings_window, corner_radius=0)
+        self.theme.bind(container, fg_color="bg_main")
         container.pack(fill="both", expand=True)
 
         # 标题栏
-        header_frame = ctk.CTkFrame(container, height=64, fg_color=self.theme.bg_nav, corner_radius=0)
+        header_frame = ctk.CTkFrame(container, height=64, corner_radius=0)
+        self.theme.bind(header_frame, fg_color="bg_nav")
         header_frame.pack(fill="x")
 
         # Logo 和标题
@@ -2430,9 +6540,9 @@ class DashWidgetsApp:
         header_label = ctk.CTkLabel(
             header_content,
             text="⚙ 设置",
-            font=("Microsoft YaHei UI", 18, "bold"),
-            text_color=self.theme.text_primary
+            font=("Microsoft YaHei UI", 18, "bold")
         )
+        self.theme.bind(header_label, text_color="text_primary")
         header_label.pack(side="left")
 
         # 关闭按钮
@@ -2444,10 +6554,9 @@ class DashWidgetsApp:
             corner_radius=10,
             font=("Microsoft YaHei UI", 14),
             fg_color="transparent",
-            text_color=self.theme.text_secondary,
-            hover_color=self.theme.bg_hint,
             command=lambda: self._close_with_animation(settings_window)
         )
+        self.theme.bind(close_btn, text_color="text_secondary", hover_color="bg_hint")
         close_btn.pack(side="right", padx=24, pady=13)
 
         # 设置内容（可滚动）
@@ -2459,15 +6568,16 @@ class DashWidgetsApp:
         scrollable_content.pack(fill="both", expand=True, padx=24, pady=20)
 
         # 通用设置
-        general_frame = ctk.CTkFrame(scrollable_content, corner_radius=16, fg_color=self.theme.bg_card)
+        general_frame = ctk.CTkFrame(scrollable_content, corner_radius=16)
+        self.theme.bind(general_frame, fg_color="bg_card")
         general_frame.pack(fill="x", pady=(0, 16))
 
         general_label = ctk.CTkLabel(
             general_frame,
             text="🔧 通用设置",
-            font=("Microsoft YaHei UI", 15, "bold"),
-            text_color=self.theme.text_primary
+            font=("Microsoft YaHei UI", 15, "bold")
         )
+        self.theme.bind(general_label, text_color="text_primary")
         general_label.pack(anchor="w", padx=20, pady=(18, 12))
 
         # 开机自启动
@@ -2497,22 +6607,23 @@ class DashWidgetsApp:
         startup_show_switch.pack(anchor="w", padx=20, pady=(6, 18))
 
         # 外观设置
-        appearance_frame = ctk.CTkFrame(scrollable_content, corner_radius=16, fg_color=self.theme.bg_card)
+        appearance_frame = ctk.CTkFrame(scrollable_content, corner_radius=16)
+        self.theme.bind(appearance_frame, fg_color="bg_card")
         appearance_frame.pack(fill="x", pady=(0, 16))
 
         appearance_label = ctk.CTkLabel(
             appearance_frame,
             text="🎨 外观设置",
-            font=("Microsoft YaHei UI", 15, "bold"),
-            text_color=self.theme.text_primary
+            font=("Microsoft YaHei UI", 15, "bold")
         )
+        self.theme.bind(appearance_label, text_color="text_primary")
         appearance_label.pack(anchor="w", padx=20, pady=(18, 12))
 
         # 主题选择
         theme_container = ctk.CTkFrame(appearance_frame, fg_color="transparent")
         theme_container.pack(fill="x", padx=20, pady=6)
 
-        ctk.CTkLabel(theme_container, text="主题:", font=("Microsoft YaHei UI", 12), text_color=self.theme.text_secondary).pack(side="left")
+        self.theme.bind(ctk.CTkLabel(theme_container, text="主题:", font=("Microsoft YaHei UI", 12)), text_color="text_secondary").pack(side="left")
 
         self.theme_menu = ctk.CTkOptionMenu(
             theme_container,
@@ -2529,10 +6640,10 @@ class DashWidgetsApp:
         font_container = ctk.CTkFrame(appearance_frame, fg_color="transparent")
         font_container.pack(fill="x", padx=20, pady=6)
 
-        ctk.CTkLabel(font_container, text="字体:", font=("Microsoft YaHei UI", 12), text_color=self.theme.text_secondary).pack(side="left")
+        self.theme.bind(ctk.CTkLabel(font_container, text="字体:", font=("Microsoft YaHei UI", 12)), text_color="text_secondary").pack(side="left")
 
-        # 获取系统可用字体
-        available_fonts = sorted(tkfont.families())
+        # 获取系统可用字体（字体池中已缓存）
+        available_fonts = _font_pool.families()
 
         # 筛选常用的中文字体
         font_options = [
@@ -2566,22 +6677,23 @@ class DashWidgetsApp:
         self.font_menu.pack(side="right")
 
         # 组件设置
-        widget_frame = ctk.CTkFrame(scrollable_content, corner_radius=16, fg_color=self.theme.bg_card)
+        widget_frame = ctk.CTkFrame(scrollable_content, corner_radius=16)
+        self.theme.bind(widget_frame, fg_color="bg_card")
         widget_frame.pack(fill="x", pady=(0, 16))
 
         widget_label = ctk.CTkLabel(
             widget_frame,
             text="🧩 组件设置",
-            font=("Microsoft YaHei UI", 15, "bold"),
-            text_color=self.theme.text_primary
+            font=("Microsoft YaHei UI", 15, "bold")
         )
+        self.theme.bind(widget_label, text_color="text_primary")
         widget_label.pack(anchor="w", padx=20, pady=(18, 12))
 
         # 自动刷新间隔
         refresh_container = ctk.CTkFrame(widget_frame, fg_color="transparent")
         refresh_container.pack(fill="x", padx=20, pady=6)
 
-        ctk.CTkLabel(refresh_container, text="自动刷新间隔:", font=("Microsoft YaHei UI", 12), text_color=self.theme.text_secondary).pack(side="left")
+        self.theme.bind(ctk.CTkLabel(refresh_container, text="自动刷新间隔:", font=("Microsoft YaHei UI", 12)), text_color="text_secondary").pack(side="left")
 
         self.refresh_slider = ctk.CTkSlider(
             refresh_container,
@@ -2591,15 +6703,15 @@ class DashWidgetsApp:
             width=160,
             corner_radius=8
         )
-        self.refresh_slider.set(2)
+        self.refresh_slider.set(self.refresh_policy.interval_ms // 1000)
         self.refresh_slider.pack(side="right")
 
         self.refresh_label = ctk.CTkLabel(
             refresh_container,
-            text="2 秒",
-            font=("Microsoft YaHei UI", 11),
-            text_color=self.theme.text_secondary
+            text=f"{self.refresh_policy.interval_ms // 1000} 秒",
+            font=("Microsoft YaHei UI", 11)
         )
+        self.theme.bind(self.refresh_label, text_color="text_secondary")
         self.refresh_label.pack(side="right", padx=12)
 
         self.refresh_slider.configure(command=lambda v: self.refresh_label.configure(text=f"{int(v)} 秒"))
@@ -2608,7 +6720,7 @@ class DashWidgetsApp:
         opacity_container = ctk.CTkFrame(widget_frame, fg_color="transparent")
         opacity_container.pack(fill="x", padx=20, pady=6)
 
-        ctk.CTkLabel(opacity_container, text="组件透明度:", font=("Microsoft YaHei UI", 12), text_color=self.theme.text_secondary).pack(side="left")
+        self.theme.bind(ctk.CTkLabel(opacity_container, text="组件透明度:", font=("Microsoft YaHei UI", 12)), text_color="text_secondary").pack(side="left")
 
         self.opacity_slider = ctk.CTkSlider(
             opacity_container,
@@ -2624,9 +6736,9 @@ class DashWidgetsApp:
         self.opacity_label = ctk.CTkLabel(
             opacity_container,
             text="90%",
-            font=("Microsoft YaHei UI", 11),
-            text_color=self.theme.text_secondary
+            font=("Microsoft YaHei UI", 11)
         )
+        self.theme.bind(self.opacity_label, text_color="text_secondary")
         self.opacity_label.pack(side="right", padx=12)
 
         self.opacity_slider.configure(command=lambda v: self.opacity_label.configure(text=f"{int(v)}%"))
@@ -2635,7 +6747,7 @@ class DashWidgetsApp:
         size_container = ctk.CTkFrame(widget_frame, fg_color="transparent")
         size_container.pack(fill="x", padx=20, pady=(6, 18))
 
-        ctk.CTkLabel(size_container, text="默认组件尺寸:", font=("Microsoft YaHei UI", 12), text_color=self.theme.text_secondary).pack(side="left")
+        self.theme.bind(ctk.CTkLabel(size_container, text="默认组件尺寸:", font=("Microsoft YaHei UI", 12)), text_color="text_secondary").pack(side="left")
 
         self.size_menu = ctk.CTkOptionMenu(
             size_container,
@@ -2649,15 +6761,16 @@ class DashWidgetsApp:
         self.size_menu.pack(side="right")
 
         # 数据管理
-        data_frame = ctk.CTkFrame(scrollable_content, corner_radius=16, fg_color=self.theme.bg_card)
+        data_frame = ctk.CTkFrame(scrollable_content, corner_radius=16)
+        self.theme.bind(data_frame, fg_color="bg_card")
         data_frame.pack(fill="x", pady=(0, 16))
 
         data_label = ctk.CTkLabel(
             data_frame,
             text="🗂 数据管理",
-            font=("Microsoft YaHei UI", 15, "bold"),
-            text_color=self.theme.text_primary
+            font=("Microsoft YaHei UI", 15, "bold")
         )
+        self.theme.bind(data_label, text_color="text_primary")
         data_label.pack(anchor="w", padx=20, pady=(18, 12))
 
         # 清除所有组件
@@ -2667,31 +6780,32 @@ class DashWidgetsApp:
             width=220,
             height=40,
             corner_radius=10,
-            fg_color=self.theme.error,
             hover_color="#DC2626",
             font=("Microsoft YaHei UI", 12),
             command=self._clear_all_widgets
         )
+        self.theme.bind(clear_btn, fg_color="error")
         clear_btn.pack(anchor="w", padx=20, pady=(6, 18))
 
         # 关于设置
-        about_frame = ctk.CTkFrame(scrollable_content, corner_radius=16, fg_color=self.theme.bg_card)
+        about_frame = ctk.CTkFrame(scrollable_content, corner_radius=16)
+        self.theme.bind(about_frame, fg_color="bg_card")
         about_frame.pack(fill="x", pady=(0, 8))
 
         about_label = ctk.CTkLabel(
             about_frame,
             text="ℹ 关于",
-            font=("Microsoft YaHei UI", 15, "bold"),
-            text_color=self.theme.text_primary
+            font=("Microsoft YaHei UI", 15, "bold")
         )
+        self.theme.bind(about_label, text_color="text_primary")
         about_label.pack(anchor="w", padx=20, pady=(18, 12))
 
         version_label = ctk.CTkLabel(
             about_frame,
             text=f"版本: {__version__}",
-            font=("Microsoft YaHei UI", 12),
-            text_color=self.theme.text_secondary
+            font=("Microsoft YaHei UI", 12)
         )
+        self.theme.bind(version_label, text_color="text_secondary")
         version_label.pack(anchor="w", padx=20, pady=6)
 
         # GitHub 链接
@@ -2699,9 +6813,9 @@ class DashWidgetsApp:
             about_frame,
             text="🔗 github.com/Little-Tree-Studio/DashWidgets",
             font=("Microsoft YaHei UI", 11),
-            text_color=self.theme.accent,
             cursor="hand2"
         )
+        self.theme.bind(link_label, text_color="accent")
         link_label.pack(anchor="w", padx=20, pady=(6, 18))
 
         # 底部按钮
@@ -2716,11 +6830,9 @@ class DashWidgetsApp:
             height=40,
             corner_radius=10,
             font=("Microsoft YaHei UI", 12),
-            fg_color=self.theme.bg_button,
-            hover_color=self.theme.border,
-            text_color=self.theme.text_primary,
             command=lambda: self._close_with_animation(settings_window)
         )
+        self.theme.bind(cancel_btn, fg_color="bg_button", hover_color="border", text_color="text_primary")
         cancel_btn.pack(side="right", padx=8)
 
         # 保存按钮
@@ -2731,11 +6843,10 @@ class DashWidgetsApp:
             height=40,
             corner_radius=10,
             font=("Microsoft YaHei UI", 12, "bold"),
-            fg_color=self.theme.accent,
-            hover_color=self.theme.hover,
             text_color="white",
             command=lambda: self._save_settings(settings_window)
         )
+        self.theme.bind(save_btn, fg_color="accent", hover_color="hover")
         save_btn.pack(side="right")
 
         # 入场动画
@@ -2794,23 +6905,8 @@ class DashWidgetsApp:
         # 刷新所有桌面组件以应用新字体
         for widget in self.active_widgets:
             try:
-                # 保存位置
-                x = widget.window.winfo_x()
-                y = widget.window.winfo_y()
-
-                # 清除所有内容
-                widget.canvas.delete("all")
-
-                # 重新创建组件内容
-                widget._create_widget_content(widget.canvas, widget.width, widget.height)
-
-                # 恢复位置
-                widget.window.geometry(f"+{x}+{y}")
-
-                # 如果是待办事项组件，需要重新渲染列表
-                if widget.template.name == "待办事项":
-                    widget._render_todo_list(widget.canvas, widget.width, widget.height)
-
+                # 只更新字体，不重建画布
+                widget.relayout()
             except Exception as e:
                 logger.warning(f"刷新组件字体时出错: {e}")
 
@@ -2819,24 +6915,13 @@ class DashWidgetsApp:
 
     def _apply_theme(self):
         """应用主题到所有组件"""
-        # 更新主题颜色
+        # 更新主题颜色：绑定了颜色 token 的控件原地更新，界面状态保持不变，
+        # 桌面组件由 _on_theme_changed 回调刷新
         self.theme.set_light_mode(self.light_mode)
 
-        # 重新创建界面以应用新主题
-        # 先保存窗口状态
-        geometry = self.root.geometry()
-
-        # 清空现有界面
-        for widget in self.root.winfo_children():
-            widget.destroy()
-
-        # 重新创建UI
-        self._create_ui()
-
-        # 恢复窗口大小
-        self.root.geometry(geometry)
-
-        # 刷新所有桌面组件的主题
+    def _on_theme_changed(self, theme):
+        """主题变化后刷新所有桌面组件"""
+        _ = theme
         for widget in self.active_widgets:
             # 通知组件更新主题
             widget.update_theme(self.light_mode, self.theme)
@@ -2851,26 +6936,23 @@ class DashWidgetsApp:
         if messagebox.askyesno("确认", "确定要清除所有桌面组件吗？", parent=self.root):
             for widget in self.active_widgets[:]:
                 try:
+                    widget.stop_updates()
                     widget.window.destroy()
+                    widget._delete_session()
                 except Exception:
                     pass
             self.active_widgets.clear()
-            self._update_stats()
 
-            # 清空组件列表
-            for child in self.widgets_list.winfo_children():
-                if hasattr(child, 'winfo_class') and child.winfo_class() == 'CTkFrame':
-                    child.destroy()
-
-            # 显示欢迎提示
-            if len(self.active_widgets) == 0:
-                self.welcome_label = ctk.CTkLabel(
-                    self.widgets_list,
-                    text="从左侧组件库添加组件到桌面",
-                    font=("Arial", 14),
-                    text_color="#999999"
-                )
-                self.welcome_label.pack(pady=30)
+            # 屏幕外尚未创建的组件一并清除
+            for uid in self.pending_widgets:
+                _persistence.submit(("session", uid), lambda uid=uid: _config_store.delete_session(uid))
+            self.pending_widgets.clear()
+            if self._pending_token is not None:
+                self.scheduler.unsubscribe(self._pending_token)
+                self._pending_token = None
+
+            self.widgets_list.refresh()
+            self._update_stats()
 
             messagebox.showinfo("成功", "已清除所有桌面组件")
 
@@ -2878,31 +6960,28 @@ class DashWidgetsApp:
         """保存设置"""
         font_name = self.font_menu.get() if hasattr(self, 'font_menu') else "系统默认"
 
-        settings = {
+        # 保留设置界面之外的配置项（如空闲省电参数）
+        settings = dict(self.settings)
+        settings.update({
             "auto_start": self.auto_start_switch.get(),
             "theme": self.theme_menu.get(),
             "refresh_interval": int(self.refresh_slider.get()),
             "opacity": int(self.opacity_slider.get()),
             "font": font_name
-        }
+        })
+        self.settings = settings
 
-        # 创建数据目录
-        data_dir = Path.home() / ".dashwidgets"
-        data_dir.mkdir(exist_ok=True)
+        # 立即应用全局刷新间隔
+        self.refresh_policy.set_interval(settings["refresh_interval"])
 
-        # 保存设置到文件
-        settings_file = data_dir / "settings.json"
-        try:
-            with open(settings_file, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, ensure_ascii=False, indent=2)
-            logger.info(f"保存设置: {settings}")
+        # 保存设置到文件（后台原子写入，失败记录在日志中）
+        settings_file = Path.home() / ".dashwidgets" / "settings.json"
+        _persistence.submit(settings_file, lambda: write_json_atomic(settings_file, settings))
+        logger.info(f"保存设置: {settings}")
 
-            from tkinter import messagebox
-            messagebox.showinfo("设置已保存", "设置已成功保存！", parent=settings_window)
-        except Exception as e:
-            logger.error(f"保存设置失败: {e}")
-            from tkinter import messagebox
-            messagebox.showerror("错误", f"保存设置失败: {e}", parent=settings_window)
+        from tkinter import messagebox
+        # 写入在后台进行，此时尚未落盘，提示语不能声称已保存成功
+        messagebox.showinfo("设置已应用", "设置已生效，正在后台保存。", parent=settings_window)
 
         settings_window.destroy()
 
@@ -2914,13 +6993,13 @@ class DashWidgetsApp:
         # 更新时钟组件
         if widget.template.name == "时钟":
             text_color = self.theme.text_primary if self.light_mode else "#F1F5F9"
-            if hasattr(widget, 'time_text'):
-                widget.canvas.itemconfig(widget.time_text, fill=text_color)
+            if 'time' in widget.scene:
+                widget.scene.update('time', fill=text_color)
 
         # 更新待办事项组件
         elif widget.template.name == "待办事项":
             # 重新渲染待办列表
-            widget._render_todo_list(widget.canvas, widget.width, widget.height)
+            widget._render_todo_list(widget.width, widget.height)
 
     def show_about_dialog(self):
         """显示关于对话框 - 现代圆润设计"""
@@ -2932,11 +7011,13 @@ class DashWidgetsApp:
         # 入场动画
         about_window.attributes('-alpha', 0)
 
-        container = ctk.CTkFrame(about_window, corner_radius=0, fg_color=self.theme.bg_main)
+        container = ctk.CTkFrame(about_window, corner_radius=0)
+        self.theme.bind(container, fg_color="bg_main")
         container.pack(fill="both", expand=True)
 
         # Logo - 圆形背景
-        logo_frame = ctk.CTkFrame(container, width=96, height=96, corner_radius=24, fg_color=self.theme.accent)
+        logo_frame = ctk.CTkFrame(container, width=96, height=96, corner_radius=24)
+        self.theme.bind(logo_frame, fg_color="accent")
         logo_frame.pack(pady=(32, 24))
         logo_frame.pack_propagate(False)
 
@@ -2968,22 +7049,23 @@ class DashWidgetsApp:
         title_label = ctk.CTkLabel(
             container,
             text="DashWidgets",
-            font=("Microsoft YaHei UI", 28, "bold"),
-            text_color=self.theme.text_primary
+            font=("Microsoft YaHei UI", 28, "bold")
         )
+        self.theme.bind(title_label, text_color="text_primary")
         title_label.pack(pady=(0, 6))
 
         # 版本
         version_label = ctk.CTkLabel(
             container,
             text=f"版本 {__version__}",
-            font=("Microsoft YaHei UI", 13),
-            text_color=self.theme.text_secondary
+            font=("Microsoft YaHei UI", 13)
         )
+        self.theme.bind(version_label, text_color="text_secondary")
         version_label.pack(pady=(0, 8))
 
         # 装饰性分隔线
-        separator_frame = ctk.CTkFrame(container, height=1, fg_color=self.theme.border)
+        separator_frame = ctk.CTkFrame(container, height=1)
+        self.theme.bind(separator_frame, fg_color="border")
         separator_frame.pack(fill="x", padx=60, pady=(8, 24))
 
         # 描述
@@ -2991,31 +7073,32 @@ class DashWidgetsApp:
             container,
             text="一个类似 macOS Dashboard 的\n桌面小组件管理器",
             font=("Microsoft YaHei UI", 12),
-            text_color=self.theme.text_primary,
             justify="center"
         )
+        self.theme.bind(desc_label, text_color="text_primary")
         desc_label.pack(pady=(0, 24))
 
         # 信息卡片
-        info_frame = ctk.CTkFrame(container, corner_radius=12, fg_color=self.theme.bg_card)
+        info_frame = ctk.CTkFrame(container, corner_radius=12)
+        self.theme.bind(info_frame, fg_color="bg_card")
         info_frame.pack(fill="x", padx=40, pady=(0, 16))
 
         # 开发者信息
         dev_label = ctk.CTkLabel(
             info_frame,
             text=f"👨‍💻 开发: Little Tree Studio",
-            font=("Microsoft YaHei UI", 11),
-            text_color=self.theme.text_secondary
+            font=("Microsoft YaHei UI", 11)
         )
+        self.theme.bind(dev_label, text_color="text_secondary")
         dev_label.pack(pady=(12, 6))
 
         # 官网信息
         web_label = ctk.CTkLabel(
             info_frame,
             text=f"🌐 官网: {__website__}",
-            font=("Microsoft YaHei UI", 11),
-            text_color=self.theme.text_secondary
+            font=("Microsoft YaHei UI", 11)
         )
+        self.theme.bind(web_label, text_color="text_secondary")
         web_label.pack(pady=6)
 
         # GitHub 链接
@@ -3023,9 +7106,9 @@ class DashWidgetsApp:
             info_frame,
             text="🔗 GitHub: github.com/Little-Tree-Studio/DashWidgets",
             font=("Microsoft YaHei UI", 10),
-            text_color=self.theme.accent,
             cursor="hand2"
         )
+        self.theme.bind(github_label, text_color="accent")
         github_label.pack(pady=(6, 12))
 
         # 版权信息
@@ -3033,9 +7116,9 @@ class DashWidgetsApp:
             container,
             text=f"© 2025 Little Tree Studio.\nAll rights reserved.",
             font=("Microsoft YaHei UI", 10),
-            text_color=self.theme.text_hint,
             justify="center"
         )
+        self.theme.bind(copyright_label, text_color="text_hint")
         copyright_label.pack(pady=(8, 24))
 
         # 关闭按钮
@@ -3046,11 +7129,10 @@ class DashWidgetsApp:
             height=42,
             corner_radius=12,
             font=("Microsoft YaHei UI", 12, "bold"),
-            fg_color=self.theme.accent,
-            hover_color=self.theme.hover,
             text_color="white",
             command=lambda: self._close_with_animation(about_window)
         )
+        self.theme.bind(close_btn, fg_color="accent", hover_color="hover")
         close_btn.pack(pady=(0, 32))
 
         # 入场动画
@@ -3069,13 +7151,13 @@ class DashWidgetsApp:
             def show_window(icon, item):
                 _ = icon  # 未使用，保留以兼容接口
                 _ = item  # 未使用，保留以兼容接口
-                self.root.deiconify()
-                self.root.lift()
+                # 托盘回调运行在托盘线程，切回 Tk 线程执行
+                self.root.after(0, self.show_panel)
 
             def hide_window(icon, item):
                 _ = icon  # 未使用，保留以兼容接口
                 _ = item  # 未使用，保留以兼容接口
-                self.root.withdraw()
+                self.root.after(0, self.minimize_to_tray)
 
             def quit_app(icon, item):
                 _ = item  # 未使用，保留以兼容接口
@@ -3155,6 +7237,40 @@ class DashWidgetsApp:
         try:
             self.root.mainloop()
         finally:
+            # 写完所有尚未落盘的数据；主窗口关闭后笔记控件可能已销毁，单个组件出错不能
+            # 跳过下面的 flush 和整理
+            for widget in self.active_widgets:
+                try:
+                    widget._flush_note()
+                except Exception as e:
+                    logger.warning(f"保存笔记失败 ({widget.uid}): {e}")
+            if not _persistence.flush():
+                logger.warning(f"退出时仍有未写完的数据: {_persistence.metrics()}")
+
+            # 清理已关闭组件留下的配置
+            try:
+                _config_store.compact(widget.uid for widget in self.active_widgets)
+                _config_store.close()
+            except Exception as e:
+                logger.warning(f"整理组件配置时出错: {e}")
+
+            # 清理已关闭笔记留下的文件（屏幕外尚未创建的组件仍需保留）
+            try:
+                _note_store.compact(
+                    [widget.uid for widget in self.active_widgets] + list(self.pending_widgets)
+                )
+            except Exception as e:
+                logger.warning(f"整理笔记文件时出错: {e}")
+
+            # 清理已关闭待办组件留下的列表文件
+            try:
+                _todo_provider.compact(
+                    [widget.uid for widget in self.active_widgets] + list(self.pending_widgets)
+                )
+            except Exception as e:
+                logger.warning(f"整理待办列表时出错: {e}")
+            logger.debug(f"数据总线统计: {_data_bus.metrics()}")
+
             # 清理托盘图标
             if self.tray_icon:
                 try:
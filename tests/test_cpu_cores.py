@@ -0,0 +1,38 @@
+import pytest
+
+import main
+
+
+@pytest.fixture
+def snapshot(monkeypatch):
+    """把共享采样器替换为固定快照，不读取 /proc"""
+    def install(data):
+        data = dict({'time': 0.0, 'cpu_percent': 0.0, 'mem_percent': 0.0, 'mem_total': 0, 'mem_available': 0}, **data)
+        monkeypatch.setattr(main._system_sampler, "latest", lambda: data)
+        monkeypatch.setattr(main._system_sampler, "sample", lambda *groups: data)
+    return install
+
+
+def test_core_cells_without_cores():
+    assert main.DraggableWidget._core_cells(None, 300, 300, 0) == []
+
+
+@pytest.mark.parametrize("data, summary", [
+    ({}, "加载中…"),
+    ({'cores': None}, "不可用"),
+], ids=["not-sampled", "unavailable"])
+def test_cpu_cores_widget_without_core_data(snapshot, data, summary):
+    snapshot(data)
+    widget = main.HeadlessWidget(next(t for t in main.WIDGET_TEMPLATES if t.name == "CPU核心"))
+    assert widget.core_values == []
+    assert widget.scene.names("core_") == []
+    assert widget.scene.prop("summary", "text") == summary
+    widget.render()
+
+
+def test_cpu_cores_widget_with_cores(snapshot):
+    snapshot({'cores': [10.0, 55.0, 95.0]})
+    widget = main.HeadlessWidget(next(t for t in main.WIDGET_TEMPLATES if t.name == "CPU核心"))
+    assert widget.core_values == [10, 55, 95]
+    assert len(widget.scene.names("core_bg")) == 3
+    widget.render()